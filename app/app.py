@@ -1,7 +1,11 @@
 import reflex as rx
-from app.state import OBDState
+from app.backend.metrics import instrument_app, metrics_api
+from app.backend.session_io import session_api
+from app.state import RECORDING_DIR, FleetState, OBDState
+from app.components.alerts import alerts_panel
 from app.components.connection import connection_manager
 from app.components.dtc_scanner import dtc_scanner
+from app.components.fleet import fleet_panel
 from app.components.live_data import live_data_viewer
 from app.components.logger import logger_panel
 
@@ -17,7 +21,12 @@ def index() -> rx.Component:
                 ),
                 rx.el.p(
                     "Connect, scan, and clear vehicle trouble codes with ease.",
-                    class_name="text-center text-gray-500 mt-2 mb-8",
+                    class_name="text-center text-gray-500 mt-2 mb-2",
+                ),
+                rx.el.a(
+                    "Fleet mode",
+                    href="/fleet",
+                    class_name="block text-center text-purple-600 hover:underline mb-8",
                 ),
                 class_name="py-8",
             ),
@@ -28,7 +37,10 @@ def index() -> rx.Component:
                     class_name="flex flex-col gap-6",
                 ),
                 rx.el.div(
-                    live_data_viewer(), logger_panel(), class_name="flex flex-col gap-6"
+                    alerts_panel(),
+                    live_data_viewer(),
+                    logger_panel(),
+                    class_name="flex flex-col gap-6",
                 ),
                 class_name="grid grid-cols-1 lg:grid-cols-2 gap-8",
             ),
@@ -40,6 +52,7 @@ def index() -> rx.Component:
 
 app = rx.App(
     theme=rx.theme(appearance="light"),
+    api_transformer=[metrics_api(), session_api(RECORDING_DIR)],
     head_components=[
         rx.el.link(rel="preconnect", href="https://fonts.googleapis.com"),
         rx.el.link(rel="preconnect", href="https://fonts.gstatic.com", cross_origin=""),
@@ -49,4 +62,23 @@ app = rx.App(
         ),
     ],
 )
-app.add_page(index, on_load=OBDState.scan_for_ports)
\ No newline at end of file
+
+
+def fleet() -> rx.Component:
+    return rx.el.main(
+        rx.el.div(
+            rx.el.a(
+                "Back to single vehicle",
+                href="/",
+                class_name="text-purple-600 hover:underline mb-4 block",
+            ),
+            fleet_panel(),
+            class_name="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-8",
+        ),
+        class_name="font-['JetBrains_Mono'] bg-gray-50 min-h-screen",
+    )
+
+
+app.add_page(index, on_load=OBDState.scan_for_ports)
+app.add_page(fleet, route="/fleet", on_load=FleetState.refresh_fleet)
+instrument_app(app)
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import os
+import re
+import time
+
+import obd
+
+from app.backend.metrics import ADAPTER_ERRORS_TOTAL, command_label, observe_request
+from app.backend.scheduler import AsyncPIDScheduler, PIDSchedule
+
+ASYNC_TRANSPORT = os.getenv("OBD_ASYNC_TRANSPORT", "1") != "0"
+PROMPT = b">"
+
+
+def split_lines(raw: bytes) -> list[str]:
+    raw = raw.replace(b"\x00", b"")
+    if raw.endswith(PROMPT):
+        raw = raw[:-1]
+    text = raw.decode("utf-8", "ignore")
+    return [s.strip() for s in re.split("[\r\n]", text) if bool(s)]
+
+
+class AsyncELM327:
+    def __init__(
+        self, connection: obd.OBD, timeout: float = 2.0, settle_time: float = 0.1
+    ):
+        self.connection = connection
+        self.interface = connection.interface
+        self.timeout = timeout
+        self.settle_time = settle_time
+        self.connected = True
+        self._fd = self.interface._ELM327__port.fileno()
+        self._loop = asyncio.get_running_loop()
+        self._lock = asyncio.Lock()
+        self._buffer = bytearray()
+        self._waiter: asyncio.Future | None = None
+        self._loop.add_reader(self._fd, self._readable)
+
+    @classmethod
+    def open(cls, connection: obd.OBD, **kwargs) -> "AsyncELM327 | None":
+        try:
+            return cls(connection, **kwargs)
+        except (AttributeError, NotImplementedError, OSError, ValueError) as e:
+            logging.info(f"Async serial transport unavailable, using threads: {e}")
+            return None
+
+    def _readable(self):
+        try:
+            data = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._lost()
+            return
+        self._buffer += data
+        waiter = self._waiter
+        if waiter is not None and not waiter.done() and PROMPT in data:
+            waiter.set_result(None)
+
+    def _lost(self):
+        if not self.connected:
+            return
+        self.connected = False
+        self._loop.remove_reader(self._fd)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_exception(ConnectionError("Adapter disconnected"))
+        logging.critical("Device disconnected while reading")
+
+    async def _write(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            try:
+                view = view[os.write(self._fd, view) :]
+            except BlockingIOError:
+                pass
+            if view:
+                ready = self._loop.create_future()
+                self._loop.add_writer(self._fd, ready.set_result, None)
+                try:
+                    await ready
+                finally:
+                    self._loop.remove_writer(self._fd)
+
+    async def _settle(self):
+        size = -1
+        while size != len(self._buffer):
+            size = len(self._buffer)
+            await asyncio.sleep(self.settle_time)
+        self._buffer.clear()
+
+    async def send(self, cmd: bytes, timeout: float | None = None) -> list[str]:
+        async with self._lock:
+            if not self.connected:
+                return []
+            self._buffer.clear()
+            self._waiter = self._loop.create_future()
+            started = time.perf_counter()
+            try:
+                await self._write(cmd + b"\r")
+                await asyncio.wait_for(
+                    self._waiter, self.timeout if timeout is None else timeout
+                )
+            except TimeoutError:
+                lines = split_lines(bytes(self._buffer))
+                observe_request(cmd, lines, time.perf_counter() - started)
+                await self._settle()
+                if timeout is None:
+                    logging.warning("Failed to read port")
+                    return lines
+                ADAPTER_ERRORS_TOTAL.labels(command_label(cmd), "timeout").inc()
+                raise TimeoutError(f"No reply to {cmd.decode()} within {timeout:g} s")
+            except OSError:
+                self._lost()
+                return []
+            finally:
+                self._waiter = None
+            end = self._buffer.index(PROMPT) + 1
+            lines = split_lines(bytes(self._buffer[:end]))
+            del self._buffer[:end]
+            observe_request(cmd, lines, time.perf_counter() - started)
+            return lines
+
+    async def exchange(self, wire: bytes, timeout: float | None = None) -> list:
+        return self.interface._ELM327__protocol(await self.send(wire, timeout))
+
+    async def query(
+        self, command: obd.OBDCommand, force: bool = False
+    ) -> obd.OBDResponse:
+        if not self.connected:
+            return obd.OBDResponse()
+        if not force and not self.connection.test_cmd(command):
+            return obd.OBDResponse()
+        if command.header != self.connection._OBD__last_header:
+            lines = await self.send(b"AT SH " + command.header + b" ")
+            if lines != ["OK"]:
+                return obd.OBDResponse()
+            self.connection._OBD__last_header = command.header
+        messages = await self.exchange(command.command)
+        if not messages:
+            return obd.OBDResponse()
+        return command(messages)
+
+    def samples(self, schedules: list[PIDSchedule], **kwargs):
+        return AsyncPIDScheduler(self, schedules, **kwargs).samples()
+
+    def run_sync(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def close(self):
+        async with self._lock:
+            if self.connected:
+                self.connected = False
+                self._loop.remove_reader(self._fd)
@@ -0,0 +1,338 @@
+import bisect
+import heapq
+import itertools
+import json
+import math
+from collections import deque
+from dataclasses import dataclass
+
+from app.backend.derived import RollingWindow
+from app.backend.metrics import ALERTS_TOTAL
+from app.backend.pid_decoders import DecoderRegistry, live_decoders
+
+OPERATORS = (">", ">=", "<", "<=")
+DEVIATES = "deviates"
+LEVELS = ("INFO", "WARNING", "ERROR")
+DTC_KINDS = ("stored", "pending", "permanent", "*")
+DEFAULT_COOLDOWN = 60.0
+ANOMALY_MIN_SAMPLES = 20
+ALERT_QUEUE = 256
+
+BUILTIN_RULES: list[dict] = [
+    {
+        "key": "COOLANT_HOT",
+        "label": "Coolant overheating",
+        "source": "COOLANT_TEMP",
+        "op": ">",
+        "threshold": 110,
+        "for": 5,
+        "level": "ERROR",
+    },
+    {
+        "key": "RPM_REDLINE",
+        "label": "RPM above redline",
+        "source": "RPM",
+        "op": ">",
+        "threshold": 6500,
+        "cooldown": 10,
+    },
+    {
+        "key": "RPM_SPIKE",
+        "label": "RPM spike",
+        "source": "RPM",
+        "op": DEVIATES,
+        "threshold": 6,
+        "window": 30,
+    },
+    {
+        "key": "PENDING_DTC",
+        "label": "New pending DTC",
+        "dtc": "pending",
+    },
+]
+
+
+def _quantity(text: str, unit: str) -> str:
+    return f"{text} {unit}".strip()
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    key: str
+    label: str
+    source: str = ""
+    op: str = ">"
+    threshold: float = 0.0
+    hold: float = 0.0
+    cooldown: float = DEFAULT_COOLDOWN
+    level: str = "WARNING"
+    window: float = 0.0
+    dtc: str = ""
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AlertRule":
+        key = str(data.get("key", "")).upper()
+        if not key:
+            raise ValueError("Alert rule without a key")
+        level = str(data.get("level", "WARNING")).upper()
+        if level not in LEVELS:
+            raise ValueError(f"{key}: unknown level {level!r}")
+        label = data.get("label") or key.replace("_", " ").title()
+        dtc = str(data.get("dtc", "")).lower()
+        if dtc:
+            if dtc not in DTC_KINDS:
+                raise ValueError(f"{key}: unknown DTC kind {dtc!r}")
+            cooldown = float(data.get("cooldown", 0))
+            return cls(key=key, label=label, cooldown=cooldown, level=level, dtc=dtc)
+        source = str(data.get("source", "")).upper()
+        if not source:
+            raise ValueError(f"{key}: needs a source channel or a DTC kind")
+        op = data.get("op", ">")
+        if op not in OPERATORS and op != DEVIATES:
+            raise ValueError(f"{key}: unknown operator {op!r}")
+        if "threshold" not in data:
+            raise ValueError(f"{key}: needs a threshold")
+        threshold = float(data["threshold"])
+        window = float(data.get("window", 0))
+        if op == DEVIATES and (window <= 0 or threshold <= 0):
+            raise ValueError(
+                f"{key}: {DEVIATES!r} needs a positive window and threshold"
+            )
+        hold = float(data.get("for", 0))
+        cooldown = float(data.get("cooldown", DEFAULT_COOLDOWN))
+        if hold < 0 or cooldown < 0:
+            raise ValueError(f"{key}: 'for' and 'cooldown' cannot be negative")
+        return cls(
+            key=key,
+            label=label,
+            source=source,
+            op=op,
+            threshold=threshold,
+            hold=hold,
+            cooldown=cooldown,
+            level=level,
+            window=window,
+        )
+
+    @property
+    def feed(self) -> str:
+        if self.op == DEVIATES:
+            return f"{self.source}~{self.window:g}"
+        return self.source
+
+    def describe(self, score: float, reading: float, registry: DecoderRegistry) -> str:
+        decoder = registry.get(self.source)
+        name = decoder.label if decoder else self.source
+        unit = decoder.unit if decoder else ""
+        text = decoder.format(reading) if decoder else f"{reading:g}"
+        if self.op == DEVIATES:
+            detail = (
+                f"{name} {_quantity(text, unit)} is {score:.1f}σ off "
+                f"its {self.window:g} s mean"
+            )
+        else:
+            limit = decoder.format(self.threshold) if decoder else f"{self.threshold:g}"
+            detail = (
+                f"{name} {_quantity(text, unit)} {self.op} {_quantity(limit, unit)}"
+            )
+        if self.hold:
+            detail += f" for {self.hold:g} s"
+        return f"{self.label}: {detail}"
+
+
+def load_rules(path: str = "") -> list[AlertRule]:
+    specs = {spec["key"]: spec for spec in BUILTIN_RULES}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("rules", [])
+        for spec in data:
+            key = str(spec.get("key", "")).upper()
+            if spec.get("enabled", True):
+                specs[key] = {**spec, "key": key}
+            else:
+                specs.pop(key, None)
+    return [AlertRule.from_dict(spec) for spec in specs.values()]
+
+
+@dataclass(frozen=True)
+class Alert:
+    rule: str
+    level: str
+    message: str
+    timestamp: float
+
+
+class _Armed:
+    __slots__ = ("rule", "active", "generation", "last_fired", "suppressed")
+
+    def __init__(self, rule: AlertRule):
+        self.rule = rule
+        self.active = False
+        self.generation = 0
+        self.last_fired = -math.inf
+        self.suppressed = 0
+
+
+class _Ladder:
+    def __init__(self, armed: list[_Armed], sign: float, strict: bool):
+        self.armed = sorted(armed, key=lambda a: a.rule.threshold * sign)
+        self.thresholds = [a.rule.threshold * sign for a in self.armed]
+        self.sign = sign
+        self.strict = strict
+        self.count = 0
+
+    def update(self, value: float) -> tuple[int, int]:
+        value *= self.sign
+        thresholds, count = self.thresholds, self.count
+        if self.strict:
+            below = count == 0 or thresholds[count - 1] < value
+            above = count == len(thresholds) or thresholds[count] >= value
+            if below and above:
+                return count, count
+            self.count = bisect.bisect_left(thresholds, value)
+        else:
+            below = count == 0 or thresholds[count - 1] <= value
+            above = count == len(thresholds) or thresholds[count] > value
+            if below and above:
+                return count, count
+            self.count = bisect.bisect_right(thresholds, value)
+        return count, self.count
+
+
+_LADDERS = {
+    ">": (1.0, True),
+    ">=": (1.0, False),
+    "<": (-1.0, True),
+    "<=": (-1.0, False),
+}
+
+
+class AlertEngine:
+    def __init__(
+        self,
+        rules: list[AlertRule],
+        registry: DecoderRegistry = live_decoders,
+        queue: int = ALERT_QUEUE,
+    ):
+        self.rules = rules
+        self.registry = registry
+        self.fired = 0
+        self.suppressed = 0
+        self.alerts: deque[Alert] = deque(maxlen=queue)
+        self._ladders: dict[str, list[_Ladder]] = {}
+        self._windows: dict[str, list[tuple[RollingWindow, str]]] = {}
+        self._dtcs: dict[str, list[_Armed]] = {}
+        self._latest: dict[str, tuple[float, float]] = {}
+        self._deadlines: list[tuple[float, int, int, _Armed]] = []
+        self._sequence = itertools.count()
+        groups: dict[tuple[str, str], list[_Armed]] = {}
+        for rule in rules:
+            armed = _Armed(rule)
+            if rule.dtc:
+                self._dtcs.setdefault(rule.dtc, []).append(armed)
+                continue
+            groups.setdefault((rule.feed, rule.op), []).append(armed)
+            if rule.op == DEVIATES:
+                windows = self._windows.setdefault(rule.source, [])
+                if all(feed != rule.feed for _, feed in windows):
+                    windows.append((RollingWindow(rule.window), rule.feed))
+        for (feed, op), armed in groups.items():
+            sign, strict = _LADDERS.get(op, (1.0, True))
+            self._ladders.setdefault(feed, []).append(_Ladder(armed, sign, strict))
+
+    def _fire(self, armed: _Armed, timestamp: float, message: str) -> Alert | None:
+        rule = armed.rule
+        if timestamp - armed.last_fired < rule.cooldown:
+            armed.suppressed += 1
+            self.suppressed += 1
+            ALERTS_TOTAL.labels(rule.key, "suppressed").inc()
+            return None
+        if armed.suppressed:
+            message += f" ({armed.suppressed} repeats suppressed)"
+        armed.last_fired = timestamp
+        armed.suppressed = 0
+        self.fired += 1
+        ALERTS_TOTAL.labels(rule.key, "fired").inc()
+        return Alert(rule.key, rule.level, message, timestamp)
+
+    def _trigger(self, armed: _Armed, timestamp: float):
+        rule = armed.rule
+        score, reading = self._latest[rule.feed]
+        alert = self._fire(
+            armed, timestamp, rule.describe(score, reading, self.registry)
+        )
+        if alert is not None:
+            self.alerts.append(alert)
+
+    def _evaluate(self, feed: str, timestamp: float, score: float, reading: float):
+        ladders = self._ladders.get(feed)
+        if ladders is None:
+            return
+        self._latest[feed] = (score, reading)
+        for ladder in ladders:
+            old, new = ladder.update(score)
+            if new > old:
+                for armed in ladder.armed[old:new]:
+                    armed.active = True
+                    armed.generation += 1
+                    if armed.rule.hold > 0:
+                        heapq.heappush(
+                            self._deadlines,
+                            (
+                                timestamp + armed.rule.hold,
+                                next(self._sequence),
+                                armed.generation,
+                                armed,
+                            ),
+                        )
+                    else:
+                        self._trigger(armed, timestamp)
+            elif new < old:
+                for armed in ladder.armed[new:old]:
+                    armed.active = False
+                    armed.generation += 1
+
+    def push(self, key: str, timestamp: float, value: float):
+        windows = self._windows.get(key)
+        if windows is not None:
+            for window, feed in windows:
+                window.expire(timestamp)
+                if window.count >= ANOMALY_MIN_SAMPLES:
+                    std = window.std
+                    score = abs(value - window.mean) / std if std > 0 else 0.0
+                    self._evaluate(feed, timestamp, score, value)
+                window.push(timestamp, value)
+        self._evaluate(key, timestamp, value, value)
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= timestamp:
+            due, _, generation, armed = heapq.heappop(deadlines)
+            if armed.active and armed.generation == generation:
+                self._trigger(armed, due)
+
+    def push_many(self, items: list[tuple[str, float]], timestamp: float):
+        for key, value in items:
+            self.push(key, timestamp, value)
+
+    def dtcs(self, records: list, timestamp: float) -> list[Alert]:
+        alerts = []
+        for record in records:
+            for kind in (record.kind, "*"):
+                for armed in self._dtcs.get(kind, ()):
+                    description = f" {record.description}" if record.description else ""
+                    ecu = f" ({record.ecu})" if record.ecu else ""
+                    alert = self._fire(
+                        armed,
+                        timestamp,
+                        f"{armed.rule.label}: {record.code}{description}{ecu}",
+                    )
+                    if alert is not None:
+                        alerts.append(alert)
+        return alerts
+
+    def drain(self) -> list[Alert]:
+        alerts = []
+        while self.alerts:
+            alerts.append(self.alerts.popleft())
+        return alerts
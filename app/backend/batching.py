@@ -0,0 +1,46 @@
+import obd
+from obd.protocols.protocol import Message
+
+MAX_PIDS_PER_REQUEST = 6
+CAN_PROTOCOL_IDS = ("6", "7", "8", "9")
+
+
+def is_batchable(command: obd.OBDCommand) -> bool:
+    return (
+        command.mode == 1
+        and command.pid is not None
+        and command.pid % 0x20 != 0
+        and command.bytes > 2
+    )
+
+
+def batch_command_string(commands: list[obd.OBDCommand]) -> bytes:
+    return b"01" + b"".join(cmd.command[2:] for cmd in commands)
+
+
+def demultiplex(
+    commands: list[obd.OBDCommand],
+    messages: list[Message],
+    wanted: list[obd.OBDCommand] | None = None,
+) -> dict[obd.OBDCommand, obd.OBDResponse]:
+    by_pid = {cmd.pid: cmd for cmd in commands}
+    parts: dict[obd.OBDCommand, list[Message]] = {}
+    for message in messages:
+        data = message.data
+        if not data or data[0] != 0x41:
+            continue
+        i = 1
+        while i < len(data):
+            cmd = by_pid.get(data[i])
+            if cmd is None:
+                break
+            size = cmd.bytes - 2
+            if wanted is not None and cmd not in wanted:
+                i += 1 + size
+                continue
+            part = Message(message.frames)
+            part.ecu = message.ecu
+            part.data = bytearray([0x41, data[i]]) + data[i + 1 : i + 1 + size]
+            parts.setdefault(cmd, []).append(part)
+            i += 1 + size
+    return {cmd: cmd(cmd_parts) for cmd, cmd_parts in parts.items()}
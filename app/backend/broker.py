@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import obd
+
+from app.backend.aio_elm327 import AsyncELM327
+from app.backend.connection import ConnectConfig, ConnectionBringUp
+from app.backend.metrics import (
+    ADAPTER_CONNECTIONS,
+    ADAPTER_ERRORS_TOTAL,
+    ADAPTER_SESSIONS,
+    CONNECT_SECONDS,
+    PID_RESPONSES_TOTAL,
+    command_label,
+)
+from app.backend.pid_cache import VehicleLinkProfile, pid_cache
+from app.backend.scheduler import AsyncPIDScheduler, PIDSchedule, PIDScheduler
+
+Subscriber = Callable[[obd.OBDResponse], None]
+
+
+class AdapterChannel:
+    def __init__(self, broker: "AdapterBroker", port: str, config: ConnectConfig):
+        self.broker = broker
+        self.port = port
+        self.config = config
+        self.connection = None
+        self.transport: AsyncELM327 | None = None
+        self.bringup: ConnectionBringUp | None = None
+        self.vin = ""
+        self.cached_vin = ""
+        self.cached_protocol = ""
+        self.summary = ""
+        self.attempts = 0
+        self.sessions = 0
+        self.scheduler: PIDScheduler | None = None
+        self.latest: dict[str, obd.OBDResponse] = {}
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix=f"port-{port}")
+        self._subscribers: tuple[Subscriber, ...] = ()
+        self._lock = asyncio.Lock()
+        self._io_lock = threading.Lock()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def is_connected(self) -> bool:
+        if self.transport is not None and not self.transport.connected:
+            return False
+        return self.connection is not None and self.connection.is_connected()
+
+    def status(self):
+        if self.connection is None:
+            return obd.OBDStatus.NOT_CONNECTED
+        return self.connection.status()
+
+    def protocol_id(self) -> str:
+        return self.connection.protocol_id() if self.connection is not None else ""
+
+    def supports(self, command: obd.OBDCommand) -> bool:
+        return self.connection is not None and self.connection.supports(command)
+
+    def query(self, command: obd.OBDCommand, force: bool = False) -> obd.OBDResponse:
+        if self.transport is not None:
+            return self.transport.run_sync(self.transport.query(command, force))
+        with self._io_lock:
+            return obd.OBD.query(self.connection, command, force=force)
+
+    def exchange(self, wire: bytes, timeout: float | None = None) -> list:
+        if self.transport is not None:
+            return self.transport.run_sync(self.transport.exchange(wire, timeout))
+        with self._io_lock:
+            interface = self.connection.interface
+            port = interface._ELM327__port
+            previous = port.timeout
+            if timeout is not None:
+                port.timeout = timeout
+            started = time.monotonic()
+            try:
+                messages = interface.send_and_parse(wire) or []
+            finally:
+                port.timeout = previous
+            if timeout is not None and time.monotonic() - started >= timeout:
+                ADAPTER_ERRORS_TOTAL.labels(command_label(wire), "timeout").inc()
+                interface._drain()
+                raise TimeoutError(f"No reply to {wire.decode()} within {timeout:g} s")
+            return messages
+
+    def run(self, func, *args) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def attach(self) -> bool:
+        self.sessions += 1
+        ADAPTER_SESSIONS.inc()
+        async with self._lock:
+            if self.connection is not None:
+                return True
+            cached = pid_cache.for_port(self.port)
+            self.bringup = ConnectionBringUp(
+                self.port,
+                profile=cached,
+                config=self.config,
+                executor=self.executor,
+                fast=False,
+            )
+            connection, started = None, time.perf_counter()
+            try:
+                connection, vin = await self.bringup.run()
+                rejected = self.bringup.rejected_profile
+                if rejected is not None:
+                    await asyncio.to_thread(pid_cache.invalidate, rejected.vin)
+                cached = self.bringup.profile
+                if cached is not None and cached.vin != vin:
+                    await self.run(connection.reprobe)
+                    cached = None
+                if cached is None and vin:
+                    profile = VehicleLinkProfile.from_connection(vin, connection)
+                    await asyncio.to_thread(pid_cache.store, self.port, profile)
+            finally:
+                CONNECT_SECONDS.labels(
+                    "failed" if connection is None else "ok"
+                ).observe(time.perf_counter() - started)
+                self.summary = self.bringup.summary()
+                self.attempts = self.bringup.attempt
+                self.bringup = None
+            self.connection, self.vin = connection, vin
+            if self.config.async_transport:
+                self.transport = AsyncELM327.open(
+                    connection,
+                    timeout=self.config.read_timeout,
+                    settle_time=self.config.settle_time,
+                )
+            ADAPTER_CONNECTIONS.inc()
+            self.cached_vin = cached.vin if cached is not None else ""
+            self.cached_protocol = cached.protocol if cached is not None else ""
+            return False
+
+    async def detach(self):
+        self.sessions -= 1
+        ADAPTER_SESSIONS.dec()
+        if self.sessions > 0:
+            return
+        if self.bringup is not None:
+            self.bringup.cancel()
+        async with self._lock:
+            if self.sessions > 0:
+                return
+            self.broker._remove(self)
+            scheduler, self.scheduler = self.scheduler, None
+            self._subscribers = ()
+            if scheduler is not None:
+                await scheduler.close()
+            if self.transport is not None:
+                await self.transport.close()
+                self.transport = None
+            if self.connection is not None:
+                await self.run(self.connection.close)
+                self.connection = None
+                ADAPTER_CONNECTIONS.dec()
+            self.executor.shutdown(wait=False)
+
+    async def subscribe(
+        self, callback: Subscriber, schedules: list[PIDSchedule]
+    ) -> PIDScheduler:
+        for response in list(self.latest.values()):
+            callback(response)
+        self._subscribers += (callback,)
+        if self.scheduler is None:
+            supported = [s for s in schedules if self.supports(s.command)]
+            if self.transport is not None:
+                self.scheduler = AsyncPIDScheduler(
+                    self.transport, supported, self._publish
+                )
+                self.scheduler.start()
+            else:
+                self.scheduler = PIDScheduler(
+                    self.connection, supported, self._publish, io_lock=self._io_lock
+                )
+                await asyncio.to_thread(self.scheduler.start)
+        return self.scheduler
+
+    async def unsubscribe(self, callback: Subscriber):
+        self._subscribers = tuple(s for s in self._subscribers if s is not callback)
+        if self._subscribers or self.scheduler is None:
+            return
+        scheduler, self.scheduler = self.scheduler, None
+        await scheduler.close()
+
+    def _publish(self, response: obd.OBDResponse):
+        ok = not response.is_null()
+        PID_RESPONSES_TOTAL.labels(response.command.name, "ok" if ok else "null").inc()
+        if self.cached_vin:
+            pid_cache.report(self.cached_vin, response.command, ok)
+        if not ok:
+            return
+        self.latest[response.command.name] = response
+        for callback in self._subscribers:
+            try:
+                callback(response)
+            except Exception as e:
+                logging.exception(e)
+
+
+class AdapterBroker:
+    def __init__(self, config: ConnectConfig | None = None):
+        self.config = config or ConnectConfig()
+        self.channels: dict[str, AdapterChannel] = {}
+
+    def channel(self, port: str, config: ConnectConfig | None = None) -> AdapterChannel:
+        channel = self.channels.get(port)
+        if channel is None:
+            channel = self.channels[port] = AdapterChannel(
+                self, port, config or self.config
+            )
+        return channel
+
+    def _remove(self, channel: AdapterChannel):
+        if self.channels.get(channel.port) is channel:
+            del self.channels[channel.port]
+
+
+adapter_broker = AdapterBroker()
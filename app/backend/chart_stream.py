@@ -0,0 +1,151 @@
+import json
+import math
+import os
+import threading
+import time
+from array import array
+
+from app.backend.pid_decoders import DecoderRegistry, live_decoders
+
+CHART_WINDOW = float(os.getenv("OBD_CHART_WINDOW", "600"))
+CHART_RESOLUTION = int(os.getenv("OBD_CHART_RESOLUTION", "2048"))
+CHART_WIDTH = 600
+
+
+class _Series:
+    __slots__ = ("mins", "maxs", "last", "sent", "dirty")
+
+    def __init__(self, capacity: int):
+        self.mins = array("d", [math.inf]) * capacity
+        self.maxs = array("d", [-math.inf]) * capacity
+        self.last = -1
+        self.sent = -1
+        self.dirty = False
+
+
+class ChartStream:
+    def __init__(
+        self,
+        window: float = CHART_WINDOW,
+        resolution: int = CHART_RESOLUTION,
+        registry: DecoderRegistry = live_decoders,
+    ):
+        self.base = window / resolution
+        self.resolution = resolution
+        self.registry = registry
+        self.merge = 1
+        self.enabled = False
+        self._reset = True
+        self._due = 0.0
+        self._series: dict[str, _Series] = {}
+        self._lock = threading.Lock()
+        self.configure(CHART_WIDTH)
+
+    def configure(self, width: int, enabled: bool | None = None):
+        self.merge = max(1, math.ceil(self.resolution / max(width, 1)))
+        if enabled is not None:
+            self.enabled = enabled
+        self._reset = True
+
+    @property
+    def span(self) -> int:
+        return math.ceil(self.resolution / self.merge)
+
+    @property
+    def interval(self) -> float:
+        return self.base * self.merge
+
+    def _put(self, key: str, timestamp: float, value: float):
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series(self.resolution)
+        index = int(timestamp // self.base)
+        capacity = self.resolution
+        if index > series.last:
+            if series.last >= 0:
+                for stale in range(
+                    max(series.last + 1, index - capacity + 1), index + 1
+                ):
+                    series.mins[stale % capacity] = math.inf
+                    series.maxs[stale % capacity] = -math.inf
+            series.last = index
+        elif index <= series.last - capacity:
+            return
+        slot = index % capacity
+        if value < series.mins[slot]:
+            series.mins[slot] = value
+        if value > series.maxs[slot]:
+            series.maxs[slot] = value
+        series.dirty = True
+
+    def push(self, key: str, timestamp: float, value: float):
+        with self._lock:
+            self._put(key, timestamp, value)
+
+    def push_many(self, items: list[tuple[str, float]], timestamp: float):
+        with self._lock:
+            for key, value in items:
+                self._put(key, timestamp, value)
+
+    def _buckets(self, series: _Series, start: int, scale: float, offset: float):
+        capacity, merge = self.resolution, self.merge
+        oldest = series.last - capacity + 1
+        points = []
+        for bucket in range(start, series.last // merge + 1):
+            low, high = math.inf, -math.inf
+            for index in range(max(bucket * merge, oldest), (bucket + 1) * merge):
+                if index > series.last:
+                    break
+                slot = index % capacity
+                if series.mins[slot] < low:
+                    low = series.mins[slot]
+                if series.maxs[slot] > high:
+                    high = series.maxs[slot]
+            if low <= high:
+                low, high = low * scale + offset, high * scale + offset
+                if scale < 0:
+                    low, high = high, low
+                points.append([bucket, round(low, 4), round(high, 4)])
+        return points
+
+    def collect(self, slots: dict[str, int]) -> dict | None:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        if not self._reset and now < self._due:
+            return None
+        self._due = now + self.interval
+        with self._lock:
+            reset, self._reset = self._reset, False
+            payload: dict = {}
+            newest = -1
+            for key, series in self._series.items():
+                if series.last < 0:
+                    continue
+                newest = max(newest, series.last // self.merge)
+                slot = slots.get(key)
+                if slot is None or not (reset or series.dirty):
+                    continue
+                decoder = self.registry.get(key)
+                scale, offset = (
+                    (decoder.scale, decoder.offset) if decoder else (1.0, 0.0)
+                )
+                oldest = (series.last - self.resolution + 1) // self.merge
+                start = oldest if reset else max(series.sent, oldest)
+                points = self._buckets(series, start, scale, offset)
+                series.sent = series.last // self.merge
+                series.dirty = False
+                if points:
+                    payload[slot] = points
+        if not payload and not reset:
+            return None
+        update = {"n": newest, "s": payload}
+        if reset:
+            update["reset"] = self.span
+        return update
+
+
+def chart_script(update: dict) -> str:
+    return (
+        f"window.obdChart && obdChart.push({json.dumps(update, separators=(',', ':'))})"
+    )
@@ -0,0 +1,232 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+
+import obd
+from obd.elm327 import ELM327
+
+from app.backend.aio_elm327 import ASYNC_TRANSPORT
+from app.backend.metrics import observe_request
+from app.backend.pid_cache import CachedProfileAsync, VehicleLinkProfile
+
+PHASE_LABELS = {
+    "port_open": "port open",
+    "atz": "ATZ",
+    "protocol_detect": "protocol detect",
+    "pid_discovery": "PID discovery",
+    "vin_read": "VIN read",
+}
+
+
+class ConnectionCancelled(Exception):
+    pass
+
+
+@dataclass
+class ConnectConfig:
+    deadline: float = 20.0
+    attempts: int = 3
+    read_timeout: float = 2.0
+    protocol_timeout: float = 10.0
+    settle_time: float = 0.1
+    backoff: float = 0.5
+    backoff_max: float = 4.0
+    poll_interval: float = 0.05
+    async_transport: bool = ASYNC_TRANSPORT
+
+
+class _TimedELM327(ELM327):
+    def __init__(self, *args, bringup: "ConnectionBringUp", **kwargs):
+        self._bringup = bringup
+        super().__init__(*args, **kwargs)
+
+    def set_baudrate(self, baud):
+        self._bringup._attach(self)
+        self._ELM327__port.timeout = self._bringup.config.read_timeout
+        self._ELM327__port.reset_input_buffer()
+        return super().set_baudrate(baud)
+
+    def _drain(self):
+        port = self._ELM327__port
+        if port is None:
+            return
+        timeout, port.timeout = port.timeout, self._bringup.config.settle_time
+        while port.read(1024):
+            pass
+        port.timeout = timeout
+
+    def set_protocol(self, protocol_):
+        self._bringup._lap("atz", "protocol_detect")
+        port = self._ELM327__port
+        port.timeout = self._bringup.config.protocol_timeout
+        try:
+            return super().set_protocol(protocol_)
+        finally:
+            if port.is_open:
+                port.timeout = self._bringup.config.read_timeout
+            self._bringup._lap("protocol_detect", "pid_discovery")
+
+    def _ELM327__send(self, cmd, delay=None, end_marker=ELM327.ELM_PROMPT):
+        try:
+            self._bringup._checkpoint()
+        except Exception:
+            self.close()
+            raise
+        started = time.perf_counter()
+        lines = ELM327._ELM327__send(self, cmd, end_marker=end_marker)
+        observe_request(cmd, lines, time.perf_counter() - started)
+        if cmd == b"ATZ":
+            self._drain()
+        return lines
+
+
+class ConnectionBringUp:
+    def __init__(
+        self,
+        port: str,
+        profile: VehicleLinkProfile | None = None,
+        config: ConnectConfig | None = None,
+        executor: Executor | None = None,
+        **kwargs,
+    ):
+        self.port = port
+        self.executor = executor
+        self.profile = profile
+        self.rejected_profile: VehicleLinkProfile | None = None
+        self.config = config or ConnectConfig()
+        self.phase = "idle"
+        self.attempt = 0
+        self.timings: dict[str, float] = {}
+        self.total = 0.0
+        self._kwargs = kwargs
+        self._cancelled = threading.Event()
+        self._deadline = float("inf")
+        self._mark = 0.0
+        self._interface: _TimedELM327 | None = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        if self.phase in ("connected", "failed"):
+            return
+        self._cancelled.set()
+        port = getattr(self._interface, "_ELM327__port", None)
+        if port is not None and hasattr(port, "cancel_read"):
+            port.cancel_read()
+
+    def summary(self) -> str:
+        parts = [
+            f"{label} {self.timings[phase] * 1000:.0f} ms"
+            for phase, label in PHASE_LABELS.items()
+            if phase in self.timings
+        ]
+        return f"{self.total:.2f} s ({', '.join(parts)})"
+
+    def _attach(self, interface: _TimedELM327):
+        self._interface = interface
+        self._lap("port_open", "atz")
+        self._checkpoint()
+
+    def _lap(self, phase: str, next_phase: str | None = None):
+        now = time.perf_counter()
+        self.timings[phase] = now - self._mark
+        self._mark = now
+        if next_phase is not None:
+            self.phase = next_phase
+
+    def _checkpoint(self):
+        if self.phase in ("connected", "failed"):
+            return
+        if self._cancelled.is_set():
+            raise ConnectionCancelled("Connection attempt cancelled.")
+        if time.monotonic() > self._deadline:
+            raise TimeoutError(
+                f"Connection to {self.port} timed out after {self.config.deadline:.0f} s."
+            )
+
+    def _open(self) -> CachedProfileAsync:
+        self._mark = time.perf_counter()
+        return CachedProfileAsync(
+            self.port,
+            profile=self.profile,
+            interface_factory=lambda *args: _TimedELM327(*args, bringup=self),
+            **self._kwargs,
+        )
+
+    def _read_vin(self, connection: CachedProfileAsync) -> str:
+        self._lap("pid_discovery", "vin_read")
+        response = obd.OBD.query(connection, obd.commands.VIN)
+        self._lap("vin_read")
+        if response.is_null():
+            return ""
+        return bytes(response.value).decode(errors="ignore")
+
+    def _call(self, func, *args) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _in_thread(self, func, *args):
+        task = self._call(func, *args)
+        remaining = self._deadline - time.monotonic()
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), max(remaining, 0.0))
+        except asyncio.TimeoutError:
+            self.cancel()
+            try:
+                result = await task
+            except Exception:
+                result = None
+            if isinstance(result, obd.OBD):
+                await self._call(result.close)
+            raise TimeoutError(
+                f"Connection to {self.port} timed out after {self.config.deadline:.0f} s."
+            )
+
+    async def _backoff(self, seconds: float):
+        end = min(time.monotonic() + seconds, self._deadline)
+        while time.monotonic() < end:
+            if self._cancelled.is_set():
+                raise ConnectionCancelled("Connection attempt cancelled.")
+            await asyncio.sleep(self.config.poll_interval)
+
+    async def run(self) -> tuple[CachedProfileAsync, str]:
+        started = time.perf_counter()
+        self._deadline = time.monotonic() + self.config.deadline
+        delay = self.config.backoff
+        try:
+            while True:
+                self.attempt += 1
+                self.timings = {}
+                self.phase = "port_open"
+                connection = await self._in_thread(self._open)
+                status = connection.status()
+                if status == obd.OBDStatus.CAR_CONNECTED:
+                    try:
+                        vin = await self._in_thread(self._read_vin, connection)
+                    except BaseException:
+                        await self._call(connection.close)
+                        raise
+                    if vin or self.profile is None or not self.profile.vin:
+                        break
+                await self._call(connection.close)
+                if self.profile is not None:
+                    self.rejected_profile, self.profile = self.profile, None
+                    continue
+                if (
+                    self.attempt >= self.config.attempts
+                    or time.monotonic() + delay >= self._deadline
+                ):
+                    raise ConnectionError(f"Connection failed. Status: {status}")
+                self.phase = "backoff"
+                await self._backoff(delay)
+                delay = min(delay * 2, self.config.backoff_max)
+        except BaseException:
+            self.phase = "failed"
+            self.total = time.perf_counter() - started
+            raise
+        self.phase = "connected"
+        self.total = time.perf_counter() - started
+        return connection, vin
@@ -0,0 +1,368 @@
+import ast
+import json
+import math
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from types import CodeType
+
+from app.backend.pid_decoders import DecoderRegistry, PIDDecoder, live_decoders
+
+WINDOW_CAPACITY = 4096
+STATS = ("value", "min", "max", "mean", "std")
+FUNCTIONS = {"abs": abs, "min": min, "max": max, "sqrt": math.sqrt}
+_NAMESPACE = {"__builtins__": {}, **FUNCTIONS}
+_SYNTAX = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Call,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.operator,
+    ast.unaryop,
+)
+
+BUILTIN_CHANNELS: list[dict] = [
+    {
+        "key": "RPM_MIN",
+        "label": "RPM Min (10 s)",
+        "expression": "RPM",
+        "stat": "min",
+        "window": 10,
+    },
+    {
+        "key": "RPM_MAX",
+        "label": "RPM Max (10 s)",
+        "expression": "RPM",
+        "stat": "max",
+        "window": 10,
+    },
+    {
+        "key": "RPM_MEAN",
+        "label": "RPM Mean (10 s)",
+        "expression": "RPM",
+        "stat": "mean",
+        "window": 10,
+    },
+    {
+        "key": "RPM_STD",
+        "label": "RPM Std Dev (10 s)",
+        "expression": "RPM",
+        "stat": "std",
+        "window": 10,
+        "precision": 1,
+    },
+    {
+        "key": "FUEL_RATE",
+        "label": "Fuel Rate",
+        "expression": "MAF * 3600 / (14.7 * 745)",
+        "unit": "lph",
+    },
+    {
+        "key": "FUEL_ECONOMY",
+        "label": "Fuel Economy (30 s)",
+        "expression": "FUEL_RATE * 100 / SPEED",
+        "stat": "mean",
+        "window": 30,
+        "unit": "L/100km",
+        "precision": 1,
+    },
+    {
+        "key": "CLOSED_LOOP",
+        "label": "Closed Loop (60 s)",
+        "source": "FUEL_STATUS",
+        "match": "Closed loop",
+        "stat": "mean",
+        "window": 60,
+        "scale": 100,
+        "unit": "%",
+        "precision": 0,
+    },
+]
+
+
+def compile_expression(text: str) -> tuple[CodeType, tuple[str, ...]]:
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression {text!r}: {e.msg}") from None
+    names = []
+    for node in ast.walk(tree):
+        if not isinstance(node, _SYNTAX):
+            raise ValueError(f"Unsupported syntax in {text!r}: {type(node).__name__}")
+        if isinstance(node, ast.Call) and (
+            not isinstance(node.func, ast.Name)
+            or node.func.id not in FUNCTIONS
+            or node.keywords
+        ):
+            raise ValueError(f"Unsupported call in {text!r}")
+        if isinstance(node, ast.Constant) and (
+            not isinstance(node.value, (int, float)) or isinstance(node.value, bool)
+        ):
+            raise ValueError(f"Unsupported constant in {text!r}: {node.value!r}")
+        if isinstance(node, ast.Name) and node.id not in FUNCTIONS:
+            names.append(node.id)
+    return compile(tree, "<derived>", "eval"), tuple(dict.fromkeys(names))
+
+
+class RollingWindow:
+    def __init__(self, seconds: float, capacity: int = WINDOW_CAPACITY):
+        self.seconds = seconds
+        self.capacity = capacity
+        self.values = array("d", bytes(8 * capacity))
+        self.times = array("d", bytes(8 * capacity))
+        self.count = 0
+        self._next = 0
+        self._shift = 0.0
+        self._sum = 0.0
+        self._squares = 0.0
+        self._mins: deque[int] = deque()
+        self._maxs: deque[int] = deque()
+
+    def _evict(self):
+        seq = self._next - self.count
+        value = self.values[seq % self.capacity] - self._shift
+        self._sum -= value
+        self._squares -= value * value
+        self.count -= 1
+        if self._mins[0] == seq:
+            self._mins.popleft()
+        if self._maxs[0] == seq:
+            self._maxs.popleft()
+
+    def _resum(self):
+        values, capacity, shift = self.values, self.capacity, self._shift
+        first = self._next - self.count
+        deltas = [values[seq % capacity] - shift for seq in range(first, self._next)]
+        self._sum = math.fsum(deltas)
+        self._squares = math.fsum(d * d for d in deltas)
+
+    def expire(self, now: float):
+        horizon = now - self.seconds
+        times, capacity = self.times, self.capacity
+        while self.count and times[(self._next - self.count) % capacity] < horizon:
+            self._evict()
+
+    def push(self, timestamp: float, value: float):
+        self.expire(timestamp)
+        if self.count == self.capacity:
+            self._evict()
+        if not self.count:
+            self._shift, self._sum, self._squares = value, 0.0, 0.0
+        seq, values = self._next, self.values
+        slot = seq % self.capacity
+        values[slot] = value
+        self.times[slot] = timestamp
+        delta = value - self._shift
+        self._sum += delta
+        self._squares += delta * delta
+        mins, maxs = self._mins, self._maxs
+        while mins and values[mins[-1] % self.capacity] >= value:
+            mins.pop()
+        mins.append(seq)
+        while maxs and values[maxs[-1] % self.capacity] <= value:
+            maxs.pop()
+        maxs.append(seq)
+        self._next += 1
+        self.count += 1
+        if self._next % self.capacity == 0:
+            self._resum()
+
+    @property
+    def min(self) -> float:
+        return self.values[self._mins[0] % self.capacity]
+
+    @property
+    def max(self) -> float:
+        return self.values[self._maxs[0] % self.capacity]
+
+    @property
+    def mean(self) -> float:
+        return self._shift + self._sum / self.count
+
+    @property
+    def std(self) -> float:
+        mean = self._sum / self.count
+        return math.sqrt(max(self._squares / self.count - mean * mean, 0.0))
+
+
+@dataclass(frozen=True)
+class DerivedChannel:
+    key: str
+    label: str
+    inputs: tuple[str, ...]
+    expression: str = ""
+    code: CodeType | None = None
+    match: str | None = None
+    stat: str = "value"
+    window: float = 0.0
+    scale: float = 1.0
+    unit: str = ""
+    precision: int | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DerivedChannel":
+        key = str(data.get("key", "")).upper()
+        if not key:
+            raise ValueError("Derived channel without a key")
+        stat = data.get("stat", "value")
+        if stat not in STATS:
+            raise ValueError(f"{key}: unknown stat {stat!r}")
+        window = float(data.get("window", 0))
+        if stat != "value" and window <= 0:
+            raise ValueError(f"{key}: stat {stat!r} needs a positive window")
+        if stat == "value" and window > 0:
+            raise ValueError(f"{key}: windowed channels need a stat")
+        code, match = None, data.get("match")
+        expression = str(data.get("expression", ""))
+        if match is not None:
+            inputs = (str(data.get("source", "")).upper(),)
+            if not inputs[0]:
+                raise ValueError(f"{key}: match channels need a source")
+        elif expression:
+            code, inputs = compile_expression(expression)
+        else:
+            raise ValueError(f"{key}: needs an expression or a source to match")
+        if key in inputs:
+            raise ValueError(f"{key}: channel refers to itself")
+        precision = data.get("precision")
+        return cls(
+            key=key,
+            label=data.get("label") or key.replace("_", " ").title(),
+            inputs=inputs,
+            expression=expression,
+            code=code,
+            match=match,
+            stat=stat,
+            window=window,
+            scale=float(data.get("scale", 1.0)),
+            unit=str(data.get("unit", "")),
+            precision=None if precision is None else int(precision),
+        )
+
+    @property
+    def source(self) -> tuple:
+        return self.expression, self.match, self.inputs, self.scale, self.window
+
+    def decoder(self, registry: DecoderRegistry) -> PIDDecoder:
+        unit, source_unit, scale, offset, precision = self.unit, self.unit, 1.0, 0.0, 2
+        source = registry.get(self.inputs[0]) if len(self.inputs) == 1 else None
+        if self.unit in registry.units:
+            unit, scale, offset, precision = registry.units[self.unit]
+        elif not self.unit and self.match is None and source is not None:
+            unit, source_unit = source.unit, source.source_unit
+            scale, offset, precision = source.scale, source.offset, source.precision
+        if self.stat == "std":
+            offset = 0.0
+        if self.precision is not None:
+            precision = self.precision
+        return PIDDecoder(
+            self.key, self.label, unit, source_unit, scale, offset, precision
+        )
+
+    def evaluate(self, latest: dict[str, float | str]) -> float | None:
+        if self.match is not None:
+            text = latest.get(self.inputs[0])
+            return float(str(text).startswith(self.match)) * self.scale
+        try:
+            return float(eval(self.code, _NAMESPACE, latest)) * self.scale
+        except (ArithmeticError, NameError, TypeError, ValueError):
+            return None
+
+
+def load_channels(path: str = "") -> list[DerivedChannel]:
+    specs = {spec["key"]: spec for spec in BUILTIN_CHANNELS}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("channels", [])
+        for spec in data:
+            key = str(spec.get("key", "")).upper()
+            if spec.get("enabled", True):
+                specs[key] = {**spec, "key": key}
+            else:
+                specs.pop(key, None)
+    channels = [DerivedChannel.from_dict(spec) for spec in specs.values()]
+    defined = set()
+    for channel in channels:
+        later = [
+            name for name in channel.inputs if name in specs and name not in defined
+        ]
+        if later:
+            raise ValueError(f"{channel.key}: defined before {', '.join(later)}")
+        defined.add(channel.key)
+    return channels
+
+
+@dataclass
+class _Stage:
+    channel: DerivedChannel
+    window: RollingWindow | None
+    outputs: list[DerivedChannel]
+
+
+class DerivedMetrics:
+    def __init__(
+        self,
+        channels: list[DerivedChannel],
+        registry: DecoderRegistry = live_decoders,
+    ):
+        self.registry = registry
+        self.updates = 0
+        self._latest: dict[str, float | str] = {}
+        self._registered: set[str] = set()
+        self._roots: dict[str, tuple[str, ...]] = {}
+        self._affected: dict[str, list[_Stage]] = {}
+        stages: dict[tuple, _Stage] = {}
+        for channel in channels:
+            roots = dict.fromkeys(
+                root
+                for name in channel.inputs
+                for root in self._roots.get(name, (name,))
+            )
+            self._roots[channel.key] = tuple(roots)
+            stage = stages.get(channel.source)
+            if stage is not None:
+                stage.outputs.append(channel)
+                continue
+            window = RollingWindow(channel.window) if channel.window > 0 else None
+            stage = stages[channel.source] = _Stage(channel, window, [channel])
+            for root in roots:
+                self._affected.setdefault(root, []).append(stage)
+
+    def push(
+        self, key: str, timestamp: float, value: float | str
+    ) -> list[tuple[str, float]]:
+        stages = self._affected.get(key)
+        if stages is None:
+            return []
+        latest = self._latest
+        latest[key] = value
+        outputs = []
+        for stage in stages:
+            result = stage.channel.evaluate(latest)
+            if result is None:
+                continue
+            window = stage.window
+            if window is not None:
+                window.push(timestamp, result)
+            for channel in stage.outputs:
+                if window is not None:
+                    result = getattr(window, channel.stat)
+                latest[channel.key] = result
+                if channel.key not in self._registered:
+                    self.registry.register(channel.decoder(self.registry))
+                    self._registered.add(channel.key)
+                outputs.append((channel.key, result))
+        self.updates += len(outputs)
+        return outputs
+
+    def rates(self, source_rates: dict[str, float]) -> dict[str, float]:
+        rates = dict(source_rates)
+        for key, roots in self._roots.items():
+            if key in self._registered:
+                rates[key] = round(sum(source_rates.get(r, 0.0) for r in roots), 2)
+        return rates
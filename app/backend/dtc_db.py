@@ -0,0 +1,275 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+from importlib.metadata import version
+
+MAGIC = b"OBDDTC1\0"
+HEADER = struct.Struct("<IIII")
+RECORD = struct.Struct("<HHII")
+SLOT = struct.Struct("<I")
+EMPTY_SLOT = 0xFFFFFFFF
+GENERIC_PACK = 0
+DTC_LETTERS = "PCBU"
+BUILTIN_PACK_DIR = os.path.join(os.path.dirname(__file__), "dtc_packs")
+DEFAULT_INDEX_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "obd-scanner", "dtc_index.bin"
+)
+
+
+def encode_code(code: str) -> int | None:
+    code = code.strip().upper()
+    if len(code) != 5 or code[0] not in DTC_LETTERS or code[1] not in "0123":
+        return None
+    try:
+        tail = int(code[2:], 16)
+    except ValueError:
+        return None
+    return (DTC_LETTERS.index(code[0]) << 14) | (int(code[1]) << 12) | tail
+
+
+def decode_code(value: int) -> str:
+    return f"{DTC_LETTERS[value >> 14]}{(value >> 12) & 3}{value & 0xFFF:03X}"
+
+
+def prefix_range(prefix: str) -> tuple[int, int] | None:
+    prefix = prefix.strip().upper()
+    if not prefix or len(prefix) > 5:
+        return None
+    low, high = encode_code(prefix + "0000"[: 5 - len(prefix)]), None
+    if len(prefix) == 1:
+        high = encode_code(prefix + "3FFF")
+    else:
+        high = encode_code(prefix + "FFF"[: 5 - len(prefix)])
+    if low is None or high is None:
+        return None
+    return low, high
+
+
+def _slot(code: int, pack: int, mask: int) -> int:
+    return ((code * 2654435761) ^ (pack * 40503)) & mask
+
+
+def pack_files(dirs: list[str]) -> list[str]:
+    files = []
+    for directory in dirs:
+        if os.path.isdir(directory):
+            files.extend(
+                os.path.join(directory, name)
+                for name in sorted(os.listdir(directory))
+                if name.endswith(".json")
+            )
+    return files
+
+
+def fingerprint(files: list[str]) -> list:
+    stamp: list = [version("obd")]
+    for path in files:
+        st = os.stat(path)
+        stamp.append([os.path.abspath(path), st.st_mtime_ns, st.st_size])
+    return stamp
+
+
+def compile_index(files: list[str], path: str) -> int:
+    from obd.codes import DTC as SAE_DTCS
+
+    packs = [{"name": "generic", "wmi": []}]
+    entries: dict[tuple[int, int], str] = {}
+    for code, text in SAE_DTCS.items():
+        value = encode_code(code)
+        if value is not None:
+            entries[value, GENERIC_PACK] = text
+    for file in files:
+        with open(file, encoding="utf-8") as f:
+            data = json.load(f)
+        wmi = [prefix.upper() for prefix in data.get("wmi", [])]
+        pack = GENERIC_PACK if not wmi else len(packs)
+        if wmi:
+            packs.append({"name": data.get("name", os.path.basename(file)), "wmi": wmi})
+        for code, text in data.get("codes", {}).items():
+            value = encode_code(code)
+            if value is not None:
+                entries[value, pack] = text
+    keys = sorted(entries)
+    texts = bytearray()
+    records = bytearray()
+    for code, pack in keys:
+        text = entries[code, pack].encode("utf-8")
+        records += RECORD.pack(code, pack, len(texts), len(text))
+        texts += text
+    slot_count = 1 << max(4, (2 * len(keys) - 1).bit_length())
+    mask = slot_count - 1
+    slots = [EMPTY_SLOT] * slot_count
+    for i, (code, pack) in enumerate(keys):
+        s = _slot(code, pack, mask)
+        while slots[s] != EMPTY_SLOT:
+            s = (s + 1) & mask
+        slots[s] = i
+    meta = json.dumps({"fingerprint": fingerprint(files), "packs": packs}).encode()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(HEADER.pack(len(keys), slot_count, len(meta), len(texts)))
+        f.write(meta)
+        f.write(records)
+        f.write(struct.pack(f"<{slot_count}I", *slots))
+        f.write(texts)
+        f.write(bytes(texts).lower())
+    os.replace(tmp, path)
+    return len(keys)
+
+
+class DTCIndex:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a DTC index")
+        offset = len(MAGIC)
+        self.count, self.slot_count, meta_len, text_len = HEADER.unpack_from(
+            self._map, offset
+        )
+        offset += HEADER.size
+        meta = json.loads(self._map[offset : offset + meta_len])
+        self.fingerprint = meta["fingerprint"]
+        self.packs: list[dict] = meta["packs"]
+        self._records = offset + meta_len
+        self._slots = self._records + self.count * RECORD.size
+        self._texts = self._slots + self.slot_count * SLOT.size
+        self._lower = self._texts + text_len
+        self._mask = self.slot_count - 1
+        self._codes = None
+        self._text_offsets = None
+
+    def close(self):
+        self._map.close()
+
+    def _record(self, i: int) -> tuple[int, int, int, int]:
+        return RECORD.unpack_from(self._map, self._records + i * RECORD.size)
+
+    def _text(self, offset: int, length: int) -> str:
+        start = self._texts + offset
+        return self._map[start : start + length].decode("utf-8")
+
+    def pack_for(self, vin: str) -> int:
+        vin = (vin or "").upper()
+        for i, pack in enumerate(self.packs):
+            if any(vin.startswith(prefix) for prefix in pack["wmi"]):
+                return i
+        return GENERIC_PACK
+
+    def _find(self, code: int, pack: int) -> str | None:
+        s = _slot(code, pack, self._mask)
+        while True:
+            (i,) = SLOT.unpack_from(self._map, self._slots + s * SLOT.size)
+            if i == EMPTY_SLOT:
+                return None
+            record_code, record_pack, offset, length = self._record(i)
+            if record_code == code and record_pack == pack:
+                return self._text(offset, length)
+            s = (s + 1) & self._mask
+
+    def lookup(self, code: str, vin: str = "") -> str | None:
+        value = encode_code(code)
+        if value is None:
+            return None
+        pack = self.pack_for(vin)
+        if pack != GENERIC_PACK:
+            text = self._find(value, pack)
+            if text is not None:
+                return text
+        return self._find(value, GENERIC_PACK)
+
+    def _result(self, i: int) -> tuple[str, str, str]:
+        code, pack, offset, length = self._record(i)
+        return decode_code(code), self._text(offset, length), self.packs[pack]["name"]
+
+    def prefix(self, prefix: str, limit: int = 50) -> list[tuple[str, str, str]]:
+        bounds = prefix_range(prefix)
+        if bounds is None:
+            return []
+        if self._codes is None:
+            self._codes = [self._record(i)[0] for i in range(self.count)]
+        start = bisect.bisect_left(self._codes, bounds[0])
+        stop = min(bisect.bisect_right(self._codes, bounds[1]), start + limit)
+        return [self._result(i) for i in range(start, stop)]
+
+    def search(self, keyword: str, limit: int = 50) -> list[tuple[str, str, str]]:
+        needle = keyword.strip().lower().encode("utf-8")
+        if not needle:
+            return []
+        if self._text_offsets is None:
+            self._text_offsets = [self._record(i)[2] for i in range(self.count)]
+        results, seen = [], set()
+        end = self._lower + (self._lower - self._texts)
+        position = self._map.find(needle, self._lower, end)
+        while position != -1 and len(results) < limit:
+            i = bisect.bisect_right(self._text_offsets, position - self._lower) - 1
+            if i not in seen:
+                seen.add(i)
+                results.append(self._result(i))
+            position = self._map.find(needle, position + 1, end)
+        return results
+
+
+class DTCDatabase:
+    def __init__(
+        self, path: str = DEFAULT_INDEX_PATH, pack_dirs: list[str] | None = None
+    ):
+        self.path = path
+        self.pack_dirs = pack_dirs if pack_dirs is not None else [BUILTIN_PACK_DIR]
+        self._index: DTCIndex | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def index(self) -> DTCIndex:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._open()
+        return self._index
+
+    def _open(self) -> DTCIndex:
+        files = pack_files(self.pack_dirs)
+        stamp = json.loads(json.dumps(fingerprint(files)))
+        try:
+            index = DTCIndex(self.path)
+            if index.fingerprint == stamp:
+                return index
+            index.close()
+        except (OSError, ValueError):
+            pass
+        compile_index(files, self.path)
+        return DTCIndex(self.path)
+
+    def rebuild(self):
+        with self._lock:
+            if self._index is not None:
+                self._index.close()
+            self._index = None
+            compile_index(pack_files(self.pack_dirs), self.path)
+
+    def lookup(self, code: str, vin: str = "") -> str | None:
+        return self.index.lookup(code, vin)
+
+    def describe(self, code: str, fallback: str = "", vin: str = "") -> str:
+        return self.lookup(code, vin) or fallback
+
+    def search(self, query: str, limit: int = 50) -> list[tuple[str, str, str]]:
+        if prefix_range(query) is not None:
+            results = self.index.prefix(query, limit)
+            if results:
+                return results
+        return self.index.search(query, limit)
+
+
+dtc_database = DTCDatabase(
+    os.getenv("OBD_DTC_INDEX", DEFAULT_INDEX_PATH),
+    [BUILTIN_PACK_DIR]
+    + [p for p in os.getenv("OBD_DTC_PACKS", "").split(os.pathsep) if p],
+)
@@ -0,0 +1,126 @@
+import threading
+import time
+from dataclasses import dataclass, field
+
+import obd
+from obd.decoders import dtc as decode_dtcs
+
+from app.backend.dtc_db import DTCDatabase, dtc_database
+
+GET_PERMANENT_DTC = obd.OBDCommand(
+    "GET_PERMANENT_DTC", "Get Permanent DTCs", b"0A", 0, decode_dtcs, obd.ECU.ALL
+)
+DTC_KINDS: dict[str, obd.OBDCommand] = {
+    "stored": obd.commands.GET_DTC,
+    "pending": obd.commands.GET_CURRENT_DTC,
+    "permanent": GET_PERMANENT_DTC,
+}
+ECU_NAMES = {obd.ECU.ENGINE: "Engine", obd.ECU.TRANSMISSION: "Transmission"}
+
+
+@dataclass
+class DTCRecord:
+    code: str
+    description: str
+    kind: str
+    ecu: str
+    first_seen: float
+    last_seen: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.kind}:{self.ecu}:{self.code}"
+
+
+@dataclass
+class DTCDiff:
+    added: list[DTCRecord] = field(default_factory=list)
+    removed: list[DTCRecord] = field(default_factory=list)
+    current: list[DTCRecord] = field(default_factory=list)
+    responded: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+def _ecu_name(message) -> str:
+    if message.ecu in ECU_NAMES:
+        return ECU_NAMES[message.ecu]
+    return f"ECU {message.tx_id:X}" if message.tx_id is not None else ""
+
+
+def codes_by_ecu(response: obd.OBDResponse) -> dict[str, list[tuple[str, str]]]:
+    messages = [m for m in response.messages if m.data]
+    if not messages:
+        return {"": list(response.value or [])}
+    by_ecu: dict[str, list[tuple[str, str]]] = {}
+    for message in messages:
+        by_ecu.setdefault(_ecu_name(message), []).extend(decode_dtcs([message]))
+    return by_ecu
+
+
+class DTCScanner:
+    def __init__(
+        self,
+        vin: str = "",
+        kinds: tuple[str, ...] = tuple(DTC_KINDS),
+        database: DTCDatabase = dtc_database,
+    ):
+        self.vin = vin
+        self.kinds = kinds
+        self.database = database
+        self.records: dict[str, DTCRecord] = {}
+        self.scans = 0
+        self._lock = threading.Lock()
+
+    def query(self, connection) -> dict[str, obd.OBDResponse]:
+        return {
+            kind: connection.query(DTC_KINDS[kind], force=True) for kind in self.kinds
+        }
+
+    def apply(
+        self, responses: dict[str, obd.OBDResponse], now: float | None = None
+    ) -> DTCDiff:
+        now = time.time() if now is None else now
+        diff = DTCDiff()
+        with self._lock:
+            seen: set[str] = set()
+            for kind, response in responses.items():
+                if response.is_null():
+                    continue
+                diff.responded.append(kind)
+                for ecu, codes in codes_by_ecu(response).items():
+                    for code, description in codes:
+                        record = DTCRecord(code, description, kind, ecu, now, now)
+                        previous = self.records.get(record.key)
+                        if previous is None:
+                            record.description = self.database.describe(
+                                code, description, self.vin
+                            )
+                            self.records[record.key] = record
+                            diff.added.append(record)
+                        else:
+                            previous.last_seen = now
+                        seen.add(record.key)
+            for key, record in list(self.records.items()):
+                if record.kind in diff.responded and key not in seen:
+                    del self.records[key]
+                    diff.removed.append(record)
+            diff.current = list(self.records.values())
+            self.scans += 1
+        return diff
+
+    def scan(self, connection) -> DTCDiff:
+        started = time.perf_counter()
+        diff = self.apply(self.query(connection))
+        diff.seconds = time.perf_counter() - started
+        return diff
+
+    def forget(self, kinds: tuple[str, ...]) -> list[DTCRecord]:
+        with self._lock:
+            dropped = [r for r in self.records.values() if r.kind in kinds]
+            for record in dropped:
+                del self.records[record.key]
+        return dropped
@@ -0,0 +1,697 @@
+import argparse
+import heapq
+import itertools
+import json
+import math
+import os
+import random
+import selectors
+import threading
+import time
+import tty
+from dataclasses import dataclass, field
+from typing import Callable
+
+ELM_VERSION = "ELM327 v1.5"
+PROMPT = ">"
+DTC_LETTERS = "PCBU"
+CAN_PROTOCOLS = {
+    "6": ("ISO 15765-4 (CAN 11/500)", 11),
+    "7": ("ISO 15765-4 (CAN 29/500)", 29),
+    "8": ("ISO 15765-4 (CAN 11/250)", 11),
+    "9": ("ISO 15765-4 (CAN 29/250)", 29),
+}
+AT_OK_COMMANDS = (
+    "AT",
+    "CAF",
+    "CFC",
+    "D",
+    "M",
+    "R",
+    "SH",
+    "ST",
+    "SP",
+    "SPA",
+    "TP",
+    "TPA",
+    "LP",
+)
+
+
+def _clamp(value: float, low: int, high: int) -> int:
+    return max(low, min(high, int(round(value))))
+
+
+def _u8(scale: float = 1.0, offset: float = 0.0) -> Callable[[float], bytes]:
+    return lambda v: bytes([_clamp((v + offset) * scale, 0, 0xFF)])
+
+
+def _u16(scale: float = 1.0, offset: float = 0.0) -> Callable[[float], bytes]:
+    return lambda v: _clamp((v + offset) * scale, 0, 0xFFFF).to_bytes(2, "big")
+
+
+def _fuel_status(v: float) -> bytes:
+    return bytes([1 << _clamp(v, 0, 4), 0])
+
+
+MODE01_ENCODERS: dict[str, tuple[int, Callable[[float], bytes]]] = {
+    "FUEL_STATUS": (0x03, _fuel_status),
+    "ENGINE_LOAD": (0x04, _u8(255 / 100)),
+    "COOLANT_TEMP": (0x05, _u8(1, 40)),
+    "SHORT_FUEL_TRIM_1": (0x06, _u8(128 / 100, 100)),
+    "LONG_FUEL_TRIM_1": (0x07, _u8(128 / 100, 100)),
+    "INTAKE_PRESSURE": (0x0B, _u8()),
+    "RPM": (0x0C, _u16(4)),
+    "SPEED": (0x0D, _u8()),
+    "TIMING_ADVANCE": (0x0E, _u8(2, 64)),
+    "INTAKE_TEMP": (0x0F, _u8(1, 40)),
+    "MAF": (0x10, _u16(100)),
+    "THROTTLE_POS": (0x11, _u8(255 / 100)),
+    "RUN_TIME": (0x1F, _u16()),
+    "FUEL_LEVEL": (0x2F, _u8(255 / 100)),
+    "BAROMETRIC_PRESSURE": (0x33, _u8()),
+    "CONTROL_MODULE_VOLTAGE": (0x42, _u16(1000)),
+    "AMBIANT_AIR_TEMP": (0x46, _u8(1, 40)),
+    "OIL_TEMP": (0x5C, _u8(1, 40)),
+}
+
+
+@dataclass
+class Signal:
+    base: float = 0.0
+    amplitude: float = 0.0
+    period: float = 0.0
+    noise: float = 0.0
+    points: list[tuple[float, float]] = field(default_factory=list)
+
+    @classmethod
+    def from_spec(cls, spec) -> "Signal":
+        if isinstance(spec, (int, float)):
+            return cls(base=float(spec))
+        points = [(float(t), float(v)) for t, v in spec.get("points", [])]
+        return cls(
+            base=float(spec.get("base", 0.0)),
+            amplitude=float(spec.get("amplitude", 0.0)),
+            period=float(spec.get("period", 0.0)),
+            noise=float(spec.get("noise", 0.0)),
+            points=points,
+        )
+
+    def __call__(self, t: float, rng: random.Random) -> float:
+        value = self.base
+        if self.points:
+            value += self._interpolate(
+                t % self.points[-1][0] if self.points[-1][0] else 0
+            )
+        if self.amplitude and self.period:
+            value += self.amplitude * math.sin(2 * math.pi * t / self.period)
+        if self.noise:
+            value += rng.gauss(0.0, self.noise)
+        return value
+
+    def _interpolate(self, t: float) -> float:
+        prev_t, prev_v = self.points[0]
+        for point_t, point_v in self.points:
+            if t <= point_t:
+                if point_t == prev_t:
+                    return point_v
+                return prev_v + (point_v - prev_v) * (t - prev_t) / (point_t - prev_t)
+            prev_t, prev_v = point_t, point_v
+        return prev_v
+
+
+@dataclass
+class LinkConfig:
+    latency: float = 0.03
+    jitter: float = 0.01
+    error_rate: float = 0.0
+    baudrate: int = 38400
+    seed: int | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LinkConfig":
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+@dataclass
+class VehicleProfile:
+    name: str
+    vin: str
+    protocol: str = "6"
+    signals: dict[str, Signal] = field(default_factory=dict)
+    dtcs: list[str] = field(default_factory=list)
+    pending_dtcs: list[str] = field(default_factory=list)
+    permanent_dtcs: list[str] = field(default_factory=list)
+    monitors: dict[int, list[tuple[int, int, int, int, int]]] = field(
+        default_factory=dict
+    )
+    multi_pid: bool = True
+    voltage: float = 12.6
+    link: LinkConfig = field(default_factory=LinkConfig)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "VehicleProfile":
+        protocol = str(data.get("protocol", "6")).upper()
+        if protocol not in CAN_PROTOCOLS:
+            raise ValueError(f"Unsupported emulator protocol: {protocol}")
+        signals = {
+            name.upper(): Signal.from_spec(spec)
+            for name, spec in data.get("signals", {}).items()
+        }
+        unknown = set(signals) - set(MODE01_ENCODERS)
+        if unknown:
+            raise ValueError(f"Unknown PIDs in profile: {', '.join(sorted(unknown))}")
+        return cls(
+            name=data.get("name", "custom"),
+            vin=data.get("vin", "5YJEMU7A8KF123457"),
+            protocol=protocol,
+            signals=signals,
+            dtcs=[code.upper() for code in data.get("dtcs", [])],
+            pending_dtcs=[code.upper() for code in data.get("pending_dtcs", [])],
+            permanent_dtcs=[code.upper() for code in data.get("permanent_dtcs", [])],
+            monitors={
+                int(mid, 16): [tuple(int(v) for v in test) for test in tests]
+                for mid, tests in data.get("monitors", {}).items()
+            },
+            multi_pid=bool(data.get("multi_pid", True)),
+            voltage=float(data.get("voltage", 12.6)),
+            link=LinkConfig.from_dict(data.get("link", {})),
+        )
+
+    def with_vin(self, vin: str) -> "VehicleProfile":
+        return VehicleProfile(
+            name=self.name,
+            vin=vin,
+            protocol=self.protocol,
+            signals=self.signals,
+            dtcs=list(self.dtcs),
+            pending_dtcs=list(self.pending_dtcs),
+            permanent_dtcs=list(self.permanent_dtcs),
+            monitors=self.monitors,
+            multi_pid=self.multi_pid,
+            voltage=self.voltage,
+            link=self.link,
+        )
+
+
+BUILTIN_PROFILES: dict[str, dict] = {
+    "default": {
+        "name": "default",
+        "vin": "5YJEMU7A8KF123457",
+        "signals": {
+            "RPM": {"base": 850, "amplitude": 60, "period": 4, "noise": 10},
+            "SPEED": 0,
+            "COOLANT_TEMP": {"base": 90, "noise": 0.3},
+            "ENGINE_LOAD": {"base": 35.5, "amplitude": 3, "period": 7},
+            "FUEL_STATUS": 1,
+            "INTAKE_TEMP": 28,
+            "MAF": {"base": 3.2, "noise": 0.1},
+            "THROTTLE_POS": 14,
+        },
+        "dtcs": ["P0420", "P0301", "P0171"],
+        "pending_dtcs": ["P0442"],
+        "permanent_dtcs": ["P0420"],
+        "monitors": {
+            "01": [[5, 0x10, 72, 0, 100], [6, 0x10, 64, 0, 100]],
+            "21": [[0x80, 0x01, 672, 0, 512]],
+            "A2": [[0x0B, 0x24, 12, 0, 40], [0x0C, 0x24, 55, 0, 40]],
+        },
+    },
+    "highway": {
+        "name": "highway",
+        "vin": "WBAEMU5C9JB654389",
+        "signals": {
+            "RPM": {"base": 2600, "amplitude": 250, "period": 20, "noise": 25},
+            "SPEED": {"base": 110, "amplitude": 8, "period": 30, "noise": 0.5},
+            "COOLANT_TEMP": {"base": 94, "noise": 0.5},
+            "ENGINE_LOAD": {"base": 55, "amplitude": 12, "period": 9, "noise": 1},
+            "FUEL_STATUS": 1,
+            "INTAKE_TEMP": 35,
+            "MAF": {"base": 22, "amplitude": 5, "period": 9, "noise": 0.4},
+            "THROTTLE_POS": {"base": 24, "amplitude": 6, "period": 9},
+            "FUEL_LEVEL": 62,
+        },
+        "dtcs": [],
+    },
+    "city": {
+        "name": "city",
+        "vin": "3FAEMU3H7MR000543",
+        "protocol": "7",
+        "signals": {
+            "RPM": {"points": [[0, 800], [5, 3200], [12, 1800], [20, 800]]},
+            "SPEED": {"points": [[0, 0], [5, 30], [12, 50], [20, 0]]},
+            "COOLANT_TEMP": {"base": 88, "noise": 0.5},
+            "ENGINE_LOAD": {"points": [[0, 20], [5, 80], [12, 40], [20, 20]]},
+            "FUEL_STATUS": 1,
+            "THROTTLE_POS": {"points": [[0, 12], [5, 60], [12, 25], [20, 12]]},
+        },
+        "dtcs": ["P0128"],
+        "pending_dtcs": ["P1000"],
+        "monitors": {"01": [[5, 0x10, 58, 0, 100]]},
+        "multi_pid": False,
+    },
+}
+
+
+def load_profile(source: str) -> VehicleProfile:
+    if source in BUILTIN_PROFILES:
+        return VehicleProfile.from_dict(BUILTIN_PROFILES[source])
+    with open(source, encoding="utf-8") as f:
+        return VehicleProfile.from_dict(json.load(f))
+
+
+def encode_dtc(code: str) -> bytes:
+    first = (DTC_LETTERS.index(code[0]) << 6) | (int(code[1]) << 4) | int(code[2], 16)
+    return bytes([first, int(code[3:5], 16)])
+
+
+class ELM327Session:
+    def __init__(self, profile: VehicleProfile):
+        self.profile = profile
+        self.rng = random.Random(profile.link.seed)
+        self.started = time.monotonic()
+        self.dtcs = list(profile.dtcs)
+        self.pending_dtcs = list(profile.pending_dtcs)
+        self.permanent_dtcs = list(profile.permanent_dtcs)
+        self.monitors = dict(profile.monitors)
+        self.freeze_dtc = self.dtcs[0] if self.dtcs else ""
+        self.freeze_frame = {
+            name: signal(0.0, self.rng)
+            for name, signal in profile.signals.items()
+            if self.freeze_dtc
+        }
+        self.last_command = ""
+        self.reset()
+
+    def reset(self):
+        self.echo = True
+        self.headers = False
+        self.spaces = True
+        self.linefeeds = False
+
+    @property
+    def supported_pids(self) -> list[int]:
+        pids = [0x01]
+        pids.extend(MODE01_ENCODERS[name][0] for name in self.profile.signals)
+        return sorted(pids)
+
+    def handle(self, raw: str) -> tuple[str, float]:
+        command = raw.replace(" ", "").upper()
+        if not command:
+            command = self.last_command
+        else:
+            self.last_command = command
+        echo = self.echo
+        if command.startswith("AT"):
+            lines = self._handle_at(command[2:])
+            delay = 0.0
+        else:
+            lines = self._handle_obd(command)
+            delay = self._link_delay()
+        eol = "\r\n" if self.linefeeds else "\r"
+        body = eol.join(lines) + eol + eol + PROMPT
+        if echo:
+            body = raw + eol + body
+        return body, delay + len(body) * 10 / self.profile.link.baudrate
+
+    def _link_delay(self) -> float:
+        link = self.profile.link
+        return max(0.0, link.latency + self.rng.uniform(-link.jitter, link.jitter))
+
+    def _handle_at(self, command: str) -> list[str]:
+        if command == "Z":
+            self.reset()
+            return ["", ELM_VERSION]
+        if command == "I":
+            return [ELM_VERSION]
+        if command == "@1":
+            return ["OBDII to RS232 Interpreter"]
+        if command == "RV":
+            return [f"{self.profile.voltage:.1f}V"]
+        if command == "DPN":
+            return [f"A{self.profile.protocol}"]
+        if command == "DP":
+            return [f"AUTO, {CAN_PROTOCOLS[self.profile.protocol][0]}"]
+        toggles = {"E": "echo", "H": "headers", "S": "spaces", "L": "linefeeds"}
+        if len(command) == 2 and command[0] in toggles and command[1] in "01":
+            setattr(self, toggles[command[0]], command[1] == "1")
+            return ["OK"]
+        if command.startswith(AT_OK_COMMANDS):
+            return ["OK"]
+        return ["?"]
+
+    def _handle_obd(self, command: str) -> list[str]:
+        try:
+            bytes.fromhex(command[: len(command) & ~1])
+        except ValueError:
+            return ["?"]
+        if len(command) > 2 and len(command) % 2:
+            command = command[:-1]
+        if (
+            self.profile.link.error_rate
+            and self.rng.random() < self.profile.link.error_rate
+        ):
+            return ["NO DATA"]
+        mode, payload = command[:2], bytes.fromhex(command[2:])
+        if mode == "01":
+            data = self._mode01(payload)
+        elif mode == "03":
+            data = self._dtc_list(0x43, self.dtcs)
+        elif mode == "02":
+            data = self._mode02(payload)
+        elif mode == "04":
+            self.dtcs.clear()
+            self.pending_dtcs.clear()
+            self.monitors.clear()
+            self.freeze_frame.clear()
+            self.freeze_dtc = ""
+            data = b"\x44"
+        elif mode == "06":
+            data = self._mode06(payload)
+        elif mode == "07":
+            data = self._dtc_list(0x47, self.pending_dtcs)
+        elif mode == "0A":
+            data = self._dtc_list(0x4A, self.permanent_dtcs)
+        elif mode == "09":
+            data = self._mode09(payload)
+        else:
+            data = None
+        if not data:
+            return ["NO DATA"]
+        return self._frames(data)
+
+    def _mode01(self, pids: bytes) -> bytes | None:
+        if not pids or len(pids) > 6 or (len(pids) > 1 and not self.profile.multi_pid):
+            return None
+        t = time.monotonic() - self.started
+        out = bytearray([0x41])
+        for pid in pids:
+            value = self._pid_value(pid, t)
+            if value is not None:
+                out += bytes([pid]) + value
+        return bytes(out) if len(out) > 1 else None
+
+    def _pid_value(self, pid: int, t: float) -> bytes | None:
+        supported = self.supported_pids
+        if pid % 0x20 == 0:
+            return self._support_bitmap(pid, supported)
+        if pid == 0x01:
+            mil = 0x80 if self.dtcs else 0
+            return bytes([mil | min(len(self.dtcs), 0x7F), 0x07, 0xE5, 0x00])
+        for name, signal in self.profile.signals.items():
+            number, encode = MODE01_ENCODERS[name]
+            if number == pid:
+                return encode(signal(t, self.rng))
+        return None
+
+    def _mode02(self, payload: bytes) -> bytes | None:
+        if not self.freeze_frame or not payload or len(payload) % 2:
+            return None
+        if len(payload) > 6 or (len(payload) > 2 and not self.profile.multi_pid):
+            return None
+        out = bytearray([0x42])
+        for pid, frame in zip(payload[::2], payload[1::2]):
+            value = self._freeze_value(pid) if frame == 0 else None
+            if value is not None:
+                out += bytes([pid, frame]) + value
+        return bytes(out) if len(out) > 1 else None
+
+    def _freeze_value(self, pid: int) -> bytes | None:
+        if pid % 0x20 == 0:
+            supported = [0x02]
+            supported.extend(MODE01_ENCODERS[name][0] for name in self.freeze_frame)
+            return self._support_bitmap(pid, sorted(supported))
+        if pid == 0x02:
+            return encode_dtc(self.freeze_dtc)
+        for name, value in self.freeze_frame.items():
+            number, encode = MODE01_ENCODERS[name]
+            if number == pid:
+                return encode(value)
+        return None
+
+    def _mode06(self, payload: bytes) -> bytes | None:
+        if len(payload) != 1:
+            return None
+        mid = payload[0]
+        if mid % 0x20 == 0:
+            bitmap = self._support_bitmap(mid, sorted(self.monitors))
+            return bytes([0x46, mid]) + bitmap if bitmap else None
+        out = bytearray([0x46])
+        for tid, uas, value, low, high in self.monitors.get(mid, []):
+            out += bytes([mid, tid, uas])
+            out += b"".join(v.to_bytes(2, "big") for v in (value, low, high))
+        return bytes(out) if len(out) > 1 else None
+
+    @staticmethod
+    def _support_bitmap(base: int, supported: list[int]) -> bytes | None:
+        bits = 0
+        for pid in supported:
+            if base < pid <= base + 0x20:
+                bits |= 1 << (0x20 - (pid - base))
+        if any(pid > base + 0x20 for pid in supported):
+            bits |= 1
+        if base and not bits:
+            return None
+        return bits.to_bytes(4, "big")
+
+    @staticmethod
+    def _dtc_list(service: int, codes: list[str]) -> bytes:
+        out = bytearray([service, len(codes)])
+        for code in codes:
+            out += encode_dtc(code)
+        return bytes(out)
+
+    def _mode09(self, payload: bytes) -> bytes | None:
+        if payload == b"\x00":
+            return b"\x49\x00\xc0\x00\x00\x00"
+        if payload == b"\x01":
+            return b"\x49\x01\x05"
+        if payload == b"\x02":
+            return b"\x49\x02\x01" + self.profile.vin.encode("ascii")[:17]
+        return None
+
+    def _frames(self, data: bytes) -> list[str]:
+        if len(data) <= 7:
+            frames = [bytes([len(data)]) + data]
+        else:
+            frames = [bytes([0x10 | (len(data) >> 8), len(data) & 0xFF]) + data[:6]]
+            for i, start in enumerate(range(6, len(data), 7), start=1):
+                frames.append(bytes([0x20 | (i & 0x0F)]) + data[start : start + 7])
+        sep = " " if self.spaces else ""
+        if not self.headers:
+            if len(frames) == 1:
+                return [sep.join(f"{b:02X}" for b in data)]
+            lines = [f"{len(data):03X}"]
+            for i, frame in enumerate(frames):
+                chunk = frame[2:] if i == 0 else frame[1:]
+                lines.append(f"{i}:{sep}" + sep.join(f"{b:02X}" for b in chunk))
+            return lines
+        if CAN_PROTOCOLS[self.profile.protocol][1] == 11:
+            header = "7E8"
+        else:
+            header = sep.join(["18", "DA", "F1", "10"])
+        return [header + sep + sep.join(f"{b:02X}" for b in frame) for frame in frames]
+
+
+class EmulatedAdapter:
+    def __init__(self, hub: "EmulatorHub", profile: VehicleProfile):
+        self.hub = hub
+        self.profile = profile
+        self.session = ELM327Session(profile)
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        os.set_blocking(self.master_fd, False)
+        self.port = os.ttyname(self.slave_fd)
+        self.busy_until = 0.0
+        self.commands_handled = 0
+        self._inbox = bytearray()
+        self._outbox = bytearray()
+
+    def on_readable(self, now: float):
+        try:
+            data = os.read(self.master_fd, 4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            return
+        self._inbox += data
+        while b"\r" in self._inbox:
+            line, _, rest = self._inbox.partition(b"\r")
+            self._inbox = bytearray(rest)
+            text = line.replace(b"\n", b"").decode("ascii", "ignore")
+            response, delay = self.session.handle(text)
+            self.commands_handled += 1
+            due = max(now, self.busy_until) + delay
+            self.busy_until = due
+            self.hub._schedule(due, self, response.encode("ascii"))
+
+    def send(self, data: bytes):
+        self._outbox += data
+        self.flush()
+
+    def flush(self):
+        while self._outbox:
+            try:
+                written = os.write(self.master_fd, self._outbox)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                self._outbox.clear()
+                return
+            del self._outbox[:written]
+
+    @property
+    def pending_output(self) -> bool:
+        return bool(self._outbox)
+
+    def close(self):
+        for fd in (self.master_fd, self.slave_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class EmulatorHub:
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._queue: list[tuple[float, int, EmulatedAdapter, bytes]] = []
+        self._counter = itertools.count()
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+        self._pending_ops: list[tuple[str, EmulatedAdapter]] = []
+        self.adapters: list[EmulatedAdapter] = []
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="elm327-emulator", daemon=True
+        )
+        self._thread.start()
+
+    def spawn(self, profile: VehicleProfile) -> EmulatedAdapter:
+        adapter = EmulatedAdapter(self, profile)
+        with self._lock:
+            self.adapters.append(adapter)
+            self._pending_ops.append(("add", adapter))
+        self._wake()
+        return adapter
+
+    def spawn_fleet(self, profile: VehicleProfile, count: int) -> list[EmulatedAdapter]:
+        if count == 1:
+            return [self.spawn(profile)]
+        return [
+            self.spawn(profile.with_vin(f"{profile.vin[:12]}{i:04d}{profile.vin[-1]}"))
+            for i in range(1, count + 1)
+        ]
+
+    def remove(self, adapter: EmulatedAdapter):
+        with self._lock:
+            if adapter in self.adapters:
+                self.adapters.remove(adapter)
+                self._pending_ops.append(("remove", adapter))
+        self._wake()
+
+    def shutdown(self):
+        self._running = False
+        self._wake()
+        self._thread.join(timeout=2)
+        for adapter in self.adapters:
+            adapter.close()
+        self.adapters = []
+
+    def _wake(self):
+        try:
+            os.write(self._wakeup_w, b"\0")
+        except OSError:
+            pass
+
+    def _schedule(self, due: float, adapter: EmulatedAdapter, data: bytes):
+        heapq.heappush(self._queue, (due, next(self._counter), adapter, data))
+
+    def _apply_pending_ops(self):
+        with self._lock:
+            ops, self._pending_ops = self._pending_ops, []
+        for op, adapter in ops:
+            if op == "add":
+                self._selector.register(
+                    adapter.master_fd, selectors.EVENT_READ, adapter
+                )
+            else:
+                self._selector.unregister(adapter.master_fd)
+                adapter.close()
+
+    def _run(self):
+        while self._running:
+            self._apply_pending_ops()
+            timeout = None
+            if self._queue:
+                timeout = max(0.0, self._queue[0][0] - time.monotonic())
+            for key, mask in self._selector.select(timeout):
+                if key.data is None:
+                    try:
+                        os.read(self._wakeup_r, 4096)
+                    except BlockingIOError:
+                        pass
+                    continue
+                adapter = key.data
+                if mask & selectors.EVENT_READ:
+                    adapter.on_readable(time.monotonic())
+                if mask & selectors.EVENT_WRITE:
+                    adapter.flush()
+            now = time.monotonic()
+            while self._queue and self._queue[0][0] <= now:
+                _, _, adapter, data = heapq.heappop(self._queue)
+                adapter.send(data)
+            for adapter in self.adapters:
+                events = selectors.EVENT_READ
+                if adapter.pending_output:
+                    events |= selectors.EVENT_WRITE
+                try:
+                    self._selector.modify(adapter.master_fd, events, adapter)
+                except (KeyError, ValueError):
+                    pass
+
+
+_shared_hub: EmulatorHub | None = None
+_shared_ports: dict[tuple[str, int], list[str]] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_hub() -> EmulatorHub:
+    global _shared_hub
+    with _shared_lock:
+        if _shared_hub is None:
+            _shared_hub = EmulatorHub()
+        return _shared_hub
+
+
+def shared_fleet_ports(source: str, count: int = 1) -> list[str]:
+    hub = shared_hub()
+    with _shared_lock:
+        key = (source, count)
+        if key not in _shared_ports:
+            adapters = hub.spawn_fleet(load_profile(source), count)
+            _shared_ports[key] = [adapter.port for adapter in adapters]
+        return list(_shared_ports[key])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve simulated ELM327 adapters on pseudo-terminals."
+    )
+    parser.add_argument("--profile", default="default")
+    parser.add_argument("--count", type=int, default=1)
+    args = parser.parse_args()
+    hub = EmulatorHub()
+    for adapter in hub.spawn_fleet(load_profile(args.profile), args.count):
+        print(f"{adapter.port}\t{adapter.profile.name}\t{adapter.profile.vin}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        hub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
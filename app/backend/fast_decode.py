@@ -0,0 +1,116 @@
+import re
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class FastFormula:
+    name: str
+    size: int
+    scale: float
+    offset: float
+    unit: str
+
+
+FAST_FORMULAS: dict[int, FastFormula] = {
+    0x04: FastFormula("ENGINE_LOAD", 1, 100 / 255, 0.0, "percent"),
+    0x05: FastFormula("COOLANT_TEMP", 1, 1.0, -40.0, "degree_Celsius"),
+    0x0B: FastFormula("INTAKE_PRESSURE", 1, 1.0, 0.0, "kilopascal"),
+    0x0C: FastFormula("RPM", 2, 0.25, 0.0, "revolutions_per_minute"),
+    0x0D: FastFormula("SPEED", 1, 1.0, 0.0, "kilometer_per_hour"),
+    0x0E: FastFormula("TIMING_ADVANCE", 1, 0.5, -64.0, "degree"),
+    0x0F: FastFormula("INTAKE_TEMP", 1, 1.0, -40.0, "degree_Celsius"),
+    0x10: FastFormula("MAF", 2, 0.01, 0.0, "gps"),
+    0x11: FastFormula("THROTTLE_POS", 1, 100 / 255, 0.0, "percent"),
+    0x2F: FastFormula("FUEL_LEVEL", 1, 100 / 255, 0.0, "percent"),
+}
+HEADER_CHARS = {"6": 3, "7": 8, "8": 3, "9": 8}
+FRAME_LINE = re.compile(r"[0-9A-Fa-f]+")
+
+
+class FastResponse:
+    __slots__ = ("command", "value", "time", "unit")
+
+    def __init__(self, command, value: float, timestamp: float, unit: str):
+        self.command = command
+        self.value = value
+        self.time = timestamp
+        self.unit = unit
+
+    def is_null(self) -> bool:
+        return False
+
+
+def is_fast(command) -> bool:
+    return command.mode == 1 and command.pid in FAST_FORMULAS
+
+
+def decode_payload(
+    data: bytes, skip: dict[int, int] | None = None
+) -> list[tuple[int, float]]:
+    values = []
+    if not data or data[0] != 0x41:
+        return values
+    i, end = 1, len(data)
+    while i < end:
+        formula = FAST_FORMULAS.get(data[i])
+        if formula is None:
+            if skip is None or data[i] not in skip:
+                break
+            i += 1 + skip[data[i]]
+            continue
+        if i + 1 + formula.size > end:
+            break
+        raw = data[i + 1] if formula.size == 1 else (data[i + 1] << 8) | data[i + 2]
+        values.append((data[i], raw * formula.scale + formula.offset))
+        i += 1 + formula.size
+    return values
+
+
+def count_frames(lines: list[str]) -> int:
+    return sum(1 for line in lines if FRAME_LINE.fullmatch(line.replace(" ", "")))
+
+
+def reassemble(lines: list[str], header_chars: int = 3) -> list[bytes]:
+    payloads: dict[str, bytearray] = {}
+    expected: dict[str, int] = {}
+    for line in lines:
+        compact = line.replace(" ", "")
+        header, body_hex = compact[:header_chars], compact[header_chars:]
+        try:
+            body = bytes.fromhex(body_hex)
+        except ValueError:
+            continue
+        if not body:
+            continue
+        kind = body[0] >> 4
+        if kind == 0:
+            expected[header] = body[0] & 0x0F
+            payloads[header] = bytearray(body[1 : 1 + expected[header]])
+        elif kind == 1 and len(body) > 1:
+            expected[header] = ((body[0] & 0x0F) << 8) | body[1]
+            payloads[header] = bytearray(body[2:])
+        elif kind == 2 and header in payloads:
+            payloads[header] += body[1:]
+    return [
+        bytes(payload[: expected[header]])
+        for header, payload in payloads.items()
+        if len(payload) >= expected[header]
+    ]
+
+
+def decode_lines(
+    lines: list[str], header_chars: int = 3, skip: dict[int, int] | None = None
+) -> dict[int, float]:
+    values: dict[int, float] = {}
+    for payload in reassemble(lines, header_chars):
+        for pid, value in decode_payload(payload, skip):
+            values.setdefault(pid, value)
+    return values
+
+
+def decode_buffer(buffer: bytes, header_chars: int = 3) -> list[dict[int, float]]:
+    return [
+        decode_lines(block.decode("ascii", "ignore").split("\r"), header_chars)
+        for block in buffer.split(b">")
+        if block.strip()
+    ]
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+import obd
+
+from app.backend.broker import AdapterBroker, AdapterChannel, adapter_broker
+from app.backend.connection import ConnectConfig
+
+DEFAULT_MAX_WORKERS = 8
+
+
+@dataclass
+class FleetVehicle:
+    port: str
+    channel: AdapterChannel
+    status: str = "NOT_CONNECTED"
+    vin: str = ""
+    error: str = ""
+    dtcs: list[tuple[str, str]] = field(default_factory=list)
+    connect_seconds: float = 0.0
+    scan_seconds: float = 0.0
+    commands: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "port": self.port,
+            "vin": self.vin,
+            "status": self.status,
+            "error": self.error,
+            "dtc_count": len(self.dtcs),
+            "dtcs": ", ".join(code for code, _ in self.dtcs),
+            "connect_ms": round(self.connect_seconds * 1e3, 1),
+            "scan_ms": round(self.scan_seconds * 1e3, 1),
+            "commands": self.commands,
+        }
+
+
+class FleetManager:
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        broker: AdapterBroker = adapter_broker,
+    ):
+        self.max_workers = max_workers
+        self.broker = broker
+        self.vehicles: dict[str, FleetVehicle] = {}
+        self.last_scan_count = 0
+        self.last_scan_wall = 0.0
+        self.last_scan_serial = 0.0
+        self._slots: asyncio.Semaphore | None = None
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        return self._slots
+
+    async def _run(self, vehicle: FleetVehicle, func, *args):
+        async with self.slots:
+            started = time.perf_counter()
+            try:
+                return await vehicle.channel.run(func, *args)
+            finally:
+                vehicle.busy_seconds += time.perf_counter() - started
+
+    async def connect(self, port: str, config: ConnectConfig | None = None):
+        vehicle = self.vehicles.get(port)
+        if vehicle is not None and vehicle.status in ("CONNECTED", "CONNECTING"):
+            return
+        channel = self.broker.channel(port, config)
+        vehicle = self.vehicles[port] = FleetVehicle(port, channel, "CONNECTING")
+        started, attached = time.perf_counter(), False
+        try:
+            async with self.slots:
+                if vehicle.status == "CONNECTING":
+                    attached = True
+                    await channel.attach()
+        except asyncio.CancelledError:
+            if attached:
+                await channel.detach()
+            raise
+        except Exception as e:
+            if vehicle.status == "CONNECTING":
+                logging.exception(e)
+                vehicle.status, vehicle.error = "ERROR", str(e)
+                vehicle.errors += 1
+            await channel.detach()
+            return
+        finally:
+            vehicle.connect_seconds = time.perf_counter() - started
+        if vehicle.status == "CANCELLED":
+            if attached:
+                await channel.detach()
+            return
+        vehicle.vin = channel.vin or "N/A"
+        vehicle.status = "CONNECTED"
+
+    async def disconnect(self, port: str):
+        vehicle = self.vehicles.pop(port, None)
+        if vehicle is None or vehicle.status == "ERROR":
+            return
+        channel = vehicle.channel
+        if vehicle.status == "CONNECTING":
+            vehicle.status = "CANCELLED"
+            if channel.sessions == 1 and channel.bringup is not None:
+                channel.bringup.cancel()
+            return
+        await channel.detach()
+
+    async def scan(self, port: str):
+        vehicle = self.vehicles.get(port)
+        if vehicle is None or vehicle.status != "CONNECTED":
+            return
+        started = time.perf_counter()
+        try:
+            response = await self._run(
+                vehicle, vehicle.channel.query, obd.commands.GET_DTC
+            )
+        except Exception as e:
+            logging.exception(e)
+            vehicle.error = f"Error reading DTCs: {e}"
+            vehicle.errors += 1
+            return
+        finally:
+            vehicle.scan_seconds = time.perf_counter() - started
+            vehicle.commands += 1
+        vehicle.error = ""
+        vehicle.dtcs = [] if response.is_null() else list(response.value)
+
+    async def connect_all(self, ports: list[str], config: ConnectConfig | None = None):
+        await asyncio.gather(*(self.connect(port, config) for port in ports))
+
+    async def disconnect_all(self):
+        await asyncio.gather(*(self.disconnect(port) for port in list(self.vehicles)))
+
+    async def scan_all(self):
+        ports = [p for p, v in self.vehicles.items() if v.status == "CONNECTED"]
+        started = time.perf_counter()
+        await asyncio.gather(*(self.scan(port) for port in ports))
+        self.last_scan_count = len(ports)
+        self.last_scan_wall = time.perf_counter() - started
+        self.last_scan_serial = sum(
+            self.vehicles[p].scan_seconds for p in ports if p in self.vehicles
+        )
+
+    def snapshot(self) -> list[dict]:
+        return [vehicle.snapshot() for vehicle in self.vehicles.values()]
+
+    def metrics(self) -> dict:
+        vehicles = list(self.vehicles.values())
+        wall = self.last_scan_wall
+        return {
+            "vehicles": len(vehicles),
+            "connected": sum(v.status == "CONNECTED" for v in vehicles),
+            "commands": sum(v.commands for v in vehicles),
+            "errors": sum(v.errors for v in vehicles),
+            "busy_seconds": round(sum(v.busy_seconds for v in vehicles), 3),
+            "last_scan_ms": round(wall * 1e3, 1),
+            "scans_per_sec": round(self.last_scan_count / wall, 2) if wall else 0.0,
+            "scan_speedup": round(self.last_scan_serial / wall, 2) if wall else 0.0,
+        }
+
+
+fleet_manager = FleetManager()
@@ -0,0 +1,72 @@
+import threading
+from array import array
+
+
+class LiveDataBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots: dict[str, int] = {}
+        self.keys: list[str] = []
+        self.values = array("d")
+        self.times = array("d")
+        self._text: dict[int, str] = {}
+        self._dirty = bytearray()
+        self._changed: list[int] = []
+        self.samples_received = 0
+        self.samples_coalesced = 0
+        self.closed = False
+
+    def _slot(self, key: str) -> int:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = len(self.keys)
+            self.keys.append(key)
+            self.values.append(0.0)
+            self.times.append(0.0)
+            self._dirty.append(0)
+        return slot
+
+    def _store(self, key: str, value: float | str, timestamp: float):
+        slot = self._slot(key)
+        if isinstance(value, str):
+            self._text[slot] = value
+        else:
+            self.values[slot] = value
+        self.times[slot] = timestamp
+        if self._dirty[slot]:
+            self.samples_coalesced += 1
+        else:
+            self._dirty[slot] = 1
+            self._changed.append(slot)
+
+    def put(self, key: str, value: float | str, timestamp: float = 0.0):
+        with self._lock:
+            self._store(key, value, timestamp)
+            self.samples_received += 1
+
+    def put_many(self, items: list[tuple[str, float]], timestamp: float = 0.0):
+        with self._lock:
+            for key, value in items:
+                self._store(key, value, timestamp)
+
+    def latest(self, key: str) -> float | str | None:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                return None
+            return self._text.get(slot, self.values[slot])
+
+    def drain(self) -> dict[str, float | str]:
+        with self._lock:
+            changed, self._changed = self._changed, []
+            pending = {}
+            for slot in changed:
+                self._dirty[slot] = 0
+                pending[self.keys[slot]] = self._text.get(slot, self.values[slot])
+        return pending
+
+    def close(self):
+        with self._lock:
+            self._changed = []
+            self._dirty = bytearray(len(self.keys))
+            self.closed = True
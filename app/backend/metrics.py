@@ -0,0 +1,342 @@
+import bisect
+import contextlib
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+ADAPTER_ERRORS = {
+    "NO DATA": "no_data",
+    "?": "rejected",
+    "STOPPED": "stopped",
+    "CAN ERROR": "bus_error",
+    "BUS ERROR": "bus_error",
+    "BUFFER FULL": "buffer_full",
+    "UNABLE TO CONNECT": "unable_to_connect",
+}
+
+current_handler: ContextVar[str] = ContextVar("current_handler", default="")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    @contextlib.contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Metric:
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], _Value | _Buckets] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.get(values)
+                if series is None:
+                    if self.kind == "histogram":
+                        series = _Buckets(self.buckets)
+                    else:
+                        series = _Value()
+                    self._series[values] = series
+        return series
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for values, series in sorted(self._series.items()):
+            labels = _format_labels(self.label_names, values)
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{labels} {_number(series.value)}")
+                continue
+            with series._lock:
+                counts, total = list(series.counts), series.sum
+            names = self.label_names + ("le",)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket = _format_labels(names, values + (le,))
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, kind: str, name: str, documentation: str, **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Metric(
+                    kind, name, documentation, **kwargs
+                )
+        return metric
+
+    def counter(self, name: str, documentation: str, labels=()) -> Metric:
+        return self._register("counter", name, documentation, labels=labels)
+
+    def gauge(self, name: str, documentation: str, labels=()) -> Metric:
+        return self._register("gauge", name, documentation, labels=labels)
+
+    def histogram(
+        self, name: str, documentation: str, labels=(), buckets=LATENCY_BUCKETS
+    ) -> Metric:
+        return self._register(
+            "histogram", name, documentation, labels=labels, buckets=buckets
+        )
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = [line for metric in metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+ADAPTER_REQUEST_SECONDS = metrics.histogram(
+    "obd_adapter_request_seconds",
+    "Serial round trip per adapter command.",
+    labels=("command",),
+)
+ADAPTER_ERRORS_TOTAL = metrics.counter(
+    "obd_adapter_errors_total",
+    "Adapter replies that carried no usable data.",
+    labels=("command", "reason"),
+)
+ADAPTER_CONNECTIONS = metrics.gauge(
+    "obd_adapter_connections", "Open adapter connections."
+)
+ADAPTER_SESSIONS = metrics.gauge(
+    "obd_adapter_sessions", "Browser sessions attached to an adapter."
+)
+CONNECT_SECONDS = metrics.histogram(
+    "obd_connect_seconds",
+    "Adapter bring-up time.",
+    labels=("result",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0),
+)
+PID_RESPONSES_TOTAL = metrics.counter(
+    "obd_pid_responses_total",
+    "Scheduled PID responses published to subscribers.",
+    labels=("command", "status"),
+)
+LIVE_SAMPLES_TOTAL = metrics.counter(
+    "obd_live_samples_total", "Samples handled by the live data callback."
+)
+LIVE_FRAMES_TOTAL = metrics.counter(
+    "obd_live_frames_total", "Live data frames pushed to the browser."
+)
+STATE_LOCK_SECONDS = metrics.histogram(
+    "obd_state_lock_seconds",
+    "Time a handler holds the state lock, including the delta emit.",
+    labels=("handler",),
+)
+HANDLER_SECONDS = metrics.histogram(
+    "obd_handler_seconds",
+    "Background event handler run time.",
+    labels=("handler",),
+    buckets=LATENCY_BUCKETS + (30.0, 60.0, 300.0),
+)
+STATE_DELTA_BYTES = metrics.histogram(
+    "obd_state_delta_bytes",
+    "Serialized size of websocket packets sent to the browser.",
+    buckets=SIZE_BUCKETS,
+)
+SESSION_LOG_TOTAL = metrics.counter(
+    "obd_session_log_total", "Session log entries.", labels=("level", "event")
+)
+ALERTS_TOTAL = metrics.counter(
+    "obd_alerts_total",
+    "Alert rule firings, including those held back by the cooldown.",
+    labels=("rule", "outcome"),
+)
+
+
+def command_label(cmd: bytes) -> str:
+    label = cmd.decode(errors="ignore").replace(" ", "").upper()
+    if label.startswith("AT"):
+        return label
+    if len(label) > 2 and len(label) % 2:
+        label = label[:-1]
+    if label.startswith("01") and len(label) > 4:
+        return f"01x{(len(label) - 2) // 2}"
+    if label.startswith("02") and len(label) > 6:
+        return f"02x{(len(label) - 2) // 4}"
+    return label
+
+
+def observe_request(cmd: bytes, lines: list[str], seconds: float):
+    label = command_label(cmd)
+    ADAPTER_REQUEST_SECONDS.labels(label).observe(seconds)
+    if not lines:
+        ADAPTER_ERRORS_TOTAL.labels(label, "no_response").inc()
+        return
+    for line in lines:
+        reason = ADAPTER_ERRORS.get(line.strip())
+        if reason is not None:
+            ADAPTER_ERRORS_TOTAL.labels(label, reason).inc()
+            return
+
+
+def instrument_app(app):
+    modify_state = getattr(app, "modify_state", None)
+    process_background = getattr(app, "_process_background", None)
+    namespace = getattr(app, "event_namespace", None)
+    emit_update = getattr(namespace, "emit_update", None)
+    if modify_state is None or process_background is None:
+        logging.warning(
+            "This Reflex version has no modify_state/_process_background hooks; "
+            "handler and state lock metrics are disabled."
+        )
+        return app
+
+    @contextlib.asynccontextmanager
+    async def timed_modify_state(token: str):
+        started = time.perf_counter()
+        try:
+            async with modify_state(token) as state:
+                yield state
+        finally:
+            STATE_LOCK_SECONDS.labels(current_handler.get()).observe(
+                time.perf_counter() - started
+            )
+
+    def timed_process_background(state, event):
+        handler = event.name.rsplit(".", 1)[-1]
+        reset = current_handler.set(handler)
+        try:
+            task = process_background(state, event)
+        finally:
+            current_handler.reset(reset)
+        if task is not None:
+            started = time.perf_counter()
+            task.add_done_callback(
+                lambda _: HANDLER_SECONDS.labels(handler).observe(
+                    time.perf_counter() - started
+                )
+            )
+        return task
+
+    app.modify_state = timed_modify_state
+    app._process_background = timed_process_background
+    if emit_update is not None:
+
+        async def measured_emit_update(update, token: str):
+            STATE_DELTA_BYTES.observe(len(update.json().encode()))
+            await emit_update(update=update, token=token)
+
+        namespace.emit_update = measured_emit_update
+    return app
+
+
+def metrics_api():
+    from starlette.applications import Starlette
+    from starlette.responses import Response
+    from starlette.routing import Route
+
+    async def endpoint(request):
+        return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+    return Starlette(routes=[Route("/metrics", endpoint)])
@@ -0,0 +1,194 @@
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+
+import obd
+from obd.elm327 import ELM327
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "obd-scanner", "pid_cache.json"
+)
+FAILURE_LIMIT = 3
+CACHE_VERSION = 2
+DEFAULT_MAX_AGE = 7 * 24 * 3600.0
+
+ECU_NAMES = {
+    obd.ECU.ENGINE: "ENGINE",
+    obd.ECU.TRANSMISSION: "TRANSMISSION",
+    obd.ECU.UNKNOWN: "UNKNOWN",
+}
+
+
+def _private(obj, name: str, default=None):
+    return getattr(obj, name, default) if obj is not None else default
+
+
+@dataclass
+class VehicleLinkProfile:
+    vin: str
+    protocol: str
+    baudrate: int | None = None
+    ecu_map: dict[str, str] = field(default_factory=dict)
+    supported_pids: dict[str, str] = field(default_factory=dict)
+    updated: float = 0.0
+
+    @classmethod
+    def from_connection(cls, vin: str, connection: obd.OBD) -> "VehicleLinkProfile":
+        bitmaps: dict[int, int] = {}
+        for cmd in connection.supported_commands:
+            if cmd.mode is not None and cmd.pid is not None:
+                bitmaps[cmd.mode] = bitmaps.get(cmd.mode, 0) | (1 << cmd.pid)
+        interface = connection.interface
+        port = _private(interface, "_ELM327__port")
+        protocol = _private(interface, "_ELM327__protocol")
+        return cls(
+            vin=vin,
+            protocol=connection.protocol_id(),
+            baudrate=_private(port, "baudrate"),
+            ecu_map={
+                f"{tx_id:02X}": ECU_NAMES.get(ecu, str(ecu))
+                for tx_id, ecu in (_private(protocol, "ecu_map") or {}).items()
+                if tx_id is not None
+            },
+            supported_pids={
+                f"{mode:02X}": f"{bits:X}" for mode, bits in bitmaps.items()
+            },
+            updated=time.time(),
+        )
+
+    def supported_commands(self) -> set[obd.OBDCommand]:
+        supported = set(obd.commands.base_commands())
+        for mode_hex, bits_hex in self.supported_pids.items():
+            mode, bits = int(mode_hex, 16), int(bits_hex, 16)
+            pid = 0
+            while bits:
+                if bits & 1 and obd.commands.has_pid(mode, pid):
+                    supported.add(obd.commands[mode][pid])
+                bits >>= 1
+                pid += 1
+        return supported
+
+
+class PIDCache:
+    def __init__(
+        self, path: str = DEFAULT_CACHE_PATH, max_age: float = DEFAULT_MAX_AGE
+    ):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._vehicles: dict[str, VehicleLinkProfile] = {}
+        self._ports: dict[str, str] = {}
+        self._failures: dict[tuple[str, str], int] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+        self._vehicles = {
+            vin: VehicleLinkProfile(**profile)
+            for vin, profile in data.get("vehicles", {}).items()
+        }
+        self._ports = dict(data.get("ports", {}))
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {
+            "version": CACHE_VERSION,
+            "vehicles": {vin: asdict(p) for vin, p in self._vehicles.items()},
+            "ports": self._ports,
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def _fresh(self, profile: VehicleLinkProfile | None) -> VehicleLinkProfile | None:
+        if profile is None:
+            return None
+        if self.max_age > 0 and time.time() - profile.updated > self.max_age:
+            return None
+        return profile
+
+    def get(self, vin: str) -> VehicleLinkProfile | None:
+        with self._lock:
+            return self._fresh(self._vehicles.get(vin))
+
+    def for_port(self, port: str) -> VehicleLinkProfile | None:
+        with self._lock:
+            vin = self._ports.get(port)
+            return self._fresh(self._vehicles.get(vin)) if vin else None
+
+    def store(self, port: str, profile: VehicleLinkProfile):
+        with self._lock:
+            self._vehicles[profile.vin] = profile
+            self._ports[port] = profile.vin
+            self._save()
+
+    def report(self, vin: str, command: obd.OBDCommand, ok: bool):
+        key = (vin, command.name)
+        if ok:
+            if key in self._failures:
+                with self._lock:
+                    self._failures.pop(key, None)
+            return
+        with self._lock:
+            failures = self._failures[key] = self._failures.get(key, 0) + 1
+        if failures >= FAILURE_LIMIT:
+            self.invalidate(vin)
+
+    def invalidate(self, vin: str):
+        with self._lock:
+            self._failures = {k: v for k, v in self._failures.items() if k[0] != vin}
+            if self._vehicles.pop(vin, None) is None:
+                return
+            self._ports = {p: v for p, v in self._ports.items() if v != vin}
+            self._save()
+
+
+class CachedProfileAsync(obd.Async):
+    def __init__(
+        self,
+        portstr,
+        profile: VehicleLinkProfile | None = None,
+        interface_factory=ELM327,
+        **kwargs,
+    ):
+        self.profile = profile
+        self.interface_factory = interface_factory
+        if profile is not None:
+            kwargs.setdefault("protocol", profile.protocol)
+            kwargs.setdefault("baudrate", profile.baudrate)
+        super().__init__(portstr, **kwargs)
+
+    def _OBD__connect(
+        self, portstr, baudrate, protocol, check_voltage, start_low_power
+    ):
+        self.interface = self.interface_factory(
+            portstr, baudrate, protocol, self.timeout, check_voltage, start_low_power
+        )
+        if self.interface.status() == obd.OBDStatus.NOT_CONNECTED:
+            self.close()
+
+    def _OBD__load_commands(self):
+        if self.profile is None:
+            return obd.OBD._OBD__load_commands(self)
+        if self.status() == obd.OBDStatus.CAR_CONNECTED:
+            self.supported_commands = self.profile.supported_commands()
+
+    def reprobe(self):
+        self.profile = None
+        self.supported_commands = set(obd.commands.base_commands())
+        obd.OBD._OBD__load_commands(self)
+
+
+pid_cache = PIDCache(
+    os.getenv("OBD_PID_CACHE", DEFAULT_CACHE_PATH),
+    float(os.getenv("OBD_PID_CACHE_MAX_AGE", DEFAULT_MAX_AGE)),
+)
@@ -0,0 +1,102 @@
+import os
+import threading
+from dataclasses import dataclass
+
+DISPLAY_UNITS: dict[str, tuple[str, float, float, int]] = {
+    "revolutions_per_minute": ("rpm", 1.0, 0.0, 0),
+    "kilometer_per_hour": ("km/h", 1.0, 0.0, 0),
+    "percent": ("%", 1.0, 0.0, 1),
+    "degree_Celsius": ("°C", 1.0, 0.0, 0),
+    "gps": ("g/s", 1.0, 0.0, 2),
+    "kilopascal": ("kPa", 1.0, 0.0, 0),
+    "pascal": ("Pa", 1.0, 0.0, 0),
+    "degree": ("°", 1.0, 0.0, 1),
+    "volt": ("V", 1.0, 0.0, 2),
+    "milliampere": ("mA", 1.0, 0.0, 0),
+    "second": ("s", 1.0, 0.0, 0),
+    "millisecond": ("ms", 1.0, 0.0, 0),
+    "minute": ("min", 1.0, 0.0, 0),
+    "kilometer": ("km", 1.0, 0.0, 0),
+    "lph": ("L/h", 1.0, 0.0, 2),
+    "ratio": ("λ", 1.0, 0.0, 3),
+    "count": ("", 1.0, 0.0, 0),
+}
+IMPERIAL_UNITS: dict[str, tuple[str, float, float, int]] = {
+    "kilometer_per_hour": ("mph", 0.621371, 0.0, 0),
+    "degree_Celsius": ("°F", 1.8, 32.0, 0),
+    "kilopascal": ("psi", 0.145038, 0.0, 1),
+    "kilometer": ("mi", 0.621371, 0.0, 0),
+    "lph": ("gal/h", 0.264172, 0.0, 2),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class PIDDecoder:
+    key: str
+    label: str
+    unit: str = ""
+    source_unit: str = ""
+    scale: float = 1.0
+    offset: float = 0.0
+    precision: int = 2
+    numeric: bool = True
+
+    def extract(self, value) -> float | str:
+        if self.numeric:
+            return float(getattr(value, "magnitude", value))
+        if isinstance(value, tuple):
+            return " / ".join(v for v in value if v)
+        return str(value)
+
+    def format(self, value: float | str) -> str:
+        if isinstance(value, str):
+            return value
+        return f"{value * self.scale + self.offset:.{self.precision}f}"
+
+
+class DecoderRegistry:
+    def __init__(self, system: str = "metric"):
+        self.units = dict(DISPLAY_UNITS)
+        if system == "imperial":
+            self.units.update(IMPERIAL_UNITS)
+        self._decoders: dict[str, PIDDecoder] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: str) -> PIDDecoder:
+        return self._decoders[key]
+
+    def get(self, key: str) -> PIDDecoder | None:
+        return self._decoders.get(key)
+
+    def resolve(self, response) -> PIDDecoder:
+        key = response.command.name
+        decoder = self._decoders.get(key)
+        if decoder is None:
+            with self._lock:
+                decoder = self._decoders.get(key)
+                if decoder is None:
+                    decoder = self._decoders[key] = self._build(
+                        key,
+                        response.value,
+                        getattr(response, "unit", None),
+                    )
+        return decoder
+
+    def register(self, decoder: PIDDecoder):
+        with self._lock:
+            self._decoders[decoder.key] = decoder
+
+    def _build(self, key: str, value, source_unit: str | None = None) -> PIDDecoder:
+        label = key.replace("_", " ").title()
+        magnitude = getattr(value, "magnitude", value)
+        if not isinstance(magnitude, (int, float)) or isinstance(magnitude, bool):
+            return PIDDecoder(key, label, numeric=False)
+        if source_unit is None:
+            source_unit = str(getattr(value, "units", ""))
+        unit, scale, offset, precision = self.units.get(
+            source_unit, (source_unit, 1.0, 0.0, 2)
+        )
+        return PIDDecoder(key, label, unit, source_unit, scale, offset, precision)
+
+
+live_decoders = DecoderRegistry(os.getenv("OBD_DISPLAY_UNITS", "metric"))
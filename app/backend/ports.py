@@ -0,0 +1,124 @@
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import time
+from typing import Callable
+
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+HOTPLUG_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+INOTIFY_EVENT = struct.Struct("iIII")
+SERIAL_PREFIXES = ("tty", "rfcomm", "cu.")
+
+
+def enumerate_ports() -> list[str]:
+    import serial.tools.list_ports
+
+    return [port.device for port in serial.tools.list_ports.comports()]
+
+
+class DeviceWatcher:
+    def __init__(self, path: str, on_change: Callable[[], None]):
+        self.path = path
+        self.on_change = on_change
+        self.events = 0
+        self._fd = -1
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def active(self) -> bool:
+        return self._fd >= 0
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> bool:
+        if self._loop is loop and self.active:
+            return True
+        self.stop()
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            if libc.inotify_add_watch(fd, self.path.encode(), HOTPLUG_MASK) < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), f"cannot watch {self.path}")
+        except (OSError, AttributeError, TypeError) as e:
+            logging.info(f"Port hotplug watch unavailable: {e}")
+            return False
+        self._fd, self._loop = fd, loop
+        loop.add_reader(fd, self._read)
+        return True
+
+    def stop(self):
+        if not self.active:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._fd)
+        os.close(self._fd)
+        self._fd, self._loop = -1, None
+
+    def _read(self):
+        try:
+            data = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return
+        offset, changed = 0, False
+        while offset + INOTIFY_EVENT.size <= len(data):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0").decode(errors="ignore")
+            offset += length
+            if name.startswith(SERIAL_PREFIXES):
+                changed = True
+        if changed:
+            self.events += 1
+            self.on_change()
+
+
+class PortRegistry:
+    def __init__(self, ttl: float = 10.0, timeout: float = 5.0, watch_path="/dev"):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.ports: list[str] = []
+        self.refreshed = 0.0
+        self.enumerations = 0
+        self.dirty = True
+        self.watcher = DeviceWatcher(watch_path, self.invalidate)
+        self._lock = asyncio.Lock()
+
+    @property
+    def fresh(self) -> bool:
+        return not self.dirty and time.monotonic() - self.refreshed < self.ttl
+
+    def invalidate(self):
+        self.dirty = True
+
+    async def list(self, force: bool = False) -> list[str]:
+        self.watcher.start(asyncio.get_running_loop())
+        if force:
+            self.invalidate()
+        if self.fresh:
+            return list(self.ports)
+        async with self._lock:
+            if not self.fresh:
+                self.dirty = False
+                try:
+                    self.ports = await asyncio.wait_for(
+                        asyncio.to_thread(enumerate_ports), self.timeout
+                    )
+                except BaseException:
+                    self.dirty = True
+                    raise
+                self.refreshed = time.monotonic()
+                self.enumerations += 1
+        return list(self.ports)
+
+
+port_registry = PortRegistry(
+    ttl=float(os.getenv("OBD_PORT_CACHE_TTL", "10")),
+    timeout=float(os.getenv("OBD_PORT_SCAN_TIMEOUT", "5")),
+)
@@ -0,0 +1,331 @@
+import bisect
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from itertools import repeat
+
+MAGIC = b"OBDREC1\0"
+CHUNK_HEADER = struct.Struct("<4sHHI")
+CHUNK_TAG = b"CHNK"
+EVENT_HEADER = struct.Struct("<4sdI")
+META_TAG = b"META"
+DTC_TAG = b"DTCS"
+LOG_TAG = b"LOGS"
+DEFAULT_CAPACITY = 4096
+DEFAULT_FLUSH_INTERVAL = 5.0
+REPLAY_PREFIX = "replay:"
+REPLAY_SPEEDS = ["1x", "4x", "16x", "max"]
+
+
+def parse_speed(speed: str) -> float:
+    speed = speed.strip().lower()
+    if speed == "max":
+        return 0.0
+    return float(speed.rstrip("x"))
+
+
+def parse_unit(unit: str):
+    import obd
+
+    try:
+        return obd.Unit.Unit(unit)
+    except Exception as e:
+        raise ValueError(f"unknown unit {unit!r}") from e
+
+
+def _numeric(value) -> float | None:
+    value = getattr(value, "magnitude", value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+
+def _le_bytes(column: array) -> bytes:
+    if sys.byteorder != "little":
+        column = array("d", column)
+        column.byteswap()
+    return column.tobytes()
+
+
+class PIDRing:
+    __slots__ = ("name", "unit", "capacity", "times", "values", "written", "flushed")
+
+    def __init__(self, name: str, capacity: int = DEFAULT_CAPACITY, unit: str = ""):
+        self.name = name
+        self.unit = unit
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.written = 0
+        self.flushed = 0
+
+    def append(self, timestamp: float, value: float):
+        i = self.written % self.capacity
+        self.times[i] = timestamp
+        self.values[i] = value
+        self.written += 1
+
+    def take(self) -> tuple[array, array, int]:
+        start = max(self.flushed, self.written - self.capacity)
+        dropped = start - self.flushed
+        count = self.written - start
+        self.flushed = self.written
+        i = start % self.capacity
+        if i + count <= self.capacity:
+            return self.times[i : i + count], self.values[i : i + count], dropped
+        wrap = count - (self.capacity - i)
+        return (
+            self.times[i:] + self.times[:wrap],
+            self.values[i:] + self.values[:wrap],
+            dropped,
+        )
+
+
+class SessionRecorder:
+    def __init__(
+        self,
+        path: str,
+        capacity: int = DEFAULT_CAPACITY,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        metadata: dict | None = None,
+    ):
+        self.path = path
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.samples_recorded = 0
+        self.samples_dropped = 0
+        self.bytes_written = len(MAGIC)
+        self._rings: dict[str, PIDRing] = {}
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._stop = threading.Event()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._write_event(META_TAG, time.time(), metadata or {})
+        self._thread: threading.Thread | None = None
+        if flush_interval > 0:
+            self._thread = threading.Thread(
+                target=self._run, name="session-recorder", daemon=True
+            )
+            self._thread.start()
+
+    @property
+    def closed(self) -> bool:
+        return self._stop.is_set()
+
+    def record(self, name: str, timestamp: float, value: float, unit: str = ""):
+        ring = self._rings.get(name)
+        with self._lock:
+            if ring is None:
+                ring = self._rings.setdefault(name, PIDRing(name, self.capacity, unit))
+            ring.append(timestamp, value)
+            self.samples_recorded += 1
+
+    def record_response(self, response):
+        value = _numeric(response.value)
+        if value is None:
+            return
+        unit = getattr(response.value, "units", "")
+        self.record(response.command.name, response.time, value, str(unit))
+
+    def record_dtcs(self, timestamp: float, codes: list[tuple[str, str]]):
+        with self._io_lock:
+            if not self._file.closed:
+                self._write_event(DTC_TAG, timestamp, [list(c) for c in codes])
+
+    def record_log(self, entry: dict):
+        with self._io_lock:
+            if not self._file.closed:
+                self._write_event(LOG_TAG, entry["ts"], entry)
+
+    def record_metadata(self, timestamp: float, metadata: dict):
+        with self._io_lock:
+            if not self._file.closed:
+                self._write_event(META_TAG, timestamp, metadata)
+
+    def write_chunk(self, name: str, unit: str, times: array, values: array):
+        with self._io_lock:
+            if not self._file.closed:
+                self._write_chunk(name, unit, times, values)
+                self.samples_recorded += len(times)
+
+    def _write_chunk(self, name: str, unit: str, times: array, values: array):
+        encoded_name, encoded_unit = name.encode(), unit.encode()
+        chunk = b"".join(
+            (
+                CHUNK_HEADER.pack(
+                    CHUNK_TAG, len(encoded_name), len(encoded_unit), len(times)
+                ),
+                encoded_name,
+                encoded_unit,
+                _le_bytes(times),
+                _le_bytes(values),
+            )
+        )
+        self._file.write(chunk)
+        self.bytes_written += len(chunk)
+
+    def _write_event(self, tag: bytes, timestamp: float, payload):
+        body = json.dumps(payload).encode()
+        event = EVENT_HEADER.pack(tag, timestamp, len(body)) + body
+        self._file.write(event)
+        self.bytes_written += len(event)
+
+    def flush(self):
+        with self._lock:
+            pending = [ring.take() + (ring,) for ring in self._rings.values()]
+        with self._io_lock:
+            if self._file.closed:
+                return
+            for times, values, dropped, ring in pending:
+                self.samples_dropped += dropped
+                if times:
+                    self._write_chunk(ring.name, ring.unit, times, values)
+            self._file.flush()
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        with self._io_lock:
+            self._file.close()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+class RecordingReader:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an OBD recording.")
+        self.units: dict[str, str] = {}
+        self.metadata: dict = {}
+        self.dtc_events: list[tuple[float, list[tuple[str, str]]]] = []
+        self.end = len(MAGIC)
+        self._chunks: list[tuple[str, int, int]] = []
+        self._logs: list[tuple[int, int]] = []
+        self._index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    @property
+    def channels(self) -> list[str]:
+        return list(self.units)
+
+    @property
+    def sample_count(self) -> int:
+        return sum(count for _, _, count in self._chunks)
+
+    @property
+    def log_count(self) -> int:
+        return len(self._logs)
+
+    def dtcs_at(self, timestamp: float) -> list[tuple[str, str]] | None:
+        i = bisect.bisect_right(self.dtc_events, timestamp, key=lambda e: e[0])
+        return self.dtc_events[i - 1][1] if i else None
+
+    def _index(self):
+        offset, size = len(MAGIC), len(self._map)
+        while offset + CHUNK_HEADER.size <= size:
+            tag = self._map[offset : offset + 4]
+            if tag in (META_TAG, DTC_TAG, LOG_TAG):
+                timestamp, length = EVENT_HEADER.unpack_from(self._map, offset)[1:]
+                offset += EVENT_HEADER.size
+                if offset + length > size:
+                    break
+                if tag == LOG_TAG:
+                    self._logs.append((offset, length))
+                else:
+                    payload = json.loads(self._map[offset : offset + length])
+                    if tag == META_TAG:
+                        self.metadata.update(payload)
+                    else:
+                        self.dtc_events.append((timestamp, [tuple(c) for c in payload]))
+                offset += length
+                self.end = offset
+                continue
+            tag, name_len, unit_len, count = CHUNK_HEADER.unpack_from(self._map, offset)
+            if tag != CHUNK_TAG:
+                raise ValueError(f"Corrupt chunk at offset {offset} in {self.path}.")
+            offset += CHUNK_HEADER.size
+            name = self._map[offset : offset + name_len].decode()
+            unit = self._map[offset + name_len : offset + name_len + unit_len].decode()
+            offset += name_len + unit_len
+            if offset + 16 * count > size:
+                break
+            self.units.setdefault(name, unit)
+            self._chunks.append((name, offset, count))
+            offset += 16 * count
+            self.end = offset
+
+    def chunks(self):
+        with memoryview(self._map) as view:
+            for name, offset, count in self._chunks:
+                end = offset + 8 * count
+                with (
+                    view[offset:end].cast("d") as times,
+                    view[end : end + 8 * count].cast("d") as values,
+                ):
+                    yield name, times, values
+
+    def log_entries(self):
+        for offset, length in self._logs:
+            yield json.loads(self._map[offset : offset + length])
+
+    def blocks(self, size: int):
+        for offset in range(0, self.end, size):
+            yield self._map[offset : min(offset + size, self.end)]
+
+    def series(self, name: str) -> tuple[array, array]:
+        times, values = array("d"), array("d")
+        for chunk_name, offset, count in self._chunks:
+            if chunk_name == name:
+                end = offset + 8 * count
+                times.frombytes(self._map[offset:end])
+                values.frombytes(self._map[end : end + 8 * count])
+        return times, values
+
+    def samples(self):
+        group: dict[str, tuple[int, int]] = {}
+        for name, offset, count in self._chunks + [(None, 0, 0)]:
+            if name in group or name is None:
+                yield from heapq.merge(
+                    *(
+                        zip(
+                            self._column(start, n),
+                            repeat(chunk_name),
+                            self._column(start + 8 * n, n),
+                        )
+                        for chunk_name, (start, n) in group.items()
+                    )
+                )
+                group = {}
+            group[name] = (offset, count)
+
+    def _column(self, offset: int, count: int):
+        with memoryview(self._map) as view:
+            with view[offset : offset + 8 * count].cast("d") as column:
+                yield from column
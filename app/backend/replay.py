@@ -0,0 +1,168 @@
+import contextlib
+import threading
+import time
+from typing import Callable
+
+import obd
+from obd.protocols.protocol import Message
+
+from app.backend.recorder import RecordingReader, parse_unit
+
+_REPLAY_MESSAGES = [Message([])]
+
+
+def _unit(unit: str):
+    if not unit:
+        return None
+    try:
+        return parse_unit(unit)
+    except ValueError:
+        return None
+
+
+def _response(command: obd.OBDCommand, value, timestamp: float) -> obd.OBDResponse:
+    response = obd.OBDResponse(command, _REPLAY_MESSAGES)
+    response.value = value
+    response.time = timestamp
+    return response
+
+
+class ReplayConnection:
+    def __init__(self, path: str):
+        self.path = path
+        self.reader = RecordingReader(path)
+        self.vin = self.reader.metadata.get("vin", "")
+        self.cursor = self.reader.metadata.get("started", 0.0)
+        self._closed = False
+
+    def is_connected(self) -> bool:
+        return not self._closed
+
+    def status(self) -> str:
+        if self._closed:
+            return obd.OBDStatus.NOT_CONNECTED
+        return obd.OBDStatus.CAR_CONNECTED
+
+    def protocol_id(self) -> str:
+        return self.reader.metadata.get("protocol", "")
+
+    def supports(self, command: obd.OBDCommand) -> bool:
+        return command.name in self.reader.units
+
+    def paused(self):
+        return contextlib.nullcontext()
+
+    def stop(self):
+        pass
+
+    def unwatch_all(self):
+        pass
+
+    def query(self, command: obd.OBDCommand, force: bool = False) -> obd.OBDResponse:
+        if command == obd.commands.GET_DTC:
+            codes = self.reader.dtcs_at(self.cursor)
+            if codes is not None:
+                return _response(command, codes, self.cursor)
+        return obd.OBDResponse(command)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.reader.close()
+
+
+class ReplayPlayer:
+    def __init__(
+        self,
+        connection: ReplayConnection,
+        callback: Callable[[obd.OBDResponse], None],
+        speed: float = 1.0,
+    ):
+        self.connection = connection
+        self.callback = callback
+        self.speed = speed
+        self.samples_replayed = 0
+        self.finished = False
+        self.started = 0.0
+        self.elapsed = 0.0
+        self._counts: dict[str, int] = {}
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="replay-player", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def query(self, command: obd.OBDCommand) -> obd.OBDResponse:
+        return self.connection.query(command)
+
+    def ingest_rate(self) -> float:
+        elapsed = self.elapsed or time.perf_counter() - self.started
+        return self.samples_replayed / elapsed if elapsed > 0 else 0.0
+
+    def achieved_rates(self) -> dict[str, float]:
+        elapsed = self.elapsed or time.perf_counter() - self.started
+        if elapsed <= 0:
+            return {}
+        return {name: round(n / elapsed, 2) for name, n in self._counts.items()}
+
+    def summary(self) -> str:
+        speed = f"{self.speed:g}x" if self.speed else "max speed"
+        return (
+            f"Replayed {self.samples_replayed} samples in {self.elapsed:.2f} s at "
+            f"{speed} ({self.ingest_rate():.0f} samples/s)."
+        )
+
+    def _run(self):
+        commands = {
+            name: obd.commands[name]
+            for name in self.connection.reader.units
+            if obd.commands.has_name(name)
+        }
+        units = {
+            name: _unit(unit) for name, unit in self.connection.reader.units.items()
+        }
+        counts = self._counts
+        callback = self.callback
+        quantity = obd.Unit.Quantity
+        origin = None
+        self.started = time.perf_counter()
+        for timestamp, name, value in self.connection.reader.samples():
+            if not self._running:
+                break
+            command = commands.get(name)
+            if command is None:
+                continue
+            if origin is None:
+                origin = timestamp
+            if self.speed:
+                delay = (timestamp - origin) / self.speed - (
+                    time.perf_counter() - self.started
+                )
+                if delay > 0.001:
+                    time.sleep(delay)
+            self.connection.cursor = timestamp
+            unit = units[name]
+            value = quantity(value, unit) if unit is not None else value
+            callback(_response(command, value, timestamp))
+            counts[name] = counts.get(name, 0) + 1
+            self.samples_replayed += 1
+        else:
+            self.finished = True
+        self.elapsed = time.perf_counter() - self.started
+        self._running = False
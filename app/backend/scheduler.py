@@ -0,0 +1,391 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable
+
+import obd
+
+from app.backend.batching import (
+    CAN_PROTOCOL_IDS,
+    MAX_PIDS_PER_REQUEST,
+    batch_command_string,
+    demultiplex,
+    is_batchable,
+)
+from app.backend.fast_decode import (
+    FAST_FORMULAS,
+    HEADER_CHARS,
+    FastResponse,
+    count_frames,
+    decode_lines,
+    is_fast,
+)
+
+RTT_SMOOTHING = 0.2
+INITIAL_RTT = 0.05
+RATE_WINDOW = 32
+BATCH_FAILURE_LIMIT = 2
+FRAME_COUNT_SAMPLES = 3
+FAST_DECODE = os.getenv("OBD_FAST_DECODE", "1") != "0"
+
+
+@dataclass
+class PIDSchedule:
+    command: obd.OBDCommand
+    rate_hz: float
+    priority: int = 0
+    min_rate_hz: float = 0.1
+
+
+@dataclass
+class _Entry:
+    schedule: PIDSchedule
+    rtt: float = INITIAL_RTT
+    effective_rate: float = 0.0
+    last_started: float = float("-inf")
+    completions: deque = field(default_factory=lambda: deque(maxlen=RATE_WINDOW))
+
+    @property
+    def name(self) -> str:
+        return self.schedule.command.name
+
+    @property
+    def next_due(self) -> float:
+        return self.last_started + 1.0 / self.effective_rate
+
+    def achieved_rate(self, now: float) -> float:
+        if len(self.completions) < 2:
+            return 0.0
+        span = now - self.completions[0]
+        return (len(self.completions) - 1) / span if span > 0 else 0.0
+
+
+class _FrameCounts:
+    def __init__(self, samples: int = FRAME_COUNT_SAMPLES):
+        self.samples = samples
+        self._seen: dict[bytes, tuple[int, int]] = {}
+
+    def hint(self, cmd_string: bytes) -> int:
+        replies, frames = self._seen.get(cmd_string, (0, 0))
+        return frames if replies >= self.samples else 0
+
+    def observe(self, cmd_string: bytes, frames: int):
+        replies, most = self._seen.get(cmd_string, (0, 0))
+        if frames == 0 or (replies >= self.samples and frames < most):
+            self._seen.pop(cmd_string, None)
+        else:
+            self._seen[cmd_string] = (replies + 1, max(most, frames))
+
+
+class PIDScheduler:
+    def __init__(
+        self,
+        connection: obd.OBD,
+        schedules: list[PIDSchedule],
+        callback: Callable[[obd.OBDResponse], None],
+        max_utilization: float = 0.9,
+        batching: bool = True,
+        io_lock: "threading.Lock | None" = None,
+        fast_decode: bool = FAST_DECODE,
+    ):
+        self.connection = connection
+        self.callback = callback
+        self.max_utilization = max_utilization
+        self.batching = batching
+        self.fast_decode = fast_decode
+        self.batches_sent = 0
+        self.single_queries = 0
+        self.fast_decodes = 0
+        self._batch_failures = 0
+        self._fast_failures = 0
+        self._header_chars = 3
+        self._frame_counts = _FrameCounts()
+        self._entries = [_Entry(schedule) for schedule in schedules]
+        self._io_lock = io_lock or threading.Lock()
+        self._state_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._running = False
+        self._allocate()
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def _configure(self):
+        protocol = self.connection.protocol_id()
+        if protocol not in CAN_PROTOCOL_IDS:
+            self.batching = False
+            self.fast_decode = False
+        self._header_chars = HEADER_CHARS.get(protocol, 3)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._configure()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="pid-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def close(self):
+        await asyncio.to_thread(self.stop)
+
+    def query(self, command: obd.OBDCommand) -> obd.OBDResponse:
+        with self._io_lock:
+            return obd.OBD.query(self.connection, command)
+
+    def achieved_rates(self) -> dict[str, float]:
+        now = time.monotonic()
+        with self._state_lock:
+            return {e.name: round(e.achieved_rate(now), 2) for e in self._entries}
+
+    def round_trip_times(self) -> dict[str, float]:
+        with self._state_lock:
+            return {e.name: e.rtt for e in self._entries}
+
+    def target_rates(self) -> dict[str, float]:
+        with self._state_lock:
+            return {e.name: e.effective_rate for e in self._entries}
+
+    def _allocate(self):
+        budget = self.max_utilization - sum(
+            e.schedule.min_rate_hz * e.rtt for e in self._entries
+        )
+        ranked = sorted(
+            self._entries,
+            key=lambda e: (-e.schedule.priority, -e.schedule.rate_hz),
+        )
+        for entry in ranked:
+            floor = min(entry.schedule.min_rate_hz, entry.schedule.rate_hz)
+            extra = min(entry.schedule.rate_hz - floor, max(budget, 0.0) / entry.rtt)
+            entry.effective_rate = floor + extra
+            budget -= extra * entry.rtt
+
+    def _next_entry(self, now: float) -> _Entry | None:
+        due = [e for e in self._entries if e.next_due <= now]
+        if not due:
+            return None
+        return max(due, key=lambda e: (e.schedule.priority, now - e.next_due))
+
+    def _next_batch(self, now: float) -> list[_Entry]:
+        entry = self._next_entry(now)
+        if entry is None:
+            return []
+        if not self.batching or not is_batchable(entry.schedule.command):
+            return [entry]
+        horizon = now + entry.rtt
+        candidates = [
+            e
+            for e in self._entries
+            if e is not entry
+            and is_batchable(e.schedule.command)
+            and e.next_due <= horizon
+        ]
+        candidates.sort(
+            key=lambda e: (e.schedule.priority, now - e.next_due), reverse=True
+        )
+        return [entry] + candidates[: MAX_PIDS_PER_REQUEST - 1]
+
+    def _wire(self, cmd_string: bytes, fast: bool) -> bytes:
+        count = self._frame_counts.hint(cmd_string)
+        if fast and 0 < count < 0x10:
+            return cmd_string + b"%X" % count
+        return cmd_string
+
+    def _exchange(
+        self, cmd_string: bytes, commands: list[obd.OBDCommand], fast: bool = True
+    ) -> dict[obd.OBDCommand, obd.OBDResponse]:
+        interface = self.connection.interface
+        lines = interface._ELM327__send(self._wire(cmd_string, fast)) or []
+        return self._decode(cmd_string, commands, lines)
+
+    def _decode(
+        self, cmd_string: bytes, commands: list[obd.OBDCommand], lines: list[str]
+    ) -> dict[obd.OBDCommand, obd.OBDResponse]:
+        interface = self.connection.interface
+        self._frame_counts.observe(cmd_string, count_frames(lines))
+        if not self.fast_decode:
+            messages = interface._ELM327__protocol(lines)
+            if len(commands) > 1:
+                return demultiplex(commands, messages)
+            return {commands[0]: commands[0](messages)}
+        skip = {cmd.pid: cmd.bytes - 2 for cmd in commands if not is_fast(cmd)}
+        values = decode_lines(lines, self._header_chars, skip)
+        now = time.time()
+        responses = {
+            cmd: FastResponse(cmd, values[cmd.pid], now, FAST_FORMULAS[cmd.pid].unit)
+            for cmd in commands
+            if cmd.pid in values and is_fast(cmd)
+        }
+        self.fast_decodes += len(responses)
+        missing = [cmd for cmd in commands if cmd not in responses]
+        if missing:
+            messages = interface._ELM327__protocol(lines)
+            if len(commands) > 1:
+                parsed = demultiplex(commands, messages, missing)
+            else:
+                parsed = {commands[0]: commands[0](messages)}
+            if any(is_fast(cmd) and not r.is_null() for cmd, r in parsed.items()):
+                self._fast_failures += 1
+                if self._fast_failures >= BATCH_FAILURE_LIMIT:
+                    self.fast_decode = False
+                    logging.info(
+                        "Raw frame decoding failed, using python-OBD decoders."
+                    )
+            responses.update(parsed)
+        return responses
+
+    def _batch_answered(self, responses: dict) -> bool:
+        if responses:
+            self._batch_failures = 0
+            self.batches_sent += 1
+            return True
+        self._batch_failures += 1
+        if self._batch_failures >= BATCH_FAILURE_LIMIT:
+            self.batching = False
+            logging.info("ECU rejected multi-PID requests, polling PIDs singly.")
+        return False
+
+    def _poll(
+        self, commands: list[obd.OBDCommand]
+    ) -> dict[obd.OBDCommand, obd.OBDResponse]:
+        if len(commands) > 1:
+            responses = self._exchange(batch_command_string(commands), commands)
+            if self._batch_answered(responses):
+                return responses
+        self.single_queries += len(commands)
+        return {
+            cmd: self._exchange(cmd.command, [cmd], cmd.fast)[cmd] for cmd in commands
+        }
+
+    def _claim(self) -> tuple[list[_Entry], float]:
+        now = time.monotonic()
+        with self._state_lock:
+            batch = self._next_batch(now)
+            for entry in batch:
+                entry.last_started = now
+            if batch:
+                return batch, 0.0
+            wait = min(e.next_due for e in self._entries) - now
+        return batch, min(max(wait, 0.001), 0.05)
+
+    def _complete(
+        self,
+        batch: list[_Entry],
+        responses: dict[obd.OBDCommand, obd.OBDResponse],
+        elapsed: float,
+    ) -> list[obd.OBDResponse]:
+        share = elapsed / len(batch)
+        finished = time.monotonic()
+        with self._state_lock:
+            for entry in batch:
+                entry.rtt += RTT_SMOOTHING * (share - entry.rtt)
+                if entry.schedule.command in responses:
+                    entry.completions.append(finished)
+            self._allocate()
+        return [
+            responses.get(entry.schedule.command)
+            or obd.OBDResponse(entry.schedule.command)
+            for entry in batch
+        ]
+
+    def _run(self):
+        while self._running:
+            if not self.connection.is_connected():
+                self._running = False
+                self._thread = None
+                return
+            batch, wait = self._claim()
+            if not batch:
+                time.sleep(wait)
+                continue
+            started = time.perf_counter()
+            with self._io_lock:
+                responses = self._poll([entry.schedule.command for entry in batch])
+            for response in self._complete(
+                batch, responses, time.perf_counter() - started
+            ):
+                self.callback(response)
+
+
+class AsyncPIDScheduler(PIDScheduler):
+    def __init__(
+        self,
+        transport,
+        schedules: list[PIDSchedule],
+        callback: Callable[[obd.OBDResponse], None] | None = None,
+        **kwargs,
+    ):
+        super().__init__(transport.connection, schedules, callback, **kwargs)
+        self.transport = transport
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._configure()
+        self._running = True
+        self._task = asyncio.get_running_loop().create_task(self._consume())
+
+    def stop(self):
+        self._running = False
+
+    async def close(self):
+        self._running = False
+        task, self._task = self._task, None
+        if task is not None:
+            await task
+
+    def query(self, command: obd.OBDCommand) -> obd.OBDResponse:
+        return self.transport.run_sync(self.transport.query(command))
+
+    async def _exchange(
+        self, cmd_string: bytes, commands: list[obd.OBDCommand], fast: bool = True
+    ) -> dict[obd.OBDCommand, obd.OBDResponse]:
+        lines = await self.transport.send(self._wire(cmd_string, fast))
+        return self._decode(cmd_string, commands, lines)
+
+    async def _poll(
+        self, commands: list[obd.OBDCommand]
+    ) -> dict[obd.OBDCommand, obd.OBDResponse]:
+        if len(commands) > 1:
+            responses = await self._exchange(batch_command_string(commands), commands)
+            if self._batch_answered(responses):
+                return responses
+        self.single_queries += len(commands)
+        return {
+            cmd: (await self._exchange(cmd.command, [cmd], cmd.fast))[cmd]
+            for cmd in commands
+        }
+
+    async def samples(self) -> AsyncIterator[obd.OBDResponse]:
+        if not self._running:
+            self._configure()
+            self._running = True
+        while self._running and self.transport.connected:
+            batch, wait = self._claim()
+            if not batch:
+                await asyncio.sleep(wait)
+                continue
+            started = time.perf_counter()
+            responses = await self._poll([entry.schedule.command for entry in batch])
+            for response in self._complete(
+                batch, responses, time.perf_counter() - started
+            ):
+                yield response
+        self._running = False
+
+    async def _consume(self):
+        async for response in self.samples():
+            self.callback(response)
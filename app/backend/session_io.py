@@ -0,0 +1,424 @@
+import asyncio
+import codecs
+import csv
+import heapq
+import io
+import json
+import math
+import os
+import re
+import time
+from array import array
+from datetime import datetime
+from operator import itemgetter
+
+from app.backend.recorder import (
+    DEFAULT_CAPACITY,
+    RecordingReader,
+    SessionRecorder,
+    parse_unit,
+)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+    "obdrec": "application/octet-stream",
+}
+EXPORT_BLOCK = 64 * 1024
+CSV_FIELDS = ("kind", "name", "unit", "timestamp", "value", "detail")
+RECORDING_SUFFIX = ".obdrec"
+
+
+def _number(value: float) -> str:
+    return repr(value) if math.isfinite(value) else json.dumps(value)
+
+
+class _CSVFormat:
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._prefixes: dict[str, str] = {}
+
+    def _row(self, *fields) -> str:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(fields)
+        return self._buffer.getvalue()
+
+    def header(self) -> str:
+        return self._row(*CSV_FIELDS)
+
+    def meta(self, metadata: dict) -> str:
+        return "".join(
+            self._row("meta", key, "", "", "", json.dumps(value))
+            for key, value in metadata.items()
+        )
+
+    def sample(self, timestamp: float, name: str, unit: str, value: float) -> str:
+        prefix = self._prefixes.get(name)
+        if prefix is None:
+            prefix = self._prefixes[name] = self._row("sample", name, unit)[:-1] + ","
+        return f"{prefix}{timestamp!r},{value!r},\n"
+
+    def dtcs(self, timestamp: float, codes: list) -> str:
+        if not codes:
+            return self._row("dtc", "", "", repr(timestamp), "", "")
+        return "".join(
+            self._row("dtc", code, "", repr(timestamp), "", description)
+            for code, description in codes
+        )
+
+    def log(self, entry: dict) -> str:
+        return self._row(
+            "log",
+            entry["event"],
+            entry["level"],
+            repr(entry["ts"]),
+            "",
+            entry["message"],
+        )
+
+
+class _JSONLFormat:
+    def __init__(self):
+        self._prefixes: dict[str, str] = {}
+
+    def header(self) -> str:
+        return ""
+
+    def meta(self, metadata: dict) -> str:
+        return json.dumps({"kind": "meta", "metadata": metadata}) + "\n"
+
+    def sample(self, timestamp: float, name: str, unit: str, value: float) -> str:
+        prefix = self._prefixes.get(name)
+        if prefix is None:
+            prefix = self._prefixes[name] = (
+                f'{{"kind":"sample","name":{json.dumps(name)},'
+                f'"unit":{json.dumps(unit)},"timestamp":'
+            )
+        return f'{prefix}{timestamp!r},"value":{_number(value)}}}\n'
+
+    def dtcs(self, timestamp: float, codes: list) -> str:
+        record = {"kind": "dtcs", "timestamp": timestamp, "codes": codes}
+        return json.dumps(record) + "\n"
+
+    def log(self, entry: dict) -> str:
+        record = {
+            "kind": "log",
+            "timestamp": entry["ts"],
+            "level": entry["level"],
+            "event": entry["event"],
+            "message": entry["message"],
+        }
+        return json.dumps(record) + "\n"
+
+
+TEXT_FORMATS = {"csv": _CSVFormat, "jsonl": _JSONLFormat}
+
+
+def _events(reader: RecordingReader):
+    dtcs = ((ts, "dtcs", codes) for ts, codes in reader.dtc_events)
+    logs = ((entry["ts"], "log", entry) for entry in reader.log_entries())
+    return heapq.merge(dtcs, logs, key=itemgetter(0))
+
+
+def _export_text(reader: RecordingReader, fmt: str, block: int):
+    writer = TEXT_FORMATS[fmt]()
+    render = {"dtcs": writer.dtcs, "log": lambda _, entry: writer.log(entry)}
+    sample, units = writer.sample, reader.units
+    parts = [writer.header(), writer.meta(reader.metadata)]
+    size = 0
+    events = _events(reader)
+    upcoming = next(events, None)
+    for timestamp, name, value in reader.samples():
+        while upcoming is not None and upcoming[0] <= timestamp:
+            parts.append(render[upcoming[1]](upcoming[0], upcoming[2]))
+            upcoming = next(events, None)
+        line = sample(timestamp, name, units[name], value)
+        parts.append(line)
+        size += len(line)
+        if size >= block:
+            yield "".join(parts).encode()
+            parts, size = [], 0
+    while upcoming is not None:
+        parts.append(render[upcoming[1]](upcoming[0], upcoming[2]))
+        upcoming = next(events, None)
+    if parts:
+        yield "".join(parts).encode()
+
+
+def export_session(reader: RecordingReader, fmt: str, block: int = EXPORT_BLOCK):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}")
+    try:
+        if fmt == "obdrec":
+            yield from reader.blocks(block)
+        else:
+            yield from _export_text(reader, fmt, block)
+    finally:
+        reader.close()
+
+
+def _clock(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime("%H:%M:%S")
+
+
+def recording_name(name: str) -> str:
+    stem = re.sub(r"[^A-Za-z0-9_.-]+", "-", os.path.basename(name)).strip(".-")
+    if stem.endswith(RECORDING_SUFFIX):
+        stem = stem[: -len(RECORDING_SUFFIX)]
+    return stem or f"import-{datetime.now():%Y%m%d-%H%M%S}"
+
+
+def _available(path: str) -> str:
+    stem, suffix = os.path.splitext(path)
+    candidate, n = path, 1
+    while os.path.exists(candidate):
+        candidate, n = f"{stem}-{n}{suffix}", n + 1
+    return candidate
+
+
+class SessionImporter:
+    def __init__(self, path: str, fmt: str, chunk: int = DEFAULT_CAPACITY):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown import format {fmt!r}")
+        self.path = path
+        self.fmt = fmt
+        self.chunk = chunk
+        self.samples = 0
+        self.events = 0
+        self._partial = _available(path) + ".part"
+        self._lines = 0
+        self._tail = ""
+        self._record: list[str] = []
+        self._quotes = 0
+        self._header = fmt == "csv"
+        self._metadata: dict = {}
+        self._scan: tuple[float, list] | None = None
+        self._columns: dict[str, tuple[str, array, array]] = {}
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if fmt == "obdrec":
+            self._file = open(self._partial, "wb")
+            self._recorder = None
+        else:
+            self._file = None
+            self._recorder = SessionRecorder(self._partial, flush_interval=0)
+
+    def feed(self, data: bytes):
+        if self._file is not None:
+            self._file.write(data)
+            return
+        lines = (self._tail + self._decoder.decode(data)).split("\n")
+        self._tail = lines.pop()
+        self._parse(lines)
+
+    def _parse(self, lines: list[str]):
+        csv_format = self.fmt == "csv"
+        for line in lines:
+            self._lines += 1
+            if csv_format:
+                line = line.rstrip("\r")
+                if not self._record and '"' not in line:
+                    fields = line.split(",")
+                else:
+                    self._record.append(line)
+                    self._quotes += line.count('"')
+                    if self._quotes % 2:
+                        continue
+                    fields = next(csv.reader(["\n".join(self._record)]))
+                    self._record, self._quotes = [], 0
+                if fields == [""]:
+                    continue
+                try:
+                    self._csv_row(fields)
+                except (IndexError, ValueError) as e:
+                    raise ValueError(f"Line {self._lines}: {e}") from None
+            elif line.strip():
+                try:
+                    self._jsonl_record(json.loads(line))
+                except KeyError as e:
+                    raise ValueError(f"Line {self._lines}: missing {e}") from None
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"Line {self._lines}: {e}") from None
+
+    def _csv_row(self, fields: list[str]):
+        if self._header:
+            if tuple(fields) != CSV_FIELDS:
+                raise ValueError(f"expected header {','.join(CSV_FIELDS)}")
+            self._header = False
+            return
+        kind, name, unit, timestamp, value, detail = fields
+        if kind == "sample":
+            self._sample(name, unit, float(timestamp), float(value))
+        elif kind == "dtc":
+            self._dtc(float(timestamp), [(name, detail)] if name else [])
+        elif kind == "log":
+            self._log(float(timestamp), unit, name, detail)
+        elif kind == "meta":
+            self._metadata[name] = json.loads(detail) if detail else ""
+        else:
+            raise ValueError(f"unknown row kind {kind!r}")
+
+    def _jsonl_record(self, record: dict):
+        kind = record["kind"]
+        if kind == "sample":
+            self._sample(
+                record["name"],
+                record.get("unit", ""),
+                float(record["timestamp"]),
+                float(record["value"]),
+            )
+        elif kind == "dtcs":
+            self._dtc(float(record["timestamp"]), [tuple(c) for c in record["codes"]])
+        elif kind == "log":
+            self._log(
+                float(record["timestamp"]),
+                record["level"],
+                record["event"],
+                record["message"],
+            )
+        elif kind == "meta":
+            self._metadata.update(record["metadata"])
+        else:
+            raise ValueError(f"unknown record kind {kind!r}")
+
+    def _sample(self, name: str, unit: str, timestamp: float, value: float):
+        column = self._columns.get(name)
+        if column is None:
+            if unit:
+                parse_unit(unit)
+            column = self._columns[name] = (unit, array("d"), array("d"))
+        column[1].append(timestamp)
+        column[2].append(value)
+        if len(column[1]) >= self.chunk:
+            self._flush_columns()
+
+    def _flush_columns(self):
+        for name, (unit, times, values) in self._columns.items():
+            if times:
+                self._recorder.write_chunk(name, unit, times, values)
+                del times[:], values[:]
+
+    def _dtc(self, timestamp: float, codes: list):
+        if self._scan is not None and self._scan[0] == timestamp:
+            self._scan[1].extend(codes)
+            return
+        self._flush_scan()
+        self._scan = (timestamp, codes)
+
+    def _flush_scan(self):
+        if self._scan is not None:
+            self._recorder.record_dtcs(*self._scan)
+            self._scan = None
+
+    def _log(self, timestamp: float, level: str, event: str, message: str):
+        self._recorder.record_log(
+            {
+                "ts": timestamp,
+                "time": _clock(timestamp),
+                "level": level,
+                "event": event,
+                "message": message,
+            }
+        )
+
+    def close(self) -> str:
+        if self._file is not None:
+            self._file.close()
+        else:
+            self._parse([self._tail + self._decoder.decode(b"", final=True)])
+            if self._record:
+                raise ValueError(f"Line {self._lines}: unterminated quoted field")
+            self._flush_scan()
+            self._flush_columns()
+            if self._metadata:
+                self._recorder.record_metadata(time.time(), self._metadata)
+            self._recorder.close()
+        with RecordingReader(self._partial) as reader:
+            self.samples = reader.sample_count
+            self.events = len(reader.dtc_events) + reader.log_count
+        path = _available(self.path)
+        os.replace(self._partial, path)
+        return path
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+        elif self._recorder is not None:
+            self._recorder.close()
+        if os.path.exists(self._partial):
+            os.remove(self._partial)
+
+
+def list_recordings(directory: str) -> list[dict]:
+    if not os.path.isdir(directory):
+        return []
+    recordings = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(RECORDING_SUFFIX) and entry.is_file():
+            stat = entry.stat()
+            recordings.append(
+                {"name": entry.name, "bytes": stat.st_size, "modified": stat.st_mtime}
+            )
+    recordings.sort(key=itemgetter("modified"), reverse=True)
+    return recordings
+
+
+def session_api(directory: str):
+    from starlette.applications import Starlette
+    from starlette.requests import ClientDisconnect
+    from starlette.responses import JSONResponse, StreamingResponse
+    from starlette.routing import Route
+
+    async def index(request):
+        return JSONResponse(await asyncio.to_thread(list_recordings, directory))
+
+    async def export(request):
+        name, fmt = request.path_params["name"], request.path_params["format"]
+        path = os.path.join(directory, recording_name(name) + RECORDING_SUFFIX)
+        if fmt not in EXPORT_FORMATS:
+            return JSONResponse({"error": f"Unknown format {fmt!r}"}, status_code=400)
+        try:
+            reader = await asyncio.to_thread(RecordingReader, path)
+        except (OSError, ValueError) as e:
+            return JSONResponse({"error": str(e)}, status_code=404)
+        filename = f"{os.path.splitext(os.path.basename(path))[0]}.{fmt}"
+        return StreamingResponse(
+            export_session(reader, fmt),
+            media_type=EXPORT_FORMATS[fmt],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    async def upload(request):
+        fmt = request.query_params.get("format", "")
+        name = recording_name(request.query_params.get("name", ""))
+        try:
+            importer = SessionImporter(
+                os.path.join(directory, name + RECORDING_SUFFIX), fmt
+            )
+        except (OSError, ValueError) as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        try:
+            async for data in request.stream():
+                await asyncio.to_thread(importer.feed, data)
+            path = await asyncio.to_thread(importer.close)
+        except (ClientDisconnect, OSError, ValueError) as e:
+            await asyncio.to_thread(importer.abort)
+            return JSONResponse({"error": str(e)}, status_code=400)
+        return JSONResponse(
+            {
+                "path": path,
+                "name": os.path.basename(path),
+                "samples": importer.samples,
+                "events": importer.events,
+            }
+        )
+
+    return Starlette(
+        routes=[
+            Route("/sessions", index),
+            Route("/sessions/import", upload, methods=["POST"]),
+            Route("/sessions/{name}.{format}", export),
+        ]
+    )
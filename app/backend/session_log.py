@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueListener, RotatingFileHandler
+
+DEFAULT_SPILL_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "obd-scanner", "session_log.jsonl"
+)
+LEVELS = {"INFO": logging.INFO, "WARNING": logging.WARNING, "ERROR": logging.ERROR}
+
+
+def matches(
+    entry: dict,
+    level: str = "",
+    since: float | None = None,
+    until: float | None = None,
+    text: str = "",
+) -> bool:
+    if level and LEVELS.get(entry["level"], 0) < LEVELS.get(level, 0):
+        return False
+    if since is not None and entry["ts"] < since:
+        return False
+    if until is not None and entry["ts"] > until:
+        return False
+    return not text or text.lower() in entry["message"].lower()
+
+
+class SessionLogSpill:
+    def __init__(
+        self,
+        path: str = DEFAULT_SPILL_PATH,
+        max_bytes: int = 1_000_000,
+        backups: int = 5,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.entries_spilled = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener: QueueListener | None = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        handler = RotatingFileHandler(
+            self.path,
+            maxBytes=self.max_bytes,
+            backupCount=self.backups,
+            encoding="utf-8",
+            delay=True,
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._listener = QueueListener(self._queue, handler)
+        self._listener.start()
+
+    def write(self, entries: list[dict], session: str = ""):
+        with self._lock:
+            if self._listener is None:
+                self._start()
+        for entry in entries:
+            self._queue.put(
+                logging.makeLogRecord(
+                    {
+                        "msg": json.dumps({**entry, "session": session}),
+                        "levelno": LEVELS.get(entry["level"]),
+                    }
+                )
+            )
+        self.entries_spilled += len(entries)
+
+    def flush(self):
+        with self._lock:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener.start()
+
+    def files(self) -> list[str]:
+        candidates = [self.path] + [
+            f"{self.path}.{i}" for i in range(1, self.backups + 1)
+        ]
+        return [path for path in candidates if os.path.exists(path)]
+
+    def search(
+        self,
+        session: str = "",
+        level: str = "",
+        since: float | None = None,
+        until: float | None = None,
+        text: str = "",
+        limit: int = 200,
+    ) -> list[dict]:
+        self.flush()
+        results: list[dict] = []
+        for path in self.files():
+            with open(path, encoding="utf-8") as f:
+                lines = f.readlines()
+            for line in reversed(lines):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.pop("session", "") != session:
+                    continue
+                if matches(entry, level, since, until, text):
+                    results.append(entry)
+                    if len(results) >= limit:
+                        return results
+        return results
+
+
+session_log_spill = SessionLogSpill(
+    os.getenv("OBD_SESSION_LOG_PATH", DEFAULT_SPILL_PATH)
+)
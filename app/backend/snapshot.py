@@ -0,0 +1,255 @@
+import time
+from dataclasses import dataclass, field
+
+import obd
+from obd.OBDResponse import StatusTest
+from obd.protocols.protocol import Message
+
+from app.backend.batching import CAN_PROTOCOL_IDS
+from app.backend.dtc_scan import DTC_KINDS
+from app.backend.pid_decoders import DISPLAY_UNITS
+
+FREEZE_FRAME_PIDS = (
+    0x02,
+    0x03,
+    0x04,
+    0x05,
+    0x06,
+    0x07,
+    0x0B,
+    0x0C,
+    0x0D,
+    0x0E,
+    0x0F,
+    0x10,
+    0x11,
+)
+FREEZE_PAIRS_PER_REQUEST = 3
+
+
+@dataclass
+class SnapshotRequest:
+    section: str
+    wire: bytes
+    commands: list[obd.OBDCommand]
+    timeout: float
+    status: str = "pending"
+    error: str = ""
+    seconds: float = 0.0
+    responses: dict[obd.OBDCommand, obd.OBDResponse] = field(default_factory=dict)
+
+
+@dataclass
+class ReadinessMonitor:
+    name: str
+    complete: bool
+
+
+@dataclass
+class FreezeFrameValue:
+    name: str
+    value: str
+    unit: str
+
+
+@dataclass
+class MonitorResult:
+    monitor: str
+    test: str
+    value: str
+    minimum: str
+    maximum: str
+    unit: str
+    passed: bool
+
+
+@dataclass
+class DiagnosticReport:
+    taken_at: float
+    dtc_responses: dict[str, obd.OBDResponse] = field(default_factory=dict)
+    mil: bool = False
+    dtc_count: int = 0
+    ignition: str = ""
+    readiness: list[ReadinessMonitor] = field(default_factory=list)
+    freeze_dtc: str = ""
+    freeze_frame: list[FreezeFrameValue] = field(default_factory=list)
+    monitors: list[MonitorResult] = field(default_factory=list)
+    requests: list[SnapshotRequest] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def timeouts(self) -> int:
+        return sum(r.status == "timeout" for r in self.requests)
+
+    @property
+    def failures(self) -> int:
+        return sum(r.status == "error" for r in self.requests)
+
+
+def _format(value) -> tuple[str, str]:
+    if isinstance(value, tuple):
+        return " / ".join(v for v in value if v), ""
+    magnitude = getattr(value, "magnitude", None)
+    if magnitude is None:
+        return str(value), ""
+    source_unit = str(value.units)
+    unit, scale, offset, precision = DISPLAY_UNITS.get(
+        source_unit, (source_unit, 1.0, 0.0, 2)
+    )
+    return f"{magnitude * scale + offset:.{precision}f}", unit
+
+
+def demultiplex_freeze(
+    commands: list[obd.OBDCommand], messages: list[Message]
+) -> dict[obd.OBDCommand, obd.OBDResponse]:
+    by_pid = {cmd.pid: cmd for cmd in commands}
+    parts: dict[obd.OBDCommand, list[Message]] = {}
+    for message in messages:
+        data = message.data
+        if not data or data[0] != 0x42:
+            continue
+        i = 1
+        while i + 1 < len(data):
+            cmd = by_pid.get(data[i])
+            if cmd is None:
+                break
+            size = cmd.bytes - 2
+            part = Message(message.frames)
+            part.ecu = message.ecu
+            part.data = bytearray([0x42, data[i]]) + data[i + 2 : i + 2 + size]
+            parts.setdefault(cmd, []).append(part)
+            i += 2 + size
+    return {cmd: cmd(cmd_parts) for cmd, cmd_parts in parts.items()}
+
+
+class DiagnosticSnapshot:
+    def __init__(
+        self,
+        channel,
+        kinds: tuple[str, ...] = tuple(DTC_KINDS),
+        timeout: float = 2.0,
+        batching: bool = True,
+    ):
+        self.channel = channel
+        self.kinds = kinds
+        self.timeout = timeout
+        self.batching = batching
+        self.batch_rejected = False
+
+    def plan(self) -> list[SnapshotRequest]:
+        requests = [
+            SnapshotRequest("dtc", DTC_KINDS[kind].command, [DTC_KINDS[kind]], 0)
+            for kind in self.kinds
+        ]
+        if self.channel.supports(obd.commands.STATUS):
+            requests.append(
+                SnapshotRequest("readiness", b"0101", [obd.commands.STATUS], 0)
+            )
+        freeze = [
+            obd.commands[2][pid]
+            for pid in FREEZE_FRAME_PIDS
+            if pid == 0x02 or self.channel.supports(obd.commands[2][pid])
+        ]
+        per_request = 1
+        if self.batching and self.channel.protocol_id() in CAN_PROTOCOL_IDS:
+            per_request = FREEZE_PAIRS_PER_REQUEST
+        for start in range(0, len(freeze), per_request):
+            group = freeze[start : start + per_request]
+            wire = b"02" + b"".join(cmd.command[2:] + b"00" for cmd in group)
+            requests.append(SnapshotRequest("freeze_frame", wire, group, 0))
+        requests.extend(
+            SnapshotRequest("monitors", cmd.command, [cmd], 0)
+            for cmd in obd.commands[6]
+            if cmd and cmd.pid % 0x20 and self.channel.supports(cmd)
+        )
+        for request in requests:
+            request.timeout = self.timeout
+        return requests
+
+    def execute(self, request: SnapshotRequest):
+        started = time.perf_counter()
+        try:
+            if request.section == "freeze_frame":
+                batched = len(request.commands) > 1
+                if not (batched and self.batch_rejected):
+                    messages = self.channel.exchange(request.wire, request.timeout)
+                    request.responses = demultiplex_freeze(request.commands, messages)
+                if batched and not request.responses:
+                    self.batch_rejected = True
+                    for cmd in request.commands:
+                        messages = self.channel.exchange(
+                            cmd.command + b"00", request.timeout
+                        )
+                        request.responses.update(demultiplex_freeze([cmd], messages))
+            else:
+                cmd = request.commands[0]
+                messages = self.channel.exchange(request.wire, request.timeout)
+                request.responses = {cmd: cmd(messages)}
+        except TimeoutError as e:
+            request.status, request.error = "timeout", str(e)
+            return
+        except Exception as e:
+            request.status, request.error = "error", str(e)
+            return
+        finally:
+            request.seconds = time.perf_counter() - started
+        if any(not r.is_null() for r in request.responses.values()):
+            request.status = "ok"
+        else:
+            request.status = "no_data"
+
+    async def run(self) -> DiagnosticReport:
+        started = time.perf_counter()
+        report = DiagnosticReport(taken_at=time.time(), requests=self.plan())
+        for request in report.requests:
+            await self.channel.run(self.execute, request)
+        report.seconds = time.perf_counter() - started
+        self._fill(report)
+        return report
+
+    def _fill(self, report: DiagnosticReport):
+        kinds = {command: kind for kind, command in DTC_KINDS.items()}
+        for request in report.requests:
+            for cmd, response in request.responses.items():
+                if request.section == "dtc":
+                    report.dtc_responses[kinds[cmd]] = response
+                elif response.is_null():
+                    continue
+                elif request.section == "readiness":
+                    self._fill_readiness(report, response.value)
+                elif cmd.pid == 0x02:
+                    report.freeze_dtc = response.value[0] if response.value else ""
+                elif request.section == "freeze_frame":
+                    value, unit = _format(response.value)
+                    report.freeze_frame.append(
+                        FreezeFrameValue(cmd.name.removeprefix("DTC_"), value, unit)
+                    )
+                else:
+                    self._fill_monitor(report, cmd, response.value)
+
+    @staticmethod
+    def _fill_readiness(report: DiagnosticReport, status):
+        report.mil = bool(status.MIL)
+        report.dtc_count = status.DTC_count
+        report.ignition = status.ignition_type
+        report.readiness = [
+            ReadinessMonitor(test.name, test.complete)
+            for test in vars(status).values()
+            if isinstance(test, StatusTest) and test.available
+        ]
+
+    @staticmethod
+    def _fill_monitor(report: DiagnosticReport, cmd: obd.OBDCommand, monitor):
+        for test in monitor.tests:
+            value, unit = _format(test.value)
+            report.monitors.append(
+                MonitorResult(
+                    monitor=cmd.desc,
+                    test=test.desc if test.name != "Unknown" else f"TID {test.tid:02X}",
+                    value=value,
+                    minimum=_format(test.min)[0],
+                    maximum=_format(test.max)[0],
+                    unit=unit,
+                    passed=test.passed,
+                )
+            )
@@ -0,0 +1,38 @@
+import reflex as rx
+from app.state import OBDState
+
+
+def alert_row(alert: rx.Var[dict]) -> rx.Component:
+    return rx.el.p(
+        rx.el.span(alert["time"], " ", class_name="text-gray-400 font-mono"),
+        alert["message"],
+        key=alert["key"],
+        class_name=rx.match(
+            alert["level"],
+            ("ERROR", "text-sm text-red-700"),
+            ("WARNING", "text-sm text-amber-700"),
+            "text-sm text-gray-700",
+        ),
+    )
+
+
+def alerts_panel() -> rx.Component:
+    return rx.cond(
+        OBDState.recent_alerts.length() > 0,
+        rx.el.div(
+            rx.el.div(
+                rx.el.h2("Alerts", class_name="text-lg font-bold text-red-700"),
+                rx.el.button(
+                    "Dismiss",
+                    on_click=OBDState.dismiss_alerts,
+                    class_name="bg-gray-200 text-gray-700 text-xs font-bold py-1 px-3 rounded-md hover:bg-gray-300",
+                ),
+                class_name="flex justify-between items-center mb-2",
+            ),
+            rx.el.div(
+                rx.foreach(OBDState.recent_alerts, alert_row),
+                class_name="flex flex-col gap-1",
+            ),
+            class_name="p-4 bg-red-50 rounded-xl shadow-lg border border-red-200",
+        ),
+    )
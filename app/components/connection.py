@@ -1,6 +1,25 @@
 import reflex as rx
+from reflex.config import get_config
 from app.state import OBDState
 
+IMPORT_SCRIPT = """(async () => {
+  const input = document.getElementById("session-import");
+  const file = input?.files?.[0];
+  if (!file) return {error: "choose a .csv, .jsonl or .obdrec file first"};
+  const format = file.name.split(".").pop().toLowerCase();
+  const name = encodeURIComponent(file.name.replace(/\\.[^.]+$/, ""));
+  try {
+    const response = await fetch(
+      `API_URL/sessions/import?format=${format}&name=${name}`,
+      {method: "POST", body: file},
+    );
+    input.value = "";
+    return await response.json();
+  } catch (e) {
+    return {error: String(e)};
+  }
+})()""".replace("API_URL", get_config().api_url)
+
 
 def connection_manager() -> rx.Component:
     return rx.el.div(
@@ -54,7 +73,7 @@ def connection_manager() -> rx.Component:
                                 ),
                                 rx.icon("refresh-cw", size=16),
                             ),
-                            on_click=OBDState.scan_for_ports,
+                            on_click=OBDState.scan_for_ports(True),
                             disabled=OBDState.is_scanning_ports,
                             class_name="p-2 bg-gray-200 text-gray-700 rounded-md hover:bg-gray-300 ml-2 disabled:opacity-50",
                         ),
@@ -72,6 +91,30 @@ def connection_manager() -> rx.Component:
                     disabled=OBDState.connection_status == "CONNECTING",
                     class_name="w-full bg-purple-600 text-white font-bold py-3 px-4 rounded-lg hover:bg-purple-700 shadow-md elevation-3 transition-all duration-300 disabled:opacity-50",
                 ),
+                rx.cond(
+                    OBDState.connection_status == "CONNECTING",
+                    rx.el.button(
+                        "Cancel",
+                        on_click=OBDState.disconnect_adapter,
+                        class_name="w-full mt-2 bg-gray-200 text-gray-700 font-bold py-2 px-4 rounded-lg hover:bg-gray-300",
+                    ),
+                ),
+                rx.el.div(
+                    rx.el.input(
+                        type="file",
+                        id="session-import",
+                        accept=".csv,.jsonl,.obdrec",
+                        class_name="text-xs text-gray-500 flex-1",
+                    ),
+                    rx.el.button(
+                        "Import",
+                        on_click=rx.call_script(
+                            IMPORT_SCRIPT, callback=OBDState.session_imported
+                        ),
+                        class_name="bg-gray-200 text-gray-700 text-xs font-bold py-1 px-3 rounded-md hover:bg-gray-300",
+                    ),
+                    class_name="flex items-center gap-2 mt-4",
+                ),
             ),
             rx.el.button(
                 "Disconnect",
@@ -80,4 +123,4 @@ def connection_manager() -> rx.Component:
             ),
         ),
         class_name="p-6 bg-white rounded-xl shadow-lg border border-gray-200",
-    )
\ No newline at end of file
+    )
@@ -4,12 +4,160 @@ from app.state import OBDState
 
 def dtc_code_card(dtc: rx.Var[dict]) -> rx.Component:
     return rx.el.div(
-        rx.el.p(dtc["code"], class_name="font-mono font-bold text-purple-700 text-lg"),
+        rx.el.div(
+            rx.el.p(
+                dtc["code"], class_name="font-mono font-bold text-purple-700 text-lg"
+            ),
+            rx.el.span(
+                dtc["kind"],
+                class_name=rx.match(
+                    dtc["kind"],
+                    ("pending", "text-xs font-semibold text-amber-600 uppercase"),
+                    ("permanent", "text-xs font-semibold text-red-600 uppercase"),
+                    "text-xs font-semibold text-gray-500 uppercase",
+                ),
+            ),
+            class_name="flex justify-between items-center",
+        ),
         rx.el.p(dtc["description"], class_name="text-gray-600 text-sm"),
+        rx.el.p(
+            rx.cond(dtc["ecu"] != "", dtc["ecu"].to_string() + " · ", ""),
+            "first seen ",
+            dtc["first_seen"],
+            class_name="text-xs text-gray-400 mt-1",
+        ),
+        key=dtc["key"],
         class_name="p-4 bg-gray-50 rounded-lg border border-gray-200",
     )
 
 
+def dtc_reference_row(entry: rx.Var[dict]) -> rx.Component:
+    return rx.el.p(
+        rx.el.span(entry["code"], class_name="font-mono font-bold text-purple-700"),
+        " ",
+        entry["description"],
+        rx.cond(
+            entry["source"] != "generic",
+            rx.el.span(" (", entry["source"], ")", class_name="text-gray-400"),
+        ),
+        class_name="text-sm text-gray-700",
+    )
+
+
+def readiness_badge(monitor: rx.Var[dict]) -> rx.Component:
+    return rx.el.span(
+        monitor["name"],
+        class_name=rx.cond(
+            monitor["complete"],
+            "text-xs px-2 py-1 rounded-full bg-green-100 text-green-700",
+            "text-xs px-2 py-1 rounded-full bg-amber-100 text-amber-700",
+        ),
+    )
+
+
+def freeze_frame_row(entry: rx.Var[dict]) -> rx.Component:
+    return rx.el.div(
+        rx.el.span(entry["name"], class_name="text-gray-500"),
+        rx.el.span(
+            entry["value"], " ", entry["unit"], class_name="font-mono text-gray-800"
+        ),
+        class_name="flex justify-between text-sm",
+    )
+
+
+def monitor_test_row(test: rx.Var[dict]) -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.p(test["test"], class_name="text-sm text-gray-800"),
+            rx.el.p(test["monitor"], class_name="text-xs text-gray-400"),
+        ),
+        rx.el.div(
+            rx.el.p(test["value"], class_name="font-mono text-sm text-right"),
+            rx.el.p(test["limits"], class_name="text-xs text-gray-400 text-right"),
+        ),
+        rx.el.span(
+            rx.cond(test["passed"], "PASS", "FAIL"),
+            class_name=rx.cond(
+                test["passed"],
+                "text-xs font-semibold text-green-600",
+                "text-xs font-semibold text-red-600",
+            ),
+        ),
+        key=test["key"],
+        class_name="grid grid-cols-[1fr_auto_3rem] gap-4 items-center",
+    )
+
+
+def diagnostic_snapshot() -> rx.Component:
+    return rx.cond(
+        OBDState.snapshot_summary != "",
+        rx.el.div(
+            rx.el.p(
+                "Snapshot · ",
+                OBDState.snapshot_summary,
+                class_name="text-xs text-gray-500 mb-3",
+            ),
+            rx.el.div(
+                rx.foreach(OBDState.snapshot_readiness, readiness_badge),
+                class_name="flex flex-wrap gap-2 mb-4",
+            ),
+            rx.el.div(
+                rx.el.div(
+                    rx.el.h3(
+                        "Freeze Frame",
+                        rx.cond(
+                            OBDState.snapshot_freeze_dtc != "",
+                            " · " + OBDState.snapshot_freeze_dtc,
+                            "",
+                        ),
+                        class_name="font-semibold text-gray-700 mb-2",
+                    ),
+                    rx.foreach(OBDState.snapshot_freeze_frame, freeze_frame_row),
+                ),
+                rx.el.div(
+                    rx.el.h3(
+                        "Monitor Tests", class_name="font-semibold text-gray-700 mb-2"
+                    ),
+                    rx.el.div(
+                        rx.foreach(OBDState.snapshot_tests, monitor_test_row),
+                        class_name="flex flex-col gap-2",
+                    ),
+                ),
+                class_name="grid grid-cols-1 md:grid-cols-2 gap-6",
+            ),
+            class_name="mt-4 p-4 bg-gray-50 rounded-lg border border-gray-200",
+        ),
+    )
+
+
+def dtc_lookup() -> rx.Component:
+    return rx.el.div(
+        rx.el.form(
+            rx.el.input(
+                placeholder="Look up a code, prefix or keyword",
+                name="query",
+                class_name="flex-1 bg-gray-50 border border-gray-300 rounded-md px-2 py-1 text-sm",
+            ),
+            rx.el.button(
+                "Look up",
+                type="submit",
+                class_name="bg-purple-600 text-white text-sm font-bold py-1 px-3 rounded-md hover:bg-purple-700",
+            ),
+            on_submit=OBDState.search_dtc_database,
+            reset_on_submit=False,
+            class_name="flex gap-2",
+        ),
+        rx.cond(
+            OBDState.dtc_search_results.length() > 0,
+            rx.el.div(
+                rx.foreach(OBDState.dtc_search_results, dtc_reference_row),
+                class_name="max-h-40 overflow-y-auto mt-2",
+            ),
+        ),
+        class_name="mt-4",
+    )
+
+
 def clear_codes_dialog() -> rx.Component:
     return rx.cond(
         OBDState.show_clear_dialog,
@@ -94,6 +242,20 @@ def dtc_scanner() -> rx.Component:
                     disabled=~OBDState.is_connected | OBDState.is_scanning_dtcs,
                     class_name="bg-purple-600 text-white font-bold py-2 px-4 rounded-lg hover:bg-purple-700 disabled:bg-gray-400 shadow-md transition-all duration-300",
                 ),
+                rx.el.button(
+                    rx.cond(OBDState.is_capturing_snapshot, "Capturing...", "Snapshot"),
+                    on_click=OBDState.capture_snapshot,
+                    disabled=~OBDState.is_connected
+                    | OBDState.is_replay
+                    | OBDState.is_capturing_snapshot,
+                    class_name="bg-purple-100 text-purple-700 font-bold py-2 px-4 rounded-lg hover:bg-purple-200 disabled:bg-gray-200 disabled:text-gray-400 shadow-md transition-all duration-300",
+                ),
+                rx.el.button(
+                    rx.cond(OBDState.is_watching_dtcs, "Stop Watching", "Watch"),
+                    on_click=OBDState.toggle_dtc_watch,
+                    disabled=~OBDState.is_connected,
+                    class_name="bg-gray-700 text-white font-bold py-2 px-4 rounded-lg hover:bg-gray-800 disabled:bg-gray-400 shadow-md transition-all duration-300",
+                ),
                 rx.el.button(
                     "Clear Codes",
                     on_click=OBDState.toggle_clear_dialog,
@@ -105,9 +267,18 @@ def dtc_scanner() -> rx.Component:
             ),
             class_name="flex justify-between items-center mb-4",
         ),
+        rx.cond(
+            OBDState.dtc_last_scan != "",
+            rx.el.p(
+                "Last scan ",
+                OBDState.dtc_last_scan,
+                rx.cond(OBDState.is_watching_dtcs, " · watching", ""),
+                class_name="text-xs text-gray-500 mb-2",
+            ),
+        ),
         rx.el.div(
             rx.cond(
-                OBDState.is_scanning_dtcs,
+                OBDState.is_scanning_dtcs & (OBDState.dtc_codes.length() == 0),
                 rx.el.div(
                     rx.el.div(
                         class_name="animate-spin rounded-full h-8 w-8 border-b-2 border-purple-600"
@@ -133,5 +304,7 @@ def dtc_scanner() -> rx.Component:
             ),
             class_name="min-h-[10rem]",
         ),
+        diagnostic_snapshot(),
+        dtc_lookup(),
         class_name="p-6 bg-white rounded-xl shadow-lg border border-gray-200 mt-6",
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,120 @@
+import reflex as rx
+from app.state import FleetState
+
+
+def metric(label: str, value: rx.Var, suffix: str = "") -> rx.Component:
+    return rx.el.div(
+        rx.el.p(label, class_name="text-xs text-gray-500"),
+        rx.el.p(
+            value.to_string(), suffix, class_name="text-xl font-bold text-gray-800"
+        ),
+        class_name="p-3 bg-gray-50 rounded-lg border",
+    )
+
+
+def vehicle_row(vehicle: rx.Var[dict]) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(vehicle["port"], class_name="px-3 py-2 font-mono text-xs"),
+        rx.el.td(vehicle["vin"], class_name="px-3 py-2 font-mono text-xs"),
+        rx.el.td(
+            vehicle["status"],
+            rx.cond(
+                vehicle["error"] != "",
+                rx.el.p(vehicle["error"], class_name="text-xs text-red-500"),
+            ),
+            class_name=rx.cond(
+                vehicle["status"] == "CONNECTED",
+                "px-3 py-2 text-green-600 font-bold text-xs",
+                "px-3 py-2 text-amber-600 font-bold text-xs",
+            ),
+        ),
+        rx.el.td(
+            vehicle["dtc_count"].to_string(),
+            rx.el.p(vehicle["dtcs"], class_name="text-xs text-gray-500 font-mono"),
+            class_name="px-3 py-2 text-sm",
+        ),
+        rx.el.td(
+            vehicle["connect_ms"].to_string(),
+            " / ",
+            vehicle["scan_ms"].to_string(),
+            " ms",
+            class_name="px-3 py-2 font-mono text-xs",
+        ),
+        rx.el.td(
+            rx.el.button(
+                "Scan",
+                on_click=FleetState.scan_vehicle(vehicle["port"]),
+                disabled=FleetState.is_busy,
+                class_name="bg-purple-600 text-white text-xs font-bold py-1 px-2 rounded-md hover:bg-purple-700 disabled:opacity-50 mr-1",
+            ),
+            rx.el.button(
+                "Disconnect",
+                on_click=FleetState.disconnect_vehicle(vehicle["port"]),
+                disabled=FleetState.is_busy,
+                class_name="bg-red-600 text-white text-xs font-bold py-1 px-2 rounded-md hover:bg-red-700 disabled:opacity-50",
+            ),
+            class_name="px-3 py-2 whitespace-nowrap",
+        ),
+        class_name="border-t",
+    )
+
+
+def fleet_panel() -> rx.Component:
+    button_class = (
+        "text-white font-bold py-2 px-4 rounded-lg shadow-md disabled:opacity-50"
+    )
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h2("Fleet", class_name="text-2xl font-bold text-gray-800"),
+            rx.el.div(
+                rx.el.button(
+                    "Connect All",
+                    on_click=FleetState.connect_all,
+                    disabled=FleetState.is_busy,
+                    class_name=f"bg-purple-600 hover:bg-purple-700 {button_class}",
+                ),
+                rx.el.button(
+                    "Scan All",
+                    on_click=FleetState.scan_all,
+                    disabled=FleetState.is_busy,
+                    class_name=f"bg-green-600 hover:bg-green-700 {button_class}",
+                ),
+                rx.el.button(
+                    "Disconnect All",
+                    on_click=FleetState.disconnect_all,
+                    disabled=FleetState.is_busy,
+                    class_name=f"bg-red-600 hover:bg-red-700 {button_class}",
+                ),
+                class_name="flex gap-2",
+            ),
+            class_name="flex justify-between items-center mb-4",
+        ),
+        rx.cond(
+            FleetState.is_busy,
+            rx.el.p(
+                FleetState.busy_action, "...", class_name="text-sm text-gray-500 mb-2"
+            ),
+        ),
+        rx.el.div(
+            metric("Connected", FleetState.metrics["connected"]),
+            metric("Commands", FleetState.metrics["commands"]),
+            metric("Last scan", FleetState.metrics["last_scan_ms"], " ms"),
+            metric("Scans/s", FleetState.metrics["scans_per_sec"]),
+            metric("Parallel speedup", FleetState.metrics["scan_speedup"], "x"),
+            class_name="grid grid-cols-2 md:grid-cols-5 gap-3 mb-4",
+        ),
+        rx.el.table(
+            rx.el.thead(
+                rx.el.tr(
+                    rx.foreach(
+                        ["Port", "VIN", "Status", "DTCs", "Connect / Scan", ""],
+                        lambda h: rx.el.th(h, class_name="px-3 py-2 text-left"),
+                    ),
+                    class_name="text-xs text-gray-500 uppercase",
+                )
+            ),
+            rx.el.tbody(rx.foreach(FleetState.vehicles, vehicle_row)),
+            class_name="w-full",
+        ),
+        class_name="p-6 bg-white rounded-xl shadow-lg border border-gray-200",
+    )
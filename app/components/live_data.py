@@ -1,19 +1,84 @@
 import reflex as rx
-from app.state import OBDState
+from reflex.config import get_config
+from app.state import LIVE_TILE_SLOTS, LiveDataState, OBDState
+from app.backend.recorder import REPLAY_SPEEDS
+from app.backend.session_io import EXPORT_FORMATS
 
+CHART_WIDTH_SCRIPT = "Math.round((document.getElementById('live-chart-grid')?.clientWidth || 0) * (window.devicePixelRatio || 1))"
 
-def live_data_item(item: rx.Var[dict]) -> rx.Component:
-    return rx.el.div(
-        rx.el.p(item["name"], class_name="text-sm font-medium text-gray-500"),
+
+def live_data_item(slot: int) -> rx.Component:
+    name, value, unit, rate = (
+        getattr(LiveDataState, f"{field}_{slot}")
+        for field in ("name", "value", "unit", "rate")
+    )
+    return rx.cond(
+        name != "",
+        rx.el.div(
+            rx.el.p(name, class_name="text-sm font-medium text-gray-500"),
+            rx.el.div(
+                rx.el.span(value, class_name="text-3xl font-bold text-purple-700"),
+                rx.el.span(unit, class_name="text-sm text-gray-600 ml-1 mt-2"),
+                class_name="flex items-end",
+            ),
+            rx.el.p(
+                rate,
+                " Hz",
+                class_name="text-xs text-gray-400 font-mono mt-1",
+            ),
+            class_name="p-4 bg-gray-50 rounded-xl border border-gray-200 text-center transform hover:scale-105 transition-transform duration-200",
+        ),
+    )
+
+
+def live_chart_item(slot: int) -> rx.Component:
+    name, value, unit = (
+        getattr(LiveDataState, f"{field}_{slot}") for field in ("name", "value", "unit")
+    )
+    return rx.cond(
+        name != "",
         rx.el.div(
-            rx.el.span(
-                item["value"].to_string(),
-                class_name="text-3xl font-bold text-purple-700",
+            rx.el.div(
+                rx.el.p(name, class_name="text-sm font-medium text-gray-500"),
+                rx.el.p(
+                    value,
+                    " ",
+                    unit,
+                    class_name="text-sm font-bold text-purple-700 font-mono",
+                ),
+                class_name="flex justify-between",
             ),
-            rx.el.span(item["unit"], class_name="text-sm text-gray-600 ml-1 mt-2"),
-            class_name="flex items-end",
+            rx.el.canvas(id=f"live-chart-{slot}", class_name="w-full h-24"),
+            class_name="p-3 bg-gray-50 rounded-xl border border-gray-200",
         ),
-        class_name="p-4 bg-gray-50 rounded-xl border border-gray-200 text-center transform hover:scale-105 transition-transform duration-200",
+    )
+
+
+def live_chart_grid() -> rx.Component:
+    return rx.el.div(
+        *[live_chart_item(slot) for slot in range(LIVE_TILE_SLOTS)],
+        id="live-chart-grid",
+        on_mount=rx.call_script(CHART_WIDTH_SCRIPT, callback=OBDState.set_chart_width),
+        class_name="grid grid-cols-1 gap-3",
+    )
+
+
+def export_links() -> rx.Component:
+    base = f"{get_config().api_url}/sessions/"
+    return rx.el.p(
+        "Export ",
+        OBDState.export_name,
+        ": ",
+        *[
+            rx.el.a(
+                fmt.upper(),
+                href=base + OBDState.export_name + f".{fmt}",
+                download=True,
+                class_name="text-purple-600 hover:underline mr-2",
+            )
+            for fmt in EXPORT_FORMATS
+        ],
+        class_name="text-xs text-gray-500 font-mono mb-2",
     )
 
 
@@ -21,24 +86,81 @@ def live_data_viewer() -> rx.Component:
     return rx.el.div(
         rx.el.div(
             rx.el.h2("Live Data", class_name="text-2xl font-bold text-gray-800"),
-            rx.el.button(
-                rx.cond(OBDState.is_watching_live, "Stop", "Start"),
-                " Watch",
-                on_click=OBDState.toggle_live_watch,
-                disabled=~OBDState.is_connected,
-                class_name=rx.cond(
-                    OBDState.is_watching_live,
-                    "bg-amber-500 text-white font-bold py-2 px-4 rounded-lg hover:bg-amber-600 disabled:bg-gray-400 shadow-md transition-all duration-300",
-                    "bg-green-600 text-white font-bold py-2 px-4 rounded-lg hover:bg-green-700 disabled:bg-gray-400 shadow-md transition-all duration-300",
+            rx.el.div(
+                rx.cond(
+                    OBDState.is_replay,
+                    rx.el.select(
+                        rx.foreach(
+                            REPLAY_SPEEDS,
+                            lambda speed: rx.el.option(speed, value=speed),
+                        ),
+                        value=OBDState.replay_speed,
+                        on_change=OBDState.set_replay_speed,
+                        disabled=OBDState.is_watching_live,
+                        class_name="py-2 px-3 border-gray-300 rounded-lg text-sm shadow-sm",
+                    ),
                 ),
+                rx.el.button(
+                    rx.cond(OBDState.live_chart, "Cards", "Chart"),
+                    on_click=OBDState.toggle_live_chart,
+                    class_name="bg-gray-200 text-gray-700 font-bold py-2 px-4 rounded-lg hover:bg-gray-300 shadow-md transition-all duration-300",
+                ),
+                rx.el.button(
+                    rx.cond(OBDState.is_recording, "Stop", "Record"),
+                    on_click=OBDState.toggle_recording,
+                    disabled=~OBDState.is_connected,
+                    class_name=rx.cond(
+                        OBDState.is_recording,
+                        "bg-red-600 text-white font-bold py-2 px-4 rounded-lg hover:bg-red-700 disabled:bg-gray-400 shadow-md transition-all duration-300",
+                        "bg-gray-200 text-gray-700 font-bold py-2 px-4 rounded-lg hover:bg-gray-300 disabled:bg-gray-400 shadow-md transition-all duration-300",
+                    ),
+                ),
+                rx.el.button(
+                    rx.cond(OBDState.is_watching_live, "Stop", "Start"),
+                    " Watch",
+                    on_click=OBDState.toggle_live_watch,
+                    disabled=~OBDState.is_connected,
+                    class_name=rx.cond(
+                        OBDState.is_watching_live,
+                        "bg-amber-500 text-white font-bold py-2 px-4 rounded-lg hover:bg-amber-600 disabled:bg-gray-400 shadow-md transition-all duration-300",
+                        "bg-green-600 text-white font-bold py-2 px-4 rounded-lg hover:bg-green-700 disabled:bg-gray-400 shadow-md transition-all duration-300",
+                    ),
+                ),
+                class_name="flex gap-2",
             ),
             class_name="flex justify-between items-center mb-4",
         ),
+        rx.cond(
+            OBDState.is_watching_live,
+            rx.el.p(
+                LiveDataState.samples_received,
+                " samples / ",
+                LiveDataState.frames_emitted,
+                " frames",
+                class_name="text-xs text-gray-400 font-mono mb-2",
+            ),
+        ),
+        rx.cond(
+            OBDState.is_recording,
+            rx.el.p(
+                "REC ",
+                OBDState.recording_path,
+                " \u00b7 ",
+                OBDState.recording_samples,
+                " samples",
+                class_name="text-xs text-red-500 font-mono mb-2",
+            ),
+        ),
+        rx.cond(OBDState.export_name != "", export_links()),
         rx.cond(
             OBDState.is_connected,
-            rx.el.div(
-                rx.foreach(OBDState.live_data.values(), live_data_item),
-                class_name="grid grid-cols-2 md:grid-cols-3 gap-4",
+            rx.cond(
+                OBDState.live_chart,
+                live_chart_grid(),
+                rx.el.div(
+                    *[live_data_item(slot) for slot in range(LIVE_TILE_SLOTS)],
+                    class_name="grid grid-cols-2 md:grid-cols-3 gap-4",
+                ),
             ),
             rx.el.div(
                 rx.icon("power-off", class_name="text-gray-400 mb-2", size=48),
@@ -49,5 +171,6 @@ def live_data_viewer() -> rx.Component:
                 class_name="flex flex-col items-center justify-center h-48 bg-gray-50 rounded-lg border border-dashed",
             ),
         ),
+        rx.script(src="/live_chart.js"),
         class_name="p-6 bg-white rounded-xl shadow-lg border border-gray-200",
-    )
\ No newline at end of file
+    )
@@ -1,16 +1,102 @@
 import reflex as rx
 from app.state import OBDState
 
+LEVEL_COLORS = {"ERROR": "text-red-400", "WARNING": "text-amber-400"}
+
+
+def log_row(entry: rx.Var[dict]) -> rx.Component:
+    return rx.el.p(
+        rx.el.span("[", entry["time"], "] ", class_name="text-gray-500"),
+        rx.el.span(
+            entry["level"],
+            " ",
+            class_name=rx.match(
+                entry["level"],
+                ("ERROR", LEVEL_COLORS["ERROR"]),
+                ("WARNING", LEVEL_COLORS["WARNING"]),
+                "text-gray-400",
+            ),
+        ),
+        rx.el.span(entry["event"], ": ", class_name="text-purple-300"),
+        entry["message"],
+        class_name="font-mono text-xs text-gray-200",
+    )
+
+
+def log_search_form() -> rx.Component:
+    input_class = "bg-gray-50 border border-gray-300 rounded-md px-2 py-1 text-xs"
+    return rx.el.form(
+        rx.el.select(
+            rx.el.option("All levels", value=""),
+            rx.el.option("Warnings+", value="WARNING"),
+            rx.el.option("Errors", value="ERROR"),
+            name="level",
+            class_name=input_class,
+        ),
+        rx.el.input(type="datetime-local", name="since", class_name=input_class),
+        rx.el.input(type="datetime-local", name="until", class_name=input_class),
+        rx.el.input(placeholder="Search text", name="text", class_name=input_class),
+        rx.el.button(
+            rx.cond(OBDState.is_searching_log, "Searching...", "Search"),
+            type="submit",
+            disabled=OBDState.is_searching_log,
+            class_name="bg-purple-600 text-white text-xs font-bold py-1 px-3 rounded-md hover:bg-purple-700 disabled:opacity-50",
+        ),
+        rx.cond(
+            OBDState.log_search_results.length() > 0,
+            rx.el.button(
+                "Clear",
+                type="button",
+                on_click=OBDState.clear_log_search,
+                class_name="bg-gray-200 text-gray-700 text-xs font-bold py-1 px-3 rounded-md hover:bg-gray-300",
+            ),
+        ),
+        on_submit=OBDState.search_session_log,
+        class_name="flex flex-wrap gap-2 mb-2",
+    )
+
+
+def log_pager() -> rx.Component:
+    button_class = "bg-gray-200 text-gray-700 text-xs font-bold py-1 px-3 rounded-md hover:bg-gray-300 disabled:opacity-50"
+    return rx.cond(
+        (OBDState.log_page_label != "") & (OBDState.log_search_results.length() == 0),
+        rx.el.div(
+            rx.el.button(
+                "Older",
+                on_click=OBDState.older_log_page,
+                disabled=~OBDState.has_older_log,
+                class_name=button_class,
+            ),
+            rx.el.span(OBDState.log_page_label, class_name="text-xs text-gray-500"),
+            rx.el.button(
+                "Newer",
+                on_click=OBDState.newer_log_page,
+                disabled=~OBDState.has_newer_log,
+                class_name=button_class,
+            ),
+            rx.el.button(
+                "Latest",
+                on_click=OBDState.latest_log_page,
+                disabled=~OBDState.has_newer_log,
+                class_name=button_class,
+            ),
+            class_name="flex items-center gap-2 mt-2",
+        ),
+    )
+
 
 def logger_panel() -> rx.Component:
     return rx.el.div(
         rx.el.h3("Session Log", class_name="text-lg font-semibold text-gray-700 mb-2"),
+        log_search_form(),
         rx.el.div(
-            rx.foreach(
-                OBDState.session_log,
-                lambda log: rx.el.p(log, class_name="font-mono text-xs text-gray-600"),
+            rx.cond(
+                OBDState.log_search_results.length() > 0,
+                rx.foreach(OBDState.log_search_results, log_row),
+                rx.foreach(OBDState.session_log, log_row),
             ),
             class_name="h-48 overflow-y-auto bg-gray-900 text-white p-4 rounded-lg border border-gray-700",
         ),
+        log_pager(),
         class_name="p-6 bg-white rounded-xl shadow-lg border border-gray-200 mt-6",
-    )
\ No newline at end of file
+    )
@@ -1,41 +1,299 @@
 import reflex as rx
-from typing import TypedDict
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, TypedDict
 import asyncio
-import obd
-import serial.tools.list_ports
-from serial.serialutil import SerialException
 import logging
+import os
+import glob
+import time
 from datetime import datetime
+from functools import cache, partial
+from app.backend import emulator
+from app.backend.alerts import Alert, AlertEngine, AlertRule, load_rules
+from app.backend.chart_stream import CHART_WIDTH, ChartStream, chart_script
+from app.backend.derived import DerivedChannel, DerivedMetrics, load_channels
+from app.backend.dtc_db import dtc_database
+from app.backend.live_buffer import LiveDataBuffer
+from app.backend.metrics import (
+    LIVE_FRAMES_TOTAL,
+    LIVE_SAMPLES_TOTAL,
+    SESSION_LOG_TOTAL,
+)
+from app.backend.pid_decoders import PIDDecoder, live_decoders
+from app.backend.ports import port_registry
+from app.backend.recorder import REPLAY_PREFIX, SessionRecorder, parse_speed
+from app.backend.session_log import matches, session_log_spill
+
+if TYPE_CHECKING:
+    from app.backend.broker import AdapterChannel
+    from app.backend.connection import ConnectConfig
+    from app.backend.dtc_scan import DTCDiff, DTCRecord
+    from app.backend.fleet import FleetManager
+    from app.backend.scheduler import PIDSchedule
+    from app.backend.snapshot import DiagnosticReport
 
 logging.basicConfig(level=logging.INFO)
 
 
 class DTC(TypedDict):
+    key: str
+    code: str
+    description: str
+    kind: str
+    ecu: str
+    first_seen: str
+
+
+class DTCReference(TypedDict):
     code: str
     description: str
+    source: str
+
+
+class ReadinessView(TypedDict):
+    name: str
+    complete: bool
+
+
+class FreezeFrameView(TypedDict):
+    name: str
+    value: str
+    unit: str
+
+
+class MonitorTestView(TypedDict):
+    key: str
+    monitor: str
+    test: str
+    value: str
+    limits: str
+    passed: bool
+
+
+class LogEntry(TypedDict):
+    ts: float
+    time: str
+    level: str
+    event: str
+    message: str
+
+
+class AlertView(TypedDict):
+    key: str
+    time: str
+    level: str
+    message: str
+
+
+class FleetVehicleView(TypedDict):
+    port: str
+    vin: str
+    status: str
+    error: str
+    dtc_count: int
+    dtcs: str
+    connect_ms: float
+    scan_ms: float
+    commands: int
 
 
 class LiveData(TypedDict):
     name: str
-    value: str | int | float
+    value: str
     unit: str
+    rate: str
 
 
-MOCK_DTCS: list[DTC] = [
-    {
-        "code": "P0420",
-        "description": "Catalyst System Efficiency Below Threshold (Bank 1)",
-    },
-    {"code": "P0301", "description": "Cylinder 1 Misfire Detected"},
-    {"code": "P0171", "description": "System Too Lean (Bank 1)"},
+LIVE_FRAME_RATE_HZ = float(os.getenv("OBD_LIVE_FRAME_RATE_HZ", "10"))
+LIVE_TILE_SLOTS = int(os.getenv("OBD_LIVE_TILE_SLOTS", "16"))
+LIVE_RATE_REFRESH = 1.0
+EMULATOR_PROFILE = os.getenv("OBD_EMULATOR", "")
+EMULATOR_COUNT = int(os.getenv("OBD_EMULATOR_COUNT", "1"))
+RECORDING_DIR = os.getenv("OBD_RECORDING_DIR", "recordings")
+REPLAY_SPEED = os.getenv("OBD_REPLAY_SPEED", "1x")
+SESSION_LOG_CAP = int(os.getenv("OBD_SESSION_LOG_CAP", "500"))
+SESSION_LOG_PAGE = 25
+LOG_SEARCH_LIMIT = 200
+DTC_SEARCH_LIMIT = 50
+DTC_WATCH_INTERVAL = float(os.getenv("OBD_DTC_WATCH_INTERVAL", "15"))
+SNAPSHOT_TIMEOUT = float(os.getenv("OBD_SNAPSHOT_TIMEOUT", "2"))
+CONNECT_DEADLINE = float(os.getenv("OBD_CONNECT_DEADLINE", "20"))
+CONNECT_ATTEMPTS = int(os.getenv("OBD_CONNECT_ATTEMPTS", "3"))
+DERIVED_CHANNELS = os.getenv("OBD_DERIVED_CHANNELS", "")
+ALERT_RULES = os.getenv("OBD_ALERT_RULES", "")
+ALERT_HISTORY = 20
+ALERT_TOASTS = 3
+ALERT_TOAST_KINDS = {"WARNING": rx.toast.warning, "ERROR": rx.toast.error}
+LIVE_PIDS: list[tuple[str, float, int]] = [
+    ("RPM", 10.0, 3),
+    ("SPEED", 10.0, 3),
+    ("ENGINE_LOAD", 5.0, 2),
+    ("MAF", 5.0, 2),
+    ("COOLANT_TEMP", 0.5, 1),
+    ("FUEL_STATUS", 0.2, 0),
 ]
-MOCK_LIVE_DATA: dict[str, LiveData] = {
-    "RPM": {"name": "RPM", "value": 850, "unit": "RPM"},
-    "SPEED": {"name": "Speed", "value": 0, "unit": "km/h"},
-    "COOLANT_TEMP": {"name": "Coolant Temp", "value": 90, "unit": "°C"},
-    "ENGINE_LOAD": {"name": "Engine Load", "value": 35.5, "unit": "%"},
-    "FUEL_STATUS": {"name": "Fuel Status", "value": "Closed Loop", "unit": ""},
-}
+
+
+@cache
+def _connect_config() -> "ConnectConfig":
+    from app.backend.connection import ConnectConfig
+
+    return ConnectConfig(deadline=CONNECT_DEADLINE, attempts=CONNECT_ATTEMPTS)
+
+
+@cache
+def _live_schedule() -> "list[PIDSchedule]":
+    import obd
+    from app.backend.scheduler import PIDSchedule
+
+    return [
+        PIDSchedule(obd.commands[name], rate_hz=rate, priority=priority)
+        for name, rate, priority in LIVE_PIDS
+    ]
+
+
+@cache
+def _derived_channels() -> list[DerivedChannel]:
+    try:
+        return load_channels(DERIVED_CHANNELS)
+    except (OSError, ValueError) as e:
+        logging.error(f"Ignoring derived channels from {DERIVED_CHANNELS}: {e}")
+        return load_channels()
+
+
+@cache
+def _alert_rules() -> list[AlertRule]:
+    try:
+        return load_rules(ALERT_RULES)
+    except (OSError, ValueError) as e:
+        logging.error(f"Ignoring alert rules from {ALERT_RULES}: {e}")
+        return load_rules()
+
+
+def _fleet_manager() -> "FleetManager":
+    from app.backend.fleet import fleet_manager
+
+    return fleet_manager
+
+
+def _format_live_data(
+    decoder: PIDDecoder, value: float | str, rate: float = 0.0
+) -> LiveData:
+    return {
+        "name": decoder.label,
+        "value": decoder.format(value),
+        "unit": decoder.unit,
+        "rate": f"{rate:.1f}",
+    }
+
+
+class LiveDataState(rx.State):
+    samples_received: int = 0
+    frames_emitted: int = 0
+    _slots: dict[str, int] = {}
+
+    def _show(self, changes: dict[str, dict[str, str]]):
+        for key, fields in changes.items():
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = len(self._slots)
+                self._slots = {**self._slots, key: slot}
+                if slot == LIVE_TILE_SLOTS:
+                    logging.warning(
+                        f"More than {LIVE_TILE_SLOTS} live channels; {key} is not shown."
+                    )
+            if slot < LIVE_TILE_SLOTS:
+                for field, text in fields.items():
+                    setattr(self, f"{field}_{slot}", text)
+
+    def _reset(self):
+        for slot in range(min(len(self._slots), LIVE_TILE_SLOTS)):
+            for field in LiveData.__annotations__:
+                setattr(self, f"{field}_{slot}", "")
+        self._slots = {}
+        self.samples_received = 0
+        self.frames_emitted = 0
+
+
+for _slot in range(LIVE_TILE_SLOTS):
+    for _field in LiveData.__annotations__:
+        LiveDataState.add_var(f"{_field}_{_slot}", str, "")
+
+
+def _changed_fields(
+    shown: dict[str, dict[str, str]], frame: dict[str, LiveData]
+) -> dict[str, dict[str, str]]:
+    changes = {}
+    for key, item in frame.items():
+        previous = shown.setdefault(key, {})
+        fields = {
+            field: text for field, text in item.items() if previous.get(field) != text
+        }
+        if fields:
+            previous.update(fields)
+            changes[key] = fields
+    return changes
+
+
+def _clock(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime("%H:%M:%S")
+
+
+def _dtc_view(record: "DTCRecord") -> DTC:
+    return {
+        "key": record.key,
+        "code": record.code,
+        "description": record.description,
+        "kind": record.kind,
+        "ecu": record.ecu,
+        "first_seen": _clock(record.first_seen),
+    }
+
+
+def _describe_dtcs(records: "list[DTCRecord]") -> str:
+    return ", ".join(f"{r.code} ({r.kind})" for r in records)
+
+
+def _snapshot_summary(report: "DiagnosticReport") -> str:
+    summary = (
+        f"MIL {'on' if report.mil else 'off'} · {report.dtc_count} confirmed · "
+        f"{len(report.requests)} requests in {report.seconds * 1e3:.0f} ms"
+    )
+    if report.timeouts:
+        summary += f" · {report.timeouts} timed out"
+    return summary
+
+
+def _parse_time(value: str) -> float | None:
+    try:
+        return datetime.fromisoformat(value).timestamp() if value else None
+    except ValueError:
+        return None
+
+
+async def _discover_ports(force: bool = False) -> list[str]:
+    port_devices = await port_registry.list(force)
+    if EMULATOR_PROFILE:
+        emulated = await asyncio.to_thread(
+            emulator.shared_fleet_ports, EMULATOR_PROFILE, EMULATOR_COUNT
+        )
+        port_devices = emulated + port_devices
+    return port_devices
+
+
+def _recording_ports() -> list[str]:
+    paths = glob.glob(os.path.join(RECORDING_DIR, "*.obdrec"))
+    paths.sort(key=os.path.getmtime, reverse=True)
+    return [REPLAY_PREFIX + path for path in paths]
+
+
+def _recording_summary(recorder: SessionRecorder) -> str:
+    summary = (
+        f"Recording saved to {recorder.path} ({recorder.samples_recorded} samples, "
+        f"{recorder.bytes_written / 1024:.1f} KB)."
+    )
+    if recorder.samples_dropped:
+        summary += f" {recorder.samples_dropped} samples dropped."
+    return summary
 
 
 class OBDState(rx.State):
@@ -47,14 +305,44 @@ class OBDState(rx.State):
     is_scanning_ports: bool = False
     dtc_codes: list[DTC] = []
     is_scanning_dtcs: bool = False
+    is_watching_dtcs: bool = False
+    dtc_last_scan: str = ""
+    dtc_search_results: list[DTCReference] = []
+    is_capturing_snapshot: bool = False
+    snapshot_summary: str = ""
+    snapshot_freeze_dtc: str = ""
+    snapshot_readiness: list[ReadinessView] = []
+    snapshot_freeze_frame: list[FreezeFrameView] = []
+    snapshot_tests: list[MonitorTestView] = []
     show_clear_dialog: bool = False
     clear_confirmation_input: str = ""
     is_clearing_codes: bool = False
-    live_data: dict[str, LiveData] = {}
     is_watching_live: bool = False
-    session_log: list[str] = []
-    _connection: obd.Async | None = None
-    _use_mock_data: bool = False
+    is_recording: bool = False
+    recording_path: str = ""
+    recording_samples: int = 0
+    is_replay: bool = False
+    replay_speed: str = REPLAY_SPEED
+    live_chart: bool = False
+    recent_alerts: list[AlertView] = []
+    session_log: list[LogEntry] = []
+    log_page_start: int = 0
+    log_total: int = 0
+    log_first: int = 0
+    log_search_results: list[LogEntry] = []
+    is_searching_log: bool = False
+    _connection: Any = None
+    _live_buffer: LiveDataBuffer | None = None
+    _derived: DerivedMetrics | None = None
+    _chart: ChartStream | None = None
+    _chart_width: int = CHART_WIDTH
+    _alerts: AlertEngine | None = None
+    _session_log: list[LogEntry] = []
+    _scheduler: Any = None
+    _subscriber: Callable | None = None
+    _dtc_scanner: Any = None
+    _dtc_watch: int = 0
+    _recorder: SessionRecorder | None = None
 
     @rx.var
     def is_connected(self) -> bool:
@@ -64,32 +352,192 @@ class OBDState(rx.State):
     def clear_confirmation_valid(self) -> bool:
         return self.clear_confirmation_input == "CLEAR-YES"
 
-    def _log_message(self, message: str):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.session_log.append(f"[{timestamp}] {message}")
+    @rx.var
+    def export_name(self) -> str:
+        if self.is_replay and self.selected_port.startswith(REPLAY_PREFIX):
+            path = self.selected_port[len(REPLAY_PREFIX) :]
+        elif self.recording_path and not self.is_recording:
+            path = self.recording_path
+        else:
+            return ""
+        return os.path.splitext(os.path.basename(path))[0]
+
+    def _log_message(self, message: str, level: str = "INFO", event: str = "session"):
+        SESSION_LOG_TOTAL.labels(level, event).inc()
+        now = time.time()
+        entry: LogEntry = {
+            "ts": now,
+            "time": _clock(now),
+            "level": level,
+            "event": event,
+            "message": message,
+        }
+        if self._recorder is not None:
+            self._recorder.record_log(entry)
+        index = self.log_total
+        end = self.log_page_start + SESSION_LOG_PAGE
+        if end > index:
+            self.session_log = [*self.session_log, entry]
+        elif end == index:
+            self.log_page_start = index
+            self.session_log = [entry]
+        self.log_total = index + 1
+        history = [*self._session_log, entry]
+        overflow = len(history) - SESSION_LOG_CAP
+        if overflow >= SESSION_LOG_PAGE:
+            session_log_spill.write(
+                history[:overflow], self.router.session.client_token
+            )
+            history = history[overflow:]
+            self.log_first += overflow
+        self._session_log = history
+
+    def _show_log_page(self, start: int):
+        newest = max(self.log_total - 1, 0) // SESSION_LOG_PAGE * SESSION_LOG_PAGE
+        oldest = self.log_first // SESSION_LOG_PAGE * SESSION_LOG_PAGE
+        start = min(max(start, oldest), newest)
+        self.log_page_start = start
+        self.session_log = self._session_log[
+            max(start - self.log_first, 0) : start + SESSION_LOG_PAGE - self.log_first
+        ]
+
+    @rx.var
+    def has_older_log(self) -> bool:
+        return self.log_page_start > self.log_first
+
+    @rx.var
+    def has_newer_log(self) -> bool:
+        return self.log_page_start + SESSION_LOG_PAGE < self.log_total
+
+    @rx.var
+    def log_page_label(self) -> str:
+        if self.log_total <= SESSION_LOG_PAGE:
+            return ""
+        end = min(self.log_page_start + SESSION_LOG_PAGE, self.log_total)
+        return f"{self.log_page_start + 1}-{end} of {self.log_total}"
+
+    @rx.event
+    def older_log_page(self):
+        self._show_log_page(self.log_page_start - SESSION_LOG_PAGE)
+
+    @rx.event
+    def newer_log_page(self):
+        self._show_log_page(self.log_page_start + SESSION_LOG_PAGE)
+
+    @rx.event
+    def latest_log_page(self):
+        self._show_log_page(self.log_total)
+
+    def _alert_engine(self) -> AlertEngine:
+        if self._alerts is None:
+            self._alerts = AlertEngine(_alert_rules())
+        return self._alerts
+
+    def _raise_alerts(self, alerts: list[Alert]) -> list[rx.event.EventSpec]:
+        if not alerts:
+            return []
+        for alert in alerts:
+            self._log_message(alert.message, level=alert.level, event="alert")
+        self.recent_alerts = (
+            [
+                {
+                    "key": f"{alert.rule}:{alert.timestamp}",
+                    "time": _clock(alert.timestamp),
+                    "level": alert.level,
+                    "message": alert.message,
+                }
+                for alert in reversed(alerts)
+            ]
+            + self.recent_alerts
+        )[:ALERT_HISTORY]
+        toasts = [
+            ALERT_TOAST_KINDS.get(alert.level, rx.toast.info)(
+                alert.message, duration=5000
+            )
+            for alert in alerts[:ALERT_TOASTS]
+        ]
+        if len(alerts) > ALERT_TOASTS:
+            toasts.append(
+                rx.toast.info(
+                    f"{len(alerts) - ALERT_TOASTS} more alerts in the session log.",
+                    duration=5000,
+                )
+            )
+        return toasts
+
+    @rx.event
+    def dismiss_alerts(self):
+        self.recent_alerts = []
+
+    @rx.event(background=True)
+    async def search_session_log(self, form_data: dict):
+        level = form_data.get("level", "")
+        since = _parse_time(form_data.get("since", ""))
+        until = _parse_time(form_data.get("until", ""))
+        text = form_data.get("text", "").strip()
+        async with self:
+            self.is_searching_log = True
+            recent = list(self._session_log)
+        results = [
+            entry
+            for entry in reversed(recent)
+            if matches(entry, level, since, until, text)
+        ][:LOG_SEARCH_LIMIT]
+        if len(results) < LOG_SEARCH_LIMIT:
+            results += await asyncio.to_thread(
+                session_log_spill.search,
+                self.router.session.client_token,
+                level,
+                since,
+                until,
+                text,
+                LOG_SEARCH_LIMIT - len(results),
+            )
+        async with self:
+            self.log_search_results = results
+            self.is_searching_log = False
+
+    @rx.event
+    def clear_log_search(self):
+        self.log_search_results = []
 
     @rx.event(background=True)
-    async def scan_for_ports(self):
+    async def scan_for_ports(self, force: bool = False):
         async with self:
             self.is_scanning_ports = True
             self.available_ports.clear()
-            self._log_message("Scanning for available serial ports...")
+            self._log_message("Scanning for available serial ports...", event="ports")
         try:
-            ports = await asyncio.to_thread(serial.tools.list_ports.comports)
-            port_devices = [port.device for port in ports]
+            port_devices = await _discover_ports(force)
+            port_devices += await asyncio.to_thread(_recording_ports)
             async with self:
                 self.available_ports = port_devices
                 if port_devices:
                     self.selected_port = port_devices[0]
-                    self._log_message(f"Found ports: {', '.join(port_devices)}")
+                    self._log_message(
+                        f"Found ports: {', '.join(port_devices)}", event="ports"
+                    )
                 else:
-                    self._log_message("No serial ports found.")
+                    self._log_message(
+                        "No serial ports found.", level="WARNING", event="ports"
+                    )
+                self.is_scanning_ports = False
+        except asyncio.TimeoutError:
+            async with self:
+                self.connection_error = (
+                    f"Port scan timed out after {port_registry.timeout:.0f} s."
+                )
+                self._log_message(
+                    f"{self.connection_error}", level="ERROR", event="ports"
+                )
                 self.is_scanning_ports = False
         except Exception as e:
             logging.exception(e)
             async with self:
                 self.connection_error = f"Error scanning ports: {e}"
-                self._log_message(f"ERROR: {self.connection_error}")
+                self._log_message(
+                    f"{self.connection_error}", level="ERROR", event="ports"
+                )
                 self.is_scanning_ports = False
 
     @rx.event(background=True)
@@ -99,117 +547,381 @@ class OBDState(rx.State):
                 return
             self.connection_status = "CONNECTING"
             self.connection_error = ""
-            self._log_message(f"Attempting to connect to {self.selected_port}...")
-        if not self.selected_port:
+            port = self.selected_port
+            self._log_message(f"Attempting to connect to {port}...", event="connection")
+        if not port:
             async with self:
                 self.connection_status = "ERROR"
                 self.connection_error = "No port selected."
-                self._log_message("ERROR: No port selected.")
+                self._log_message(
+                    "No port selected.", level="ERROR", event="connection"
+                )
             return
-        if self._use_mock_data:
-            await asyncio.sleep(2)
+        if port.startswith(REPLAY_PREFIX):
+            from app.backend.replay import ReplayConnection
+
+            try:
+                connection = await asyncio.to_thread(
+                    ReplayConnection, port[len(REPLAY_PREFIX) :]
+                )
+            except (OSError, ValueError) as e:
+                async with self:
+                    self.connection_status = "ERROR"
+                    self.connection_error = f"Cannot open recording: {e}"
+                    self._log_message(
+                        f"{self.connection_error}", level="ERROR", event="connection"
+                    )
+                return
             async with self:
+                self._connection = connection
+                self.is_replay = True
                 self.connection_status = "CONNECTED"
-                self.vin = "MOCK_VIN_123456789"
-                self._log_message("Connected in mock mode.")
-                self.live_data = MOCK_LIVE_DATA
+                self.vin = connection.vin or "N/A"
+                self._log_message(
+                    f"Opened recording {connection.path} for replay "
+                    f"({connection.reader.sample_count} samples, "
+                    f"{len(connection.reader.channels)} channels).",
+                    event="connection",
+                )
             return
+        from serial.serialutil import SerialException
+        from app.backend.broker import adapter_broker
+        from app.backend.connection import ConnectionCancelled
+
+        channel = adapter_broker.channel(port, _connect_config())
+        async with self:
+            self._connection = channel
         try:
-            connection = await asyncio.to_thread(obd.Async, self.selected_port)
+            joined = await channel.attach()
             async with self:
-                self._connection = connection
-            await asyncio.to_thread(self._connection.watch, obd.commands.RPM)
-            await asyncio.to_thread(self._connection.start)
-            await asyncio.sleep(3)
-            if self._connection.status() == obd.OBDStatus.CAR_CONNECTED:
-                vin_cmd = await self._connection.query(obd.commands.VIN)
-                async with self:
-                    self.connection_status = "CONNECTED"
-                    self.vin = vin_cmd.value if not vin_cmd.is_null else "N/A"
+                if self._connection is not channel:
+                    return
+                self.connection_status = "CONNECTED"
+                self.vin = channel.vin or "N/A"
+                if joined:
                     self._log_message(
-                        f"Successfully connected to vehicle. VIN: {self.vin}"
+                        f"Joined existing connection ({channel.sessions} sessions).",
+                        event="connection",
                     )
-            else:
-                raise Exception(
-                    f"Connection failed. Status: {self._connection.status()}"
+                else:
+                    if channel.cached_vin:
+                        self._log_message(
+                            f"Using cached PID profile (protocol {channel.cached_protocol}).",
+                            event="connection",
+                        )
+                    self._log_message(
+                        f"Connected in {channel.summary} after {channel.attempts} attempt(s).",
+                        event="connection",
+                    )
+                self._log_message(
+                    f"Successfully connected to vehicle. VIN: {self.vin}",
+                    event="connection",
+                )
+        except ConnectionCancelled:
+            async with self:
+                self.connection_status = "NOT_CONNECTED"
+                self._log_message(
+                    f"Connection attempt cancelled during {channel.summary}.",
+                    level="WARNING",
+                    event="connection",
                 )
         except SerialException as e:
             logging.exception(e)
+            await self._release(channel)
             async with self:
                 self.connection_status = "ERROR"
                 self.connection_error = f"Serial Port Error: {e}. Ensure adapter is connected and port is correct."
-                self._log_message(f"ERROR: {self.connection_error}")
-            if self._connection:
-                await asyncio.to_thread(self._connection.close)
-            async with self:
-                self._connection = None
+                self._log_message(
+                    f"{self.connection_error}", level="ERROR", event="connection"
+                )
         except Exception as e:
             logging.exception(e)
+            await self._release(channel)
             async with self:
                 self.connection_status = "ERROR"
                 self.connection_error = str(e)
-                self._log_message(f"ERROR: {self.connection_error}")
-            if self._connection:
-                await asyncio.to_thread(self._connection.close)
-            async with self:
-                self._connection = None
+                self._log_message(
+                    f"{self.connection_error}", level="ERROR", event="connection"
+                )
+                self._log_message(
+                    f"Gave up after {channel.summary}.",
+                    level="ERROR",
+                    event="connection",
+                )
+
+    async def _release(self, channel: "AdapterChannel"):
+        async with self:
+            if self._connection is not channel:
+                return
+            self._connection = None
+        await channel.detach()
 
     @rx.event(background=True)
     async def disconnect_adapter(self):
         async with self:
-            self._log_message("Disconnecting...")
+            connection, self._connection = self._connection, None
+            is_replay = self.is_replay
+            if self.connection_status == "CONNECTING":
+                self._log_message(
+                    "Cancelling connection attempt...", event="connection"
+                )
+            else:
+                self._log_message("Disconnecting...", event="connection")
             self.is_watching_live = False
-        if self._connection:
-            await asyncio.to_thread(self._connection.stop)
-            await asyncio.to_thread(self._connection.close)
+            if self._live_buffer is not None:
+                self._live_buffer.close()
+                self._live_buffer = None
+                self._derived = None
+                self._chart = None
+            scheduler, self._scheduler = self._scheduler, None
+            subscriber, self._subscriber = self._subscriber, None
+            recorder, self._recorder = self._recorder, None
+            self.is_recording = False
+        if connection is not None and not is_replay:
+            if subscriber is not None:
+                await connection.unsubscribe(subscriber)
+            await connection.detach()
+        else:
+            if scheduler is not None:
+                await asyncio.to_thread(scheduler.stop)
+            if connection is not None:
+                await asyncio.to_thread(connection.close)
+        if recorder is not None:
+            await asyncio.to_thread(recorder.close)
         async with self:
-            self._connection = None
+            if recorder is not None:
+                self._log_message(_recording_summary(recorder), event="recording")
+            self.is_replay = False
             self.connection_status = "NOT_CONNECTED"
             self.vin = ""
             self.dtc_codes.clear()
-            self.live_data.clear()
-            self._log_message("Disconnected.")
+            self._dtc_scanner = None
+            self._alerts = None
+            self._dtc_watch += 1
+            self.is_watching_dtcs = False
+            self.dtc_last_scan = ""
+            self._reset_snapshot()
+            (await self._live_state())._reset()
+            self._log_message("Disconnected.", event="connection")
+
+    def _apply_dtc_diff(self, diff: "DTCDiff") -> list[rx.event.EventSpec]:
+        self.dtc_last_scan = _clock(time.time())
+        if diff.removed:
+            removed = {record.key for record in diff.removed}
+            self.dtc_codes = [d for d in self.dtc_codes if d["key"] not in removed]
+            self._log_message(
+                f"Cleared since last scan: {_describe_dtcs(diff.removed)}.",
+                event="dtc",
+            )
+        if diff.added:
+            self.dtc_codes.extend(_dtc_view(record) for record in diff.added)
+            self._log_message(
+                f"New DTCs: {_describe_dtcs(diff.added)}.",
+                level="WARNING" if self.is_watching_dtcs else "INFO",
+                event="dtc",
+            )
+        return self._raise_alerts(self._alert_engine().dtcs(diff.added, time.time()))
+
+    async def _scan_dtcs_once(self) -> "DTCDiff":
+        from app.backend.dtc_scan import DTCScanner
+
+        async with self:
+            if self._dtc_scanner is None:
+                self._dtc_scanner = DTCScanner(vin=self.vin)
+            scanner = self._dtc_scanner
+            connection = self._connection
+            recorder = self._recorder
+        diff = await asyncio.to_thread(scanner.scan, connection)
+        if recorder is not None and "stored" in diff.responded:
+            recorder.record_dtcs(
+                time.time(),
+                [(r.code, r.description) for r in diff.current if r.kind == "stored"],
+            )
+        return diff
 
     @rx.event(background=True)
     async def scan_dtcs(self):
         async with self:
             self.is_scanning_dtcs = True
-            self.dtc_codes.clear()
-            self._log_message("Scanning for Diagnostic Trouble Codes (DTCs)...")
-        if self._use_mock_data:
-            await asyncio.sleep(1.5)
-            async with self:
-                self.dtc_codes = MOCK_DTCS
-                self._log_message(f"Found {len(MOCK_DTCS)} mock DTCs.")
-                self.is_scanning_dtcs = False
-            return
-        if self.is_connected and self._connection:
+            connected = self.is_connected and self._connection is not None
+            self._log_message(
+                "Scanning for Diagnostic Trouble Codes (DTCs)...", event="dtc"
+            )
+        if connected:
             try:
-                response = await self._connection.query(obd.commands.GET_DTC)
-                if not response.is_null:
-                    dtcs = []
-                    for code_tuple in response.value:
-                        dtcs.append(
-                            {"code": code_tuple[0], "description": code_tuple[1]}
+                diff = await self._scan_dtcs_once()
+                async with self:
+                    toasts = self._apply_dtc_diff(diff)
+                    if diff.responded:
+                        self._log_message(
+                            f"Found {len(diff.current)} DTCs "
+                            f"({', '.join(diff.responded)}) in {diff.seconds * 1e3:.0f} ms.",
+                            event="dtc",
                         )
-                    async with self:
-                        self.dtc_codes = dtcs
-                        self._log_message(f"Found {len(dtcs)} DTCs.")
-                else:
-                    async with self:
-                        self._log_message("No DTCs found.")
+                    else:
+                        self._log_message("No DTCs found.", event="dtc")
+                for toast in toasts:
+                    yield toast
             except Exception as e:
                 logging.exception(e)
                 async with self:
-                    self._log_message(f"Error reading DTCs: {e}")
+                    self._log_message(
+                        f"Error reading DTCs: {e}", level="ERROR", event="dtc"
+                    )
             finally:
                 async with self:
                     self.is_scanning_dtcs = False
         else:
             async with self:
-                self._log_message("Cannot scan DTCs: Not connected.")
+                self._log_message(
+                    "Cannot scan DTCs: Not connected.", level="WARNING", event="dtc"
+                )
                 self.is_scanning_dtcs = False
 
+    def _reset_snapshot(self):
+        self.snapshot_summary = ""
+        self.snapshot_freeze_dtc = ""
+        self.snapshot_readiness = []
+        self.snapshot_freeze_frame = []
+        self.snapshot_tests = []
+
+    def _apply_snapshot(self, report: "DiagnosticReport"):
+        self.snapshot_summary = _snapshot_summary(report)
+        self.snapshot_freeze_dtc = report.freeze_dtc
+        self.snapshot_readiness = [
+            {"name": m.name.replace("_", " ").title(), "complete": m.complete}
+            for m in report.readiness
+        ]
+        self.snapshot_freeze_frame = [
+            {"name": f.name.replace("_", " ").title(), "value": f.value, "unit": f.unit}
+            for f in report.freeze_frame
+        ]
+        self.snapshot_tests = [
+            {
+                "key": f"{i}:{t.monitor}:{t.test}",
+                "monitor": t.monitor,
+                "test": t.test,
+                "value": f"{t.value} {t.unit}".strip(),
+                "limits": f"{t.minimum} – {t.maximum}",
+                "passed": t.passed,
+            }
+            for i, t in enumerate(report.monitors)
+        ]
+
+    @rx.event(background=True)
+    async def capture_snapshot(self):
+        from app.backend.dtc_scan import DTCScanner
+        from app.backend.snapshot import DiagnosticSnapshot
+
+        async with self:
+            if not self.is_connected or self._connection is None:
+                yield rx.toast("Not connected to vehicle.", duration=3000)
+                return
+            if self.is_replay:
+                yield rx.toast("Snapshots need a live vehicle.", duration=3000)
+                return
+            if self.is_capturing_snapshot:
+                return
+            self.is_capturing_snapshot = True
+            if self._dtc_scanner is None:
+                self._dtc_scanner = DTCScanner(vin=self.vin)
+            scanner = self._dtc_scanner
+            recorder = self._recorder
+            snapshot = DiagnosticSnapshot(
+                self._connection,
+                timeout=SNAPSHOT_TIMEOUT,
+            )
+            self._log_message("Capturing diagnostic snapshot...", event="dtc")
+        try:
+            report = await snapshot.run()
+            diff = await asyncio.to_thread(scanner.apply, report.dtc_responses)
+            if recorder is not None and "stored" in diff.responded:
+                recorder.record_dtcs(
+                    report.taken_at,
+                    [
+                        (r.code, r.description)
+                        for r in diff.current
+                        if r.kind == "stored"
+                    ],
+                )
+            async with self:
+                toasts = self._apply_dtc_diff(diff)
+                self._apply_snapshot(report)
+                self._log_message(
+                    f"Diagnostic snapshot: {self.snapshot_summary}.",
+                    level="WARNING" if report.timeouts or report.failures else "INFO",
+                    event="dtc",
+                )
+            for toast in toasts:
+                yield toast
+        except Exception as e:
+            logging.exception(e)
+            async with self:
+                self._log_message(
+                    f"Error capturing snapshot: {e}", level="ERROR", event="dtc"
+                )
+        finally:
+            async with self:
+                self.is_capturing_snapshot = False
+
+    @rx.event(background=True)
+    async def toggle_dtc_watch(self):
+        async with self:
+            if self.is_watching_dtcs:
+                self.is_watching_dtcs = False
+                self._dtc_watch += 1
+                self._log_message("Stopped watching DTCs.", event="dtc")
+                return
+            if not self.is_connected:
+                yield rx.toast("Not connected to vehicle.", duration=3000)
+                return
+            self.is_watching_dtcs = True
+            self._dtc_watch += 1
+            watch = self._dtc_watch
+            self._log_message(
+                f"Watching DTCs every {DTC_WATCH_INTERVAL:g} s.", event="dtc"
+            )
+        while True:
+            async with self:
+                if watch != self._dtc_watch or not self.is_connected:
+                    return
+            try:
+                diff = await self._scan_dtcs_once()
+            except Exception as e:
+                logging.exception(e)
+                async with self:
+                    self._log_message(
+                        f"Error reading DTCs: {e}", level="ERROR", event="dtc"
+                    )
+            else:
+                async with self:
+                    if watch != self._dtc_watch:
+                        return
+                    toasts = self._apply_dtc_diff(diff)
+                if diff.added:
+                    yield rx.toast(
+                        f"New DTCs: {_describe_dtcs(diff.added)}", duration=5000
+                    )
+                for toast in toasts:
+                    yield toast
+            await asyncio.sleep(DTC_WATCH_INTERVAL)
+
+    @rx.event(background=True)
+    async def search_dtc_database(self, form_data: dict):
+        query = form_data.get("query", "").strip()
+        results = []
+        if query:
+            results = await asyncio.to_thread(
+                dtc_database.search, query, DTC_SEARCH_LIMIT
+            )
+        async with self:
+            self.dtc_search_results = [
+                {"code": code, "description": description, "source": source}
+                for code, description, source in results
+            ]
+            if query and not results:
+                self._log_message(f"No DTCs match '{query}'.", event="dtc")
+
     @rx.event
     def toggle_clear_dialog(self):
         self.show_clear_dialog = not self.show_clear_dialog
@@ -222,34 +934,40 @@ class OBDState(rx.State):
                 yield rx.toast("Invalid confirmation text.", duration=3000)
                 return
             self.is_clearing_codes = True
-            self._log_message("Attempting to clear DTCs...")
-        if self._use_mock_data:
-            await asyncio.sleep(2)
-            async with self:
-                self.dtc_codes.clear()
-                self._log_message("Mock DTCs cleared.")
-                self.is_clearing_codes = False
-                self.show_clear_dialog = False
-            yield rx.toast("Codes Cleared (Mock Mode)", duration=3000)
-            return
-        if self.is_connected and self._connection:
+            connection = self._connection if self.is_connected else None
+            self._log_message("Attempting to clear DTCs...", event="dtc")
+        if connection is not None:
+            import obd
+
             try:
-                response = await self._connection.query(obd.commands.CLEAR_DTC)
-                if not response.is_null and response.value:
+                response = await asyncio.to_thread(
+                    connection.query, obd.commands.CLEAR_DTC
+                )
+                if response.messages:
                     async with self:
-                        self.dtc_codes.clear()
-                        self._log_message("CLEAR_DTC command successful.")
+                        cleared = ("stored", "pending")
+                        if self._dtc_scanner is not None:
+                            self._dtc_scanner.forget(cleared)
+                        self.dtc_codes = [
+                            d for d in self.dtc_codes if d["kind"] not in cleared
+                        ]
+                        self._reset_snapshot()
+                        self._log_message("CLEAR_DTC command successful.", event="dtc")
                     yield rx.toast("Diagnostic Trouble Codes Cleared", duration=3000)
                 else:
                     async with self:
                         self._log_message(
-                            f"CLEAR_DTC command failed. Response: {response.value}"
+                            "CLEAR_DTC command failed. No response from ECU.",
+                            level="ERROR",
+                            event="dtc",
                         )
                     yield rx.toast("Failed to clear codes.", duration=3000)
             except Exception as e:
                 logging.exception(e)
                 async with self:
-                    self._log_message(f"Error clearing DTCs: {e}")
+                    self._log_message(
+                        f"Error clearing DTCs: {e}", level="ERROR", event="dtc"
+                    )
                 yield rx.toast(f"Error: {e}", duration=3000)
             finally:
                 async with self:
@@ -257,54 +975,304 @@ class OBDState(rx.State):
                     self.show_clear_dialog = False
         else:
             async with self:
-                self._log_message("Cannot clear DTCs: Not connected.")
+                self._log_message(
+                    "Cannot clear DTCs: Not connected.", level="WARNING", event="dtc"
+                )
                 self.is_clearing_codes = False
 
+    async def _live_state(self) -> LiveDataState:
+        return await self.parent_state.get_state(LiveDataState)
+
     def _update_live_data(self, response):
-        if not response.is_null:
-            key = response.command.name
-            asyncio.run(self.async_update_live_data(key, response))
+        if response.is_null():
+            return
+        LIVE_SAMPLES_TOTAL.inc()
+        decoder = live_decoders.resolve(response)
+        value = decoder.extract(response.value)
+        buffer = self._live_buffer
+        outputs = []
+        if buffer is not None:
+            buffer.put(decoder.key, value, response.time)
+            derived = self._derived
+            if derived is not None:
+                outputs = derived.push(decoder.key, response.time, value)
+            if outputs:
+                buffer.put_many(outputs, response.time)
+            chart = self._chart
+            if chart is not None and chart.enabled:
+                if decoder.numeric:
+                    chart.push(decoder.key, response.time, value)
+                if outputs:
+                    chart.push_many(outputs, response.time)
+        alerts = self._alerts
+        if alerts is not None:
+            if decoder.numeric:
+                alerts.push(decoder.key, response.time, value)
+            if outputs:
+                alerts.push_many(outputs, response.time)
+        recorder = self._recorder
+        if recorder is not None and decoder.numeric:
+            recorder.record(decoder.key, response.time, value, decoder.source_unit)
 
-    @rx.event
-    async def async_update_live_data(self, key, response):
-        self.live_data[key] = {
-            "name": response.command.name.replace("_", " ").title(),
-            "value": response.value.magnitude
-            if hasattr(response.value, "magnitude")
-            else response.value,
-            "unit": str(response.value.units)
-            if hasattr(response.value, "units")
-            else "",
-        }
+    @rx.event(background=True)
+    async def drain_live_data(self):
+        async with self:
+            buffer = self._live_buffer
+            derived = self._derived
+            chart = self._chart
+            alerts = self._alerts
+            scheduler = self._scheduler
+            is_replay = self.is_replay
+        if buffer is None:
+            return
+        interval = 1.0 / LIVE_FRAME_RATE_HZ
+        shown: dict[str, dict[str, str]] = {}
+        slots: dict[str, int] = {}
+        rates: dict[str, float] = {}
+        rates_due = 0.0
+        while not buffer.closed:
+            await asyncio.sleep(interval)
+            pending = buffer.drain()
+            if not pending:
+                if is_replay and scheduler is not None and scheduler.finished:
+                    async with self:
+                        if buffer is not self._live_buffer:
+                            return
+                        buffer.close()
+                        self._live_buffer = None
+                        self._derived = None
+                        self._chart = None
+                        self._scheduler = None
+                        self.is_watching_live = False
+                        self._log_message(scheduler.summary(), event="live")
+                    return
+                continue
+            now = time.monotonic()
+            if scheduler is not None and now >= rates_due:
+                rates, rates_due = scheduler.achieved_rates(), now + LIVE_RATE_REFRESH
+                if derived is not None:
+                    rates = derived.rates(rates)
+            frame = {
+                key: _format_live_data(live_decoders[key], value, rates.get(key, 0.0))
+                for key, value in pending.items()
+            }
+            changes = _changed_fields(shown, frame)
+            fired = alerts.drain() if alerts is not None else []
+            if not changes and not fired:
+                continue
+            async with self:
+                if buffer is not self._live_buffer:
+                    return
+                toasts = self._raise_alerts(fired)
+                if changes:
+                    live = await self._live_state()
+                    live._show(changes)
+                    slots = live._slots
+                    live.frames_emitted += 1
+                    live.samples_received = buffer.samples_received
+                    LIVE_FRAMES_TOTAL.inc()
+                    if self._recorder is not None:
+                        self.recording_samples = self._recorder.samples_recorded
+            for toast in toasts:
+                yield toast
+            update = chart.collect(slots) if chart is not None else None
+            if update is not None:
+                yield rx.call_script(chart_script(update))
 
     @rx.event(background=True)
     async def toggle_live_watch(self):
-        if self._use_mock_data:
+        async with self:
+            connection = self._connection
+            is_replay = self.is_replay
+            stopping = self.is_watching_live
+            if not self.is_connected or connection is None:
+                yield rx.toast("Not connected to vehicle.", duration=3000)
+                return
+            if stopping:
+                scheduler, self._scheduler = self._scheduler, None
+                subscriber, self._subscriber = self._subscriber, None
+                self.is_watching_live = False
+                if self._live_buffer is not None:
+                    self._live_buffer.close()
+                    self._live_buffer = None
+                    self._derived = None
+                    self._chart = None
+            elif not is_replay and not any(
+                connection.supports(s.command) for s in _live_schedule()
+            ):
+                yield rx.toast("Vehicle reports no supported live PIDs.", duration=3000)
+                return
+            else:
+                self.is_watching_live = True
+                self._live_buffer = LiveDataBuffer()
+                self._derived = DerivedMetrics(_derived_channels())
+                self._chart = ChartStream()
+                self._chart.configure(self._chart_width, self.live_chart)
+                self._alert_engine()
+                (await self._live_state())._reset()
+                self._log_message("Started watching live data.", event="live")
+                speed = parse_speed(self.replay_speed)
+        if stopping:
+            if subscriber is not None:
+                await connection.unsubscribe(subscriber)
+            elif scheduler is not None:
+                await asyncio.to_thread(scheduler.stop)
             async with self:
-                self.is_watching_live = not self.is_watching_live
-                status = "Started" if self.is_watching_live else "Stopped"
-                self._log_message(f"{status} live data watch (Mock).")
-            return
-        if not self.is_connected or not self._connection:
-            yield rx.toast("Not connected to vehicle.", duration=3000)
+                if is_replay and scheduler is not None:
+                    self._log_message(scheduler.summary(), event="live")
+                self._log_message("Stopped watching live data.", event="live")
             return
-        if self.is_watching_live:
-            await asyncio.to_thread(self._connection.unwatch_all)
-            async with self:
-                self.is_watching_live = False
-                self._log_message("Stopped watching live data.")
+        subscriber = self._update_live_data
+        if is_replay:
+            from app.backend.replay import ReplayPlayer
+
+            scheduler = ReplayPlayer(connection, subscriber, speed=speed)
+            await asyncio.to_thread(scheduler.start)
+            subscriber = None
         else:
+            scheduler = await connection.subscribe(subscriber, _live_schedule())
+        async with self:
+            self._scheduler = scheduler
+            self._subscriber = subscriber
+        yield OBDState.drain_live_data
+
+    @rx.event
+    def toggle_live_chart(self):
+        self.live_chart = not self.live_chart
+        if self._chart is not None:
+            self._chart.configure(self._chart_width, self.live_chart)
+
+    @rx.event
+    def set_chart_width(self, width: int):
+        if width > 0:
+            self._chart_width = int(width)
+        if self._chart is not None:
+            self._chart.configure(self._chart_width, self.live_chart)
+
+    @rx.event(background=True)
+    async def toggle_recording(self):
+        async with self:
+            recorder, self._recorder = self._recorder, None
+            if recorder is not None:
+                self.is_recording = False
+            elif not self.is_connected:
+                yield rx.toast("Not connected to vehicle.", duration=3000)
+                return
+            vin = self.vin
+            connection = self._connection
+        if recorder is not None:
+            await asyncio.to_thread(recorder.close)
             async with self:
-                self.is_watching_live = True
-                self._log_message("Started watching live data.")
-            supported_live_pids = [
-                obd.commands.RPM,
-                obd.commands.SPEED,
-                obd.commands.COOLANT_TEMP,
-                obd.commands.ENGINE_LOAD,
-                obd.commands.FUEL_STATUS,
-            ]
-            for cmd in supported_live_pids:
-                await asyncio.to_thread(
-                    self._connection.watch, cmd, callback=self._update_live_data
-                )
\ No newline at end of file
+                self._log_message(_recording_summary(recorder), event="recording")
+            return
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(RECORDING_DIR, f"{vin or 'session'}-{stamp}.obdrec")
+        metadata = {
+            "vin": vin,
+            "protocol": connection.protocol_id() if connection else "",
+            "started": time.time(),
+        }
+        recorder = await asyncio.to_thread(SessionRecorder, path, metadata=metadata)
+        async with self:
+            self._recorder = recorder
+            self.is_recording = True
+            self.recording_path = path
+            self.recording_samples = 0
+            if self.dtc_last_scan:
+                recorder.record_dtcs(
+                    time.time(),
+                    [
+                        (d["code"], d["description"])
+                        for d in self.dtc_codes
+                        if d["kind"] == "stored"
+                    ],
+                )
+            self._log_message(f"Recording live data to {path}.", event="recording")
+
+    @rx.event
+    def session_imported(self, result: dict):
+        if not result or "error" in result:
+            error = (result or {}).get("error", "no response")
+            self._log_message(
+                f"Import failed: {error}", level="ERROR", event="recording"
+            )
+            return rx.toast.error(f"Import failed: {error}", duration=5000)
+        port = REPLAY_PREFIX + result["path"]
+        self.available_ports = [port] + [p for p in self.available_ports if p != port]
+        self.selected_port = port
+        self._log_message(
+            f"Imported {result['name']} ({result['samples']} samples, "
+            f"{result['events']} events).",
+            event="recording",
+        )
+
+
+class FleetState(rx.State):
+    vehicles: list[FleetVehicleView] = []
+    metrics: dict[str, float] = {}
+    busy_action: str = ""
+
+    @rx.var
+    def is_busy(self) -> bool:
+        return self.busy_action != ""
+
+    def _sync(self):
+        self.vehicles = _fleet_manager().snapshot()
+        self.metrics = _fleet_manager().metrics()
+
+    async def _run_all(self, action: str, factories: list[Callable[[], Awaitable]]):
+        async with self:
+            if self.busy_action:
+                return
+            self.busy_action = action
+        try:
+            for operation in asyncio.as_completed([factory() for factory in factories]):
+                await operation
+                async with self:
+                    self._sync()
+        finally:
+            async with self:
+                self.busy_action = ""
+                self._sync()
+
+    @rx.event(background=True)
+    async def refresh_fleet(self):
+        async with self:
+            self._sync()
+
+    @rx.event(background=True)
+    async def connect_all(self):
+        try:
+            ports = await _discover_ports()
+        except Exception as e:
+            logging.exception(e)
+            yield rx.toast(f"Error scanning ports: {e}", duration=3000)
+            return
+        config = _connect_config()
+        await self._run_all(
+            "Connecting",
+            [partial(_fleet_manager().connect, port, config) for port in ports],
+        )
+
+    @rx.event(background=True)
+    async def scan_all(self):
+        ports = list(_fleet_manager().vehicles)
+        await self._run_all("Scanning", [_fleet_manager().scan_all])
+        if not ports:
+            yield rx.toast("No vehicles connected.", duration=3000)
+
+    @rx.event(background=True)
+    async def disconnect_all(self):
+        await self._run_all("Disconnecting", [_fleet_manager().disconnect_all])
+
+    @rx.event(background=True)
+    async def scan_vehicle(self, port: str):
+        await _fleet_manager().scan(port)
+        async with self:
+            self._sync()
+
+    @rx.event(background=True)
+    async def disconnect_vehicle(self, port: str):
+        await _fleet_manager().disconnect(port)
+        async with self:
+            self._sync()
@@ -0,0 +1,94 @@
+window.obdChart = (() => {
+  const series = new Map();
+  let span = 0;
+  let newest = 0;
+  let pending = false;
+
+  function push(update) {
+    if (update.reset !== undefined) {
+      span = update.reset;
+      series.clear();
+    }
+    if (!span) {
+      return;
+    }
+    newest = update.n;
+    const oldest = newest - span;
+    for (const [slot, points] of Object.entries(update.s)) {
+      let data = series.get(slot);
+      if (!data) {
+        data = [];
+        series.set(slot, data);
+      }
+      for (const point of points) {
+        const last = data[data.length - 1];
+        if (last && last[0] === point[0]) {
+          data[data.length - 1] = point;
+        } else if (!last || last[0] < point[0]) {
+          data.push(point);
+        }
+      }
+      let stale = 0;
+      while (stale < data.length && data[stale][0] <= oldest) {
+        stale++;
+      }
+      if (stale) {
+        data.splice(0, stale);
+      }
+    }
+    if (!pending) {
+      pending = true;
+      requestAnimationFrame(draw);
+    }
+  }
+
+  function draw() {
+    pending = false;
+    const ratio = window.devicePixelRatio || 1;
+    const oldest = newest - span;
+    for (const [slot, data] of series) {
+      const canvas = document.getElementById(`live-chart-${slot}`);
+      if (!canvas || !data.length) {
+        continue;
+      }
+      const width = Math.round(canvas.clientWidth * ratio);
+      const height = Math.round(canvas.clientHeight * ratio);
+      if (canvas.width !== width || canvas.height !== height) {
+        canvas.width = width;
+        canvas.height = height;
+      }
+      let low = Infinity;
+      let high = -Infinity;
+      for (const point of data) {
+        low = Math.min(low, point[1]);
+        high = Math.max(high, point[2]);
+      }
+      const pad = (high - low) * 0.05 || 1;
+      low -= pad;
+      high += pad;
+      const x = (bucket) => ((bucket - oldest) / span) * width;
+      const y = (value) => height - ((value - low) / (high - low)) * height;
+      const ctx = canvas.getContext("2d");
+      ctx.clearRect(0, 0, width, height);
+      ctx.strokeStyle = "#7e22ce";
+      ctx.lineWidth = ratio;
+      ctx.beginPath();
+      data.forEach(([bucket, min, max], i) => {
+        const px = x(bucket);
+        if (i === 0) {
+          ctx.moveTo(px, y(min));
+        } else {
+          ctx.lineTo(px, y(min));
+        }
+        ctx.lineTo(px, y(max));
+      });
+      ctx.stroke();
+      ctx.fillStyle = "#9ca3af";
+      ctx.font = `${10 * ratio}px monospace`;
+      ctx.fillText((high - pad).toPrecision(4), 2, 10 * ratio);
+      ctx.fillText((low + pad).toPrecision(4), 2, height - 2);
+    }
+  }
+
+  return { push };
+})();
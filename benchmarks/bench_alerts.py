@@ -0,0 +1,75 @@
+import argparse
+import json
+import operator
+import random
+import time
+
+from app.backend.alerts import OPERATORS, AlertEngine, AlertRule
+
+COMPARE = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+
+def make_rules(count: int, rng: random.Random) -> list[AlertRule]:
+    rules = []
+    for i in range(count):
+        op = rng.choice(OPERATORS)
+        if op.startswith(">"):
+            threshold = rng.uniform(5000, 8000)
+        else:
+            threshold = rng.uniform(0, 1000)
+        rules.append(
+            AlertRule.from_dict(
+                {"key": f"R{i}", "source": "RPM", "op": op, "threshold": threshold}
+            )
+        )
+    return rules
+
+
+def bench(count: int, values: list[float], naive_samples: int, seed: int) -> dict:
+    rules = make_rules(count, random.Random(seed))
+    engine = AlertEngine(rules)
+    started = time.perf_counter()
+    for i, value in enumerate(values):
+        engine.push("RPM", i * 0.01, value)
+    compiled_us = (time.perf_counter() - started) / len(values) * 1e6
+
+    conditions = [(COMPARE[rule.op], rule.threshold) for rule in rules]
+    subset = values[:naive_samples]
+    started = time.perf_counter()
+    for value in subset:
+        for compare, threshold in conditions:
+            compare(value, threshold)
+    naive_us = (time.perf_counter() - started) / len(subset) * 1e6
+    return {
+        "rules": count,
+        "compiled_us_per_sample": round(compiled_us, 3),
+        "naive_us_per_sample": round(naive_us, 3),
+        "alerts_fired": engine.fired,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-sample alert evaluation cost as the rule count grows."
+    )
+    parser.add_argument("--rules", default="4,64,1024,16384")
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--naive-samples", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    values = [rng.gauss(3000, 300) for _ in range(args.samples)]
+    results = [
+        bench(int(count), values, args.naive_samples, args.seed)
+        for count in args.rules.split(",")
+    ]
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
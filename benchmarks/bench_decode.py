@@ -0,0 +1,118 @@
+import argparse
+import json
+import time
+
+import obd
+from obd.protocols import ISO_15765_4_11bit_500k
+
+from app.backend.batching import batch_command_string, demultiplex
+from app.backend.emulator import ELM327Session, load_profile
+from app.backend.fast_decode import FAST_FORMULAS, decode_buffer, decode_lines
+
+HOT_PIDS = (0x0C, 0x0D, 0x04, 0x05, 0x11, 0x10)
+
+
+def capture(profile: str, commands: list[obd.OBDCommand], count: int) -> list[str]:
+    session = ELM327Session(load_profile(profile))
+    session.echo = False
+    session.headers = True
+    if len(commands) > 1:
+        request = batch_command_string(commands).decode()
+    else:
+        request = commands[0].command.decode()
+    return [session.handle(request)[0] for _ in range(count)]
+
+
+def split_lines(body: str) -> list[str]:
+    return [line.strip() for line in body.replace(">", "").split("\r") if line.strip()]
+
+
+def pint_decode(protocol, commands: list[obd.OBDCommand], lines: list[str]) -> dict:
+    messages = protocol(lines)
+    if len(commands) > 1:
+        responses = demultiplex(commands, messages)
+    else:
+        responses = {commands[0]: commands[0](messages)}
+    return {cmd.pid: r.value.magnitude for cmd, r in responses.items()}
+
+
+def timed(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return time.perf_counter() - started
+
+
+def cross_check(protocol) -> dict:
+    checked = mismatches = 0
+    worst = 0.0
+    for pid, formula in FAST_FORMULAS.items():
+        command = obd.commands[1][pid]
+        for raw in range(256**formula.size):
+            data = bytes([0x41, pid]) + raw.to_bytes(formula.size, "big")
+            line = "7E8 " + " ".join(f"{b:02X}" for b in bytes([len(data)]) + data)
+            expected = command(protocol([line])).value.magnitude
+            actual = decode_lines([line])[pid]
+            error = abs(expected - actual)
+            worst = max(worst, error)
+            mismatches += error > 1e-9
+            checked += 1
+    return {"values": checked, "mismatches": mismatches, "max_error": worst}
+
+
+def bench(profile: str, pids: tuple[int, ...], samples: int, repeat: int) -> dict:
+    commands = [obd.commands[1][pid] for pid in pids]
+    bodies = capture(profile, commands, samples)
+    lines = [split_lines(body) for body in bodies]
+    buffer = "".join(bodies).encode("ascii")
+    protocol = ISO_15765_4_11bit_500k([])
+
+    pint = [pint_decode(protocol, commands, block) for block in lines]
+    fast = decode_buffer(buffer)
+    mismatches = sum(
+        abs(a[pid] - b[pid]) > 1e-9 for a, b in zip(pint, fast) for pid in a
+    )
+
+    values = sum(len(v) for v in pint) * repeat
+    pint_s = timed(lambda: [pint_decode(protocol, commands, b) for b in lines], repeat)
+    lines_s = timed(lambda: [decode_lines(b) for b in lines], repeat)
+    buffer_s = timed(lambda: decode_buffer(buffer), repeat)
+    return {
+        "request": batch_command_string(commands).decode()
+        if len(commands) > 1
+        else commands[0].command.decode(),
+        "frames_per_response": len(lines[0]),
+        "responses": samples,
+        "pint_samples_per_s": round(values / pint_s),
+        "fast_lines_samples_per_s": round(values / lines_s),
+        "fast_buffer_samples_per_s": round(values / buffer_s),
+        "speedup": round(pint_s / lines_s, 1),
+        "mismatches": mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare pint decoding against the raw-frame fast path."
+    )
+    parser.add_argument("--profile", default="highway")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-cross-check", action="store_true")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = {
+        "single": bench(args.profile, HOT_PIDS[:1], args.samples, args.repeat),
+        "batch": bench(args.profile, HOT_PIDS, args.samples, args.repeat),
+    }
+    if not args.skip_cross_check:
+        results["cross_check"] = cross_check(ISO_15765_4_11bit_500k([]))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
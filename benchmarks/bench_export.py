@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from itertools import zip_longest
+
+from app.backend.recorder import RecordingReader
+from app.backend.session_io import EXPORT_FORMATS, SessionImporter, export_session
+from benchmarks.bench_replay import synthesize
+
+
+def export_to(path: str, fmt: str, target: str) -> int:
+    size = 0
+    with open(target, "wb") as f:
+        for block in export_session(RecordingReader(path), fmt):
+            f.write(block)
+            size += len(block)
+    return size
+
+
+def import_from(source: str, fmt: str, target: str, block: int) -> str:
+    importer = SessionImporter(target, fmt)
+    with open(source, "rb") as f:
+        while data := f.read(block):
+            importer.feed(data)
+    return importer.close()
+
+
+def first_mismatch(original: str, imported: str) -> int | None:
+    with RecordingReader(original) as a, RecordingReader(imported) as b:
+        for index, (left, right) in enumerate(zip_longest(a.samples(), b.samples())):
+            if left != right:
+                return index
+    return None
+
+
+def peak_mb(func, *args) -> float:
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def bench(path: str, fmt: str, samples: int, workdir: str, block: int) -> dict:
+    exported = os.path.join(workdir, f"export.{fmt}")
+    started = time.perf_counter()
+    size = export_to(path, fmt, exported)
+    export_s = time.perf_counter() - started
+    started = time.perf_counter()
+    imported = import_from(exported, fmt, os.path.join(workdir, f"{fmt}.obdrec"), block)
+    import_s = time.perf_counter() - started
+    with RecordingReader(imported) as reader:
+        round_trip = reader.sample_count
+    mismatch = first_mismatch(path, imported)
+    return {
+        "bytes": size,
+        "bytes_per_sample": round(size / samples, 1),
+        "export_samples_per_s": round(samples / export_s),
+        "import_samples_per_s": round(samples / import_s),
+        "export_peak_mb": round(peak_mb(export_to, path, fmt, exported), 2),
+        "import_peak_mb": round(
+            peak_mb(
+                import_from, exported, fmt, os.path.join(workdir, "peak.obdrec"), block
+            ),
+            2,
+        ),
+        "round_trip_samples": round_trip,
+        "round_trip_in_order": mismatch is None,
+        "first_mismatch": mismatch,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Streaming export and import throughput per session format."
+    )
+    parser.add_argument("--recording")
+    parser.add_argument("--synthetic-duration", type=float, default=600.0)
+    parser.add_argument("--synthetic-rate", type=float, default=20.0)
+    parser.add_argument("--block", type=int, default=64 * 1024)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    path = args.recording
+    if path is None:
+        path = os.path.join(workdir, "synthetic.obdrec")
+        synthesize(path, args.synthetic_duration, args.synthetic_rate)
+    with RecordingReader(path) as reader:
+        samples = reader.sample_count
+    results = {
+        "recording": path,
+        "samples": samples,
+        "recording_bytes": os.path.getsize(path),
+        **{
+            fmt: bench(path, fmt, samples, workdir, args.block)
+            for fmt in EXPORT_FORMATS
+        },
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
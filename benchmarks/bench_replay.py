@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import tempfile
+import time
+
+from benchmarks.harness import StateHarness, rss_mb
+
+SYNTHETIC_UNITS = {
+    "RPM": "revolutions_per_minute",
+    "SPEED": "kilometer_per_hour",
+    "ENGINE_LOAD": "percent",
+    "COOLANT_TEMP": "degree_Celsius",
+    "THROTTLE_POS": "percent",
+    "INTAKE_TEMP": "degree_Celsius",
+    "MAF": "gps",
+    "TIMING_ADVANCE": "degree",
+}
+
+
+def synthesize(path: str, duration: float, rate_hz: float) -> int:
+    from app.backend.recorder import SessionRecorder
+
+    recorder = SessionRecorder(
+        path,
+        flush_interval=0.05,
+        metadata={"vin": "SYNTHETIC", "protocol": "6", "started": 0.0},
+    )
+    steps = int(duration * rate_hz)
+    for step in range(steps):
+        t = step / rate_hz
+        for i, (name, unit) in enumerate(SYNTHETIC_UNITS.items()):
+            recorder.record(name, t, 50 + 40 * math.sin(t / (i + 1)), unit)
+        if step % 2000 == 0:
+            recorder.flush()
+    recorder.record_dtcs(0.0, [("P0420", "Catalyst System Efficiency Below Threshold")])
+    recorder.close()
+    return recorder.samples_recorded
+
+
+async def run_replay(args, path: str) -> dict:
+    from app.backend.recorder import REPLAY_PREFIX
+    from app.state import LiveDataState, OBDState
+
+    harness = StateHarness(OBDState)
+    await harness.setup()
+    try:
+        await harness.set(selected_port=REPLAY_PREFIX + path, replay_speed=args.speed)
+        await harness.run("connect_to_adapter")
+        state = await harness.state()
+        if not state.is_connected:
+            raise RuntimeError(f"Cannot open recording: {state.connection_error}")
+        harness.recorder.reset()
+        rss_start = rss_peak = rss_mb()
+        started = time.perf_counter()
+        await harness.run("toggle_live_watch")
+        player = (await harness.state())._scheduler
+        while (await harness.state()).is_watching_live:
+            await asyncio.sleep(0.1)
+            rss_peak = max(rss_peak, rss_mb())
+        elapsed = time.perf_counter() - started
+        dtc_seconds = await harness.run("scan_dtcs")
+        state = await harness.state()
+        live = await harness.state(LiveDataState)
+        results = {
+            "recording": path,
+            "speed": args.speed,
+            "samples": player.samples_replayed,
+            "replay_seconds": round(player.elapsed, 3),
+            "ingest_samples_per_sec": round(player.ingest_rate(), 1),
+            "wall_seconds": round(elapsed, 3),
+            "samples_received": live.samples_received,
+            "frames_emitted": live.frames_emitted,
+            "delta_updates_per_sec": round(harness.recorder.updates / elapsed, 3),
+            "delta_bytes_per_sec": round(harness.recorder.bytes_sent / elapsed, 1),
+            "dtc_scan_ms": round(dtc_seconds * 1e3, 3),
+            "dtc_codes": len(state.dtc_codes),
+            "rss_peak_growth_mb": round(rss_peak - rss_start, 2),
+        }
+        await harness.run("disconnect_adapter")
+    finally:
+        await harness.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded session through OBDState and report ingest rate."
+    )
+    parser.add_argument("--recording")
+    parser.add_argument("--speed", default="max")
+    parser.add_argument("--synthetic-duration", type=float, default=600.0)
+    parser.add_argument("--synthetic-rate", type=float, default=20.0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    path = args.recording
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "synthetic.obdrec")
+        synthesize(path, args.synthetic_duration, args.synthetic_rate)
+    results = asyncio.run(run_replay(args, path))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.harness import QueryTimer, StateHarness, percentile, rss_mb
+
+HIGHER_IS_BETTER = {"live_watch.queries_per_sec"}
+TRACKED_METRICS = (
+    "connect.seconds",
+    "dtc_scan.p50_ms",
+    "dtc_scan.p99_ms",
+    "snapshot.p50_ms",
+    "live_watch.queries_per_sec",
+    "live_watch.query_latency_ms.p50",
+    "live_watch.query_latency_ms.p99",
+    "live_watch.delta_bytes_per_sec",
+    "memory.growth_mb",
+)
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _lookup(results: dict, path: str):
+    value = results
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+async def run_session(args) -> dict:
+    from app.state import LiveDataState, OBDState
+
+    harness = StateHarness(OBDState)
+    timer = QueryTimer()
+    timer.install()
+    await harness.setup()
+    results: dict = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "profile": args.profile,
+            "duration_s": args.duration,
+        }
+    }
+    try:
+        await harness.run("scan_for_ports")
+        state = await harness.state()
+        port = state.selected_port
+
+        connect_seconds = await harness.run("connect_to_adapter")
+        state = await harness.state()
+        if not state.is_connected:
+            raise RuntimeError(f"Connection failed: {state.connection_error}")
+        results["connect"] = {"port": port, "seconds": round(connect_seconds, 4)}
+
+        scan_times = [await harness.run("scan_dtcs") for _ in range(args.dtc_scans)]
+        state = await harness.state()
+        results["dtc_scan"] = {
+            "runs": len(scan_times),
+            "codes": len(state.dtc_codes),
+            "p50_ms": round(percentile(scan_times, 50) * 1e3, 3),
+            "p99_ms": round(percentile(scan_times, 99) * 1e3, 3),
+        }
+
+        snapshot_times = [
+            await harness.run("capture_snapshot") for _ in range(args.dtc_scans)
+        ]
+        state = await harness.state()
+        results["snapshot"] = {
+            "runs": len(snapshot_times),
+            "summary": state.snapshot_summary,
+            "freeze_frame_values": len(state.snapshot_freeze_frame),
+            "monitor_tests": len(state.snapshot_tests),
+            "p50_ms": round(percentile(snapshot_times, 50) * 1e3, 3),
+            "p99_ms": round(percentile(snapshot_times, 99) * 1e3, 3),
+        }
+
+        timer.reset()
+        harness.recorder.reset()
+        rss_start = rss_peak = rss_mb()
+        if args.chart_width:
+            await harness.call("toggle_live_chart")
+            await harness.call("set_chart_width", width=args.chart_width)
+        await harness.run("toggle_live_watch")
+        started = time.perf_counter()
+        while time.perf_counter() - started < args.duration:
+            await asyncio.sleep(min(1.0, args.duration))
+            rss_peak = max(rss_peak, rss_mb())
+        elapsed = time.perf_counter() - started
+        state = await harness.state()
+        live = await harness.state(LiveDataState)
+        samples, frames = live.samples_received, live.frames_emitted
+        scheduler = state._scheduler
+        alerts = state._alerts
+        achieved, batching = {}, {}
+        if scheduler is not None:
+            achieved = scheduler.achieved_rates()
+            batching = {
+                "enabled": scheduler.batching,
+                "batches_sent": scheduler.batches_sent,
+                "single_queries": scheduler.single_queries,
+            }
+        await harness.run("toggle_live_watch")
+        rss_end = rss_mb()
+
+        latencies = {k: list(v) for k, v in timer.latencies.items()}
+        every_query = [t for values in latencies.values() for t in values]
+        results["live_watch"] = {
+            "duration_s": round(elapsed, 3),
+            "pids": sorted(live._slots),
+            "queries": len(every_query),
+            "queries_per_sec": round(len(every_query) / elapsed, 3),
+            "pid_rates_hz": {
+                command: round(len(values) / elapsed, 3)
+                for command, values in sorted(latencies.items())
+            },
+            "achieved_rates_hz": achieved,
+            "batching": batching,
+            "query_latency_ms": {
+                "p50": round(percentile(every_query, 50) * 1e3, 3),
+                "p99": round(percentile(every_query, 99) * 1e3, 3),
+                "per_command": {
+                    command: {
+                        "p50": round(percentile(values, 50) * 1e3, 3),
+                        "p99": round(percentile(values, 99) * 1e3, 3),
+                    }
+                    for command, values in sorted(latencies.items())
+                },
+            },
+            "samples_received": samples,
+            "frames_emitted": frames,
+            "delta_updates_per_sec": round(harness.recorder.updates / elapsed, 3),
+            "delta_bytes_per_sec": round(harness.recorder.bytes_sent / elapsed, 1),
+            "alerts_fired": alerts.fired if alerts is not None else 0,
+            "alerts_suppressed": alerts.suppressed if alerts is not None else 0,
+        }
+        results["memory"] = {
+            "rss_start_mb": round(rss_start, 2),
+            "rss_end_mb": round(rss_end, 2),
+            "rss_peak_mb": round(rss_peak, 2),
+            "growth_mb": round(rss_end - rss_start, 2),
+        }
+        await harness.run("disconnect_adapter")
+    finally:
+        timer.uninstall()
+        await harness.shutdown()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for metric in TRACKED_METRICS:
+        current, previous = _lookup(results, metric), _lookup(baseline, metric)
+        if current is None or not previous:
+            continue
+        change = (current - previous) / abs(previous)
+        worse = -change if metric in HIGHER_IS_BETTER else change
+        flag = "REGRESSION" if worse > tolerance else ""
+        print(f"{metric:40} {previous:>12} -> {current:>12} {change:+8.1%} {flag}")
+        if flag:
+            regressions.append(metric)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark OBDState handlers against the ELM327 emulator."
+    )
+    parser.add_argument("--profile", default="default")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--dtc-scans", type=int, default=20)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--chart-width", type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ["OBD_EMULATOR"] = args.profile
+    os.environ["OBD_EMULATOR_COUNT"] = "1"
+    results = asyncio.run(run_session(args))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+
+from app.backend.broker import adapter_broker
+from app.backend.connection import ConnectConfig
+from app.backend.emulator import shared_fleet_ports
+from app.backend.snapshot import DiagnosticSnapshot
+
+MODES = {
+    "batched": {"batching": True},
+    "unbatched": {"batching": False},
+}
+
+
+async def run(args) -> dict:
+    port = shared_fleet_ports(args.profile, 1)[0]
+    channel = adapter_broker.channel(port, ConnectConfig())
+    await channel.attach()
+    results: dict = {"profile": args.profile, "runs": args.runs}
+    try:
+        for mode, options in MODES.items():
+            times, report = [], None
+            for _ in range(args.runs):
+                report = await DiagnosticSnapshot(
+                    channel, timeout=args.timeout, **options
+                ).run()
+                times.append(report.seconds)
+            results[mode] = {
+                "requests": len(report.requests),
+                "timeouts": report.timeouts,
+                "freeze_frame_values": len(report.freeze_frame),
+                "monitor_tests": len(report.monitors),
+                "p50_ms": round(statistics.median(times) * 1e3, 1),
+                "max_ms": round(max(times) * 1e3, 1),
+            }
+        results["speedup"] = round(
+            results["unbatched"]["p50_ms"] / results["batched"]["p50_ms"], 2
+        )
+    finally:
+        await channel.detach()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the batched diagnostic snapshot against one query per PID."
+    )
+    parser.add_argument("--profile", default=os.getenv("OBD_EMULATOR") or "default")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
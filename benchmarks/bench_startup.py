@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HARDWARE_MODULES = ("obd", "pint", "serial")
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+loaded = time.perf_counter() - started
+preloaded = {{name: name in sys.modules for name in {hardware!r}}}
+started = time.perf_counter()
+import {deferred}
+deferred = time.perf_counter() - started
+print(json.dumps({{"import_s": loaded, "deferred_s": deferred, "preloaded": preloaded}}))
+"""
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:") :].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue
+        modules.setdefault(fields[2].strip(), (self_us, cumulative_us))
+    return modules
+
+
+def probe(module: str, deferred: str) -> tuple[dict, dict[str, tuple[int, int]]]:
+    code = PROBE.format(module=module, deferred=deferred, hardware=HARDWARE_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=dict(os.environ, REFLEX_STATE_MANAGER_MODE="memory"),
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), parse_importtime(
+        result.stderr
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report import time of the app and what the hardware stack costs."
+    )
+    parser.add_argument("--module", default="app.state")
+    parser.add_argument("--deferred", default="app.backend.broker")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    runs = [probe(args.module, args.deferred) for _ in range(args.runs)]
+    timings = [timing for timing, _ in runs]
+    _, modules = runs[-1]
+    top = sorted(
+        ((name, self_us) for name, (self_us, _) in modules.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[: args.top]
+    results = {
+        "module": args.module,
+        "runs": args.runs,
+        "import_ms": round(statistics.median(t["import_s"] for t in timings) * 1e3, 1),
+        "deferred_module": args.deferred,
+        "deferred_ms": round(
+            statistics.median(t["deferred_s"] for t in timings) * 1e3, 1
+        ),
+        "hardware_preloaded": timings[-1]["preloaded"],
+        "hardware_cumulative_ms": {
+            name: round(modules[name][1] / 1e3, 1)
+            for name in HARDWARE_MODULES
+            if name in modules
+        },
+        "top_self_ms": {name: round(us / 1e3, 1) for name, us in top},
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
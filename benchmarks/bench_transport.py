@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+from dataclasses import replace
+
+import obd
+
+from app.backend.broker import AdapterBroker
+from app.backend.connection import ConnectConfig
+from app.backend.emulator import LinkConfig, load_profile, shared_hub
+from app.backend.scheduler import PIDSchedule
+from benchmarks.harness import percentile
+
+SCHEDULES = [
+    ("RPM", 50.0, 2),
+    ("SPEED", 50.0, 2),
+    ("ENGINE_LOAD", 20.0, 1),
+    ("COOLANT_TEMP", 5.0, 0),
+]
+
+
+def _ms(values: list[float]) -> dict:
+    return {
+        "p50": round(percentile(values, 50) * 1e3, 3),
+        "p99": round(percentile(values, 99) * 1e3, 3),
+    }
+
+
+async def _loop_lag(stop: asyncio.Event, interval: float = 0.005) -> list[float]:
+    lags = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+    return lags
+
+
+async def run_mode(args, mode: str) -> dict:
+    link = LinkConfig(latency=args.latency, jitter=0.0, baudrate=args.baudrate)
+    profile = replace(load_profile(args.profile), link=link)
+    adapters = shared_hub().spawn_fleet(profile, args.adapters)
+    broker = AdapterBroker(ConnectConfig(async_transport=mode == "async"))
+    channels = [broker.channel(adapter.port) for adapter in adapters]
+    try:
+        await asyncio.gather(*(channel.attach() for channel in channels))
+        channel, rpm = channels[0], obd.commands.RPM
+        threads_idle = threading.active_count()
+        latencies = []
+        for _ in range(args.queries):
+            started = time.perf_counter()
+            if mode == "async":
+                await channel.transport.query(rpm)
+            else:
+                await channel.run(channel.query, rpm)
+            latencies.append(time.perf_counter() - started)
+
+        counts = [0] * len(channels)
+        schedules = [
+            PIDSchedule(obd.commands[name], rate, priority)
+            for name, rate, priority in SCHEDULES
+        ]
+        callbacks = [
+            lambda _, i=i: counts.__setitem__(i, counts[i] + 1)
+            for i in range(len(channels))
+        ]
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(_loop_lag(stop))
+        cpu, started = time.process_time(), time.perf_counter()
+        for channel, callback in zip(channels, callbacks):
+            await channel.subscribe(callback, schedules)
+        await asyncio.sleep(args.duration)
+        threads_streaming = threading.active_count()
+        for channel, callback in zip(channels, callbacks):
+            await channel.unsubscribe(callback)
+        elapsed = time.perf_counter() - started
+        cpu = time.process_time() - cpu
+        stop.set()
+        lags = await lag_task
+        samples = sum(counts)
+        return {
+            "query_latency_ms": _ms(latencies),
+            "samples_per_sec": round(samples / elapsed, 1),
+            "cpu_us_per_sample": round(cpu / max(samples, 1) * 1e6, 1),
+            "loop_lag_ms": _ms(lags),
+            "threads_idle": threads_idle,
+            "threads_streaming": threads_streaming,
+        }
+    finally:
+        await asyncio.gather(*(channel.detach() for channel in channels))
+        for adapter in adapters:
+            shared_hub().remove(adapter)
+
+
+async def run(args) -> dict:
+    results: dict = {
+        "profile": args.profile,
+        "adapters": args.adapters,
+        "latency_ms": args.latency * 1e3,
+        "baudrate": args.baudrate,
+    }
+    for mode in ("thread", "async"):
+        results[mode] = await run_mode(args, mode)
+    thread, aio = results["thread"], results["async"]
+    results["query_p50_saving_ms"] = round(
+        thread["query_latency_ms"]["p50"] - aio["query_latency_ms"]["p50"], 3
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the asyncio serial transport against executor threads."
+    )
+    parser.add_argument("--profile", default="default")
+    parser.add_argument("--adapters", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--baudrate", type=int, default=500000)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import time
+from collections import defaultdict
+
+os.environ.setdefault("REFLEX_STATE_MANAGER_MODE", "memory")
+
+import obd
+from reflex import constants
+from reflex.event import Event
+from reflex.istate.data import RouterData
+from reflex.state import _substate_key
+from reflex.utils import prerequisites
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+class QueryTimer:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self._original = None
+
+    def install(self):
+        from app.backend.aio_elm327 import AsyncELM327
+
+        self._original = original = obd.elm327.ELM327._ELM327__send
+        self._original_async = original_async = AsyncELM327.send
+        latencies = self.latencies
+        last_command = {}
+
+        def record(interface, cmd: bytes, start: float):
+            key = cmd.decode(errors="ignore")
+            if not key:
+                key = last_command.get(id(interface), "")
+            elif len(key) > 2 and len(key) % 2:
+                key = key[:-1]
+            last_command[id(interface)] = key
+            latencies[key].append(time.perf_counter() - start)
+
+        def timed_send(interface, cmd, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(interface, cmd, *args, **kwargs)
+            finally:
+                record(interface, cmd, start)
+
+        async def timed_async_send(transport, cmd, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await original_async(transport, cmd, *args, **kwargs)
+            finally:
+                record(transport.interface, cmd, start)
+
+        obd.elm327.ELM327._ELM327__send = timed_send
+        AsyncELM327.send = timed_async_send
+
+    def uninstall(self):
+        if self._original is not None:
+            from app.backend.aio_elm327 import AsyncELM327
+
+            obd.elm327.ELM327._ELM327__send = self._original
+            AsyncELM327.send = self._original_async
+            self._original = None
+
+    def reset(self):
+        self.latencies.clear()
+
+
+class DeltaRecorder:
+    def __init__(self, harness: "StateHarness"):
+        self.harness = harness
+        self.bytes_sent = 0
+        self.updates = 0
+
+    def reset(self):
+        self.bytes_sent = 0
+        self.updates = 0
+
+    async def emit_update(self, update, token: str):
+        self.bytes_sent += len(update.json())
+        self.updates += 1
+        for event in update.events:
+            if event.name.startswith(self.harness.state_prefix):
+                await self.harness.dispatch(event.name.rsplit(".", 1)[1])
+
+
+class StateHarness:
+    def __init__(self, state_cls, token: str = "benchmark"):
+        self.app = prerequisites.get_and_validate_app().app
+        self.state_cls = state_cls
+        self.state_prefix = state_cls.get_full_name() + "."
+        self.token = token
+        self.recorder = DeltaRecorder(self)
+        self.app._event_namespace = self.recorder
+        self.tasks: set[asyncio.Task] = set()
+
+    async def setup(self):
+        async with self.app.state_manager.modify_state(
+            _substate_key(self.token, self.state_cls)
+        ) as root:
+            root.router_data = {constants.RouteVar.CLIENT_TOKEN: self.token}
+            root.router = RouterData.from_router_data(root.router_data)
+
+    async def state(self, state_cls=None):
+        root = await self.app.state_manager.get_state(
+            _substate_key(self.token, self.state_cls)
+        )
+        return await root.get_state(state_cls or self.state_cls)
+
+    async def set(self, **values):
+        async with self.app.state_manager.modify_state(
+            _substate_key(self.token, self.state_cls)
+        ) as root:
+            state = await root.get_state(self.state_cls)
+            for name, value in values.items():
+                setattr(state, name, value)
+
+    async def call(self, handler: str, **payload):
+        async with self.app.state_manager.modify_state(
+            _substate_key(self.token, self.state_cls)
+        ) as root:
+            state = await root.get_state(self.state_cls)
+            return self.state_cls.event_handlers[handler].fn(state, **payload)
+
+    async def dispatch(self, handler: str, **payload) -> asyncio.Task:
+        root = await self.app.state_manager.get_state(
+            _substate_key(self.token, self.state_cls)
+        )
+        event = Event(
+            token=self.token, name=self.state_prefix + handler, payload=payload
+        )
+        task = self.app._process_background(root, event)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def run(self, handler: str, **payload) -> float:
+        start = time.perf_counter()
+        await (await self.dispatch(handler, **payload))
+        return time.perf_counter() - start
+
+    async def shutdown(self):
+        for task in list(self.tasks):
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)